@@ -0,0 +1,476 @@
+'''
+A headless stand-in for the curses window and screen functions used by
+tgcurses, for benchmarking without a terminal.
+
+Like curses, each FakeWindow has its own cell grid and records the range of
+columns changed in each line; noutrefresh() copies those ranges into a
+virtual screen and doupdate() then compares the virtual screen with the
+physical one and "writes" the differences.  Nothing is
+actually written: FakeScreen counts the bytes a terminal would have been sent
+(cursor motion, attribute changes and UTF-8 text, estimated from the usual
+ANSI escape sequences) so that rendering cost can be compared between
+revisions.
+
+FakePanel and FakeScreen.update_panels() stand in for curses.panel.
+
+Keys appended to FakeScreen.keys are returned by getch() on any window,
+oldest first, and ungetch() pushes a key back in front of them.
+
+install() patches the curses and curses.panel modules in place and returns
+the FakeScreen; uninstall() restores them.
+'''
+import curses
+import curses.panel
+
+
+A_ALTCHARSET = curses.A_ALTCHARSET
+A_CHARTEXT   = curses.A_CHARTEXT
+A_ATTRIBUTES = curses.A_ATTRIBUTES
+
+ACS = {
+    'ACS_HLINE'    : 'q',
+    'ACS_VLINE'    : 'x',
+    'ACS_ULCORNER' : 'l',
+    'ACS_URCORNER' : 'k',
+    'ACS_LLCORNER' : 'm',
+    'ACS_LRCORNER' : 'j',
+    'ACS_LTEE'     : 't',
+    'ACS_RTEE'     : 'u',
+    'ACS_TTEE'     : 'w',
+    'ACS_BTEE'     : 'v',
+    'ACS_PLUS'     : 'n',
+    'ACS_BLOCK'    : '0',
+    'ACS_CKBOARD'  : 'a',
+    }
+
+BLANK = (' ', 0)
+
+
+def _cell(ch, attr=0):
+    '''
+    Converts a curses character argument (a chtype or a string) and attribute
+    into a (char, attr) cell.
+    '''
+    if isinstance(ch, int):
+        return (chr(ch & A_CHARTEXT), (ch & A_ATTRIBUTES) | attr)
+    if isinstance(ch, bytes):
+        ch = ch.decode('utf-8', 'replace')
+    return (ch, attr)
+
+
+class FakeScreen(object):
+    '''
+    The virtual and physical screens of a fake terminal of size (h, w).
+    '''
+    def __init__(self, h, w):
+        self.doupdates = 0
+        self.bytes     = 0
+        self.stdscr    = None
+        self.panels    = []
+        self.keys      = []
+        self.resize(h, w)
+
+    def resize(self, h, w):
+        '''
+        Changes the terminal size, as if a SIGWINCH had been delivered.  The
+        physical screen is considered garbage afterwards.
+        '''
+        self.h        = h
+        self.w        = w
+        self.virtual  = [[BLANK]*w for _ in range(h)]
+        self.physical = [[None]*w for _ in range(h)]
+        self.cursor   = (0, 0)
+        if self.stdscr is not None:
+            self.stdscr.resize(h, w)
+
+    def reset_counters(self):
+        self.doupdates = 0
+        self.bytes     = 0
+
+    def update_panels(self):
+        '''
+        Copies the changed lines of stdscr and of every visible panel into the
+        virtual screen, bottom first.  As in curses, where a line changed in
+        one window is overlapped by a panel above it, the overlapping columns
+        are first marked as changed in that panel.
+        '''
+        deck = [self.stdscr] + [p.win for p in self.panels if not p._hidden]
+        for i, lower in enumerate(deck):
+            for upper in deck[i + 1:]:
+                for y in lower.touched:
+                    upper.touch_overlap(lower, lower.y + y)
+        for w in deck:
+            w.noutrefresh()
+
+    def doupdate(self):
+        '''
+        Brings the physical screen up to date with the virtual screen and
+        accounts for the bytes that would have been written.
+        '''
+        self.doupdates += 1
+        n      = 0
+        cursor = None
+        attr   = 0
+        for y in range(self.h):
+            vrow = self.virtual[y]
+            prow = self.physical[y]
+            if vrow == prow:
+                continue
+            for x in range(self.w):
+                cell = vrow[x]
+                if cell == prow[x]:
+                    continue
+                if cursor != (y, x):
+                    n += len('\x1b[%u;%uH' % (y + 1, x + 1))
+                if cell[1] != attr:
+                    # One SGR sequence per change, e.g. '\x1b[0;7m'.
+                    n   += 4 + 2*bin(cell[1]).count('1')
+                    attr = cell[1]
+                n      += len(cell[0].encode('utf-8'))
+                prow[x] = cell
+                cursor  = (y, x + 1)
+        if attr:
+            n += len('\x1b[0m')
+        self.bytes += n
+
+
+class FakeWindow(object):
+    '''
+    Implements the subset of the curses window API that tgcurses uses.
+    Writing past the bottom-right corner raises curses.error, as curses does.
+
+    touched maps each changed line to the [x1, x2) range of columns changed
+    in it, which is all that noutrefresh() copies, as in curses.
+
+    A window created with derwin() shares its cells with its parent: rows
+    holds the rows of the top-level window and (oy, ox) is the offset of
+    this window within them.  As in curses, writing to one doesn't mark the
+    other as changed.
+    '''
+    def __init__(self, screen, h, w, y, x, rows=None, oy=0, ox=0):
+        self.screen   = screen
+        self.h        = h
+        self.w        = w
+        self.y        = y
+        self.x        = x
+        self.cy       = 0
+        self.cx       = 0
+        self.attr     = 0
+        self.bg       = BLANK
+        self.delay    = -1
+        self.keymode  = False
+        self._scroll  = False
+        self.rows     = rows if rows is not None else [[BLANK]*w
+                                                       for _ in range(h)]
+        self.oy       = oy
+        self.ox       = ox
+        self.touched  = {}
+        self.touchwin()
+
+    def _row(self, y):
+        return self.rows[self.oy + y][self.ox:self.ox + self.w]
+
+    def _set(self, y, x, cells):
+        x1 = self.ox + x
+        self.rows[self.oy + y][x1:x1 + len(cells)] = cells
+        self._touch(y, x, x + len(cells))
+
+    def _touch(self, y, x1, x2):
+        x1, x2 = max(x1, 0), min(x2, self.w)
+        if x1 >= x2:
+            return
+        span = self.touched.get(y)
+        if span is None:
+            self.touched[y] = [x1, x2]
+        else:
+            span[0] = min(span[0], x1)
+            span[1] = max(span[1], x2)
+
+    def _args(self, args, n):
+        '''
+        Splits optional leading (y, x) coordinates off args, moving the cursor
+        there.
+        '''
+        if len(args) >= n + 2:
+            self.move(args[0], args[1])
+            return args[2:]
+        return args
+
+    def _put(self, cell):
+        if cell[0] == '\n':
+            self._set(self.cy, self.cx, [self.bg]*(self.w - self.cx))
+            self.cx = self.w
+        else:
+            self._set(self.cy, self.cx, [cell])
+            self.cx += 1
+        if self.cx >= self.w:
+            self.cx  = 0
+            self.cy += 1
+            if self.cy >= self.h:
+                self.cy = self.h - 1
+                if not self._scroll:
+                    self.cx = self.w - 1
+                    raise curses.error('addwstr() returned ERR')
+                self.scroll(1)
+
+    def addstr(self, *args):
+        args = self._args(args, 1)
+        text = args[0]
+        attr = (args[1] if len(args) > 1 else 0) | self.attr
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', 'replace')
+        n = len(text)
+        if (n < self.w - self.cx or
+                (n == self.w - self.cx and self.cy + 1 < self.h)):
+            if '\n' not in text:
+                self._set(self.cy, self.cx, [(ch, attr) for ch in text])
+                self.cx += n
+                if self.cx == self.w:
+                    self.cx  = 0
+                    self.cy += 1
+                return
+        for ch in text:
+            self._put((ch, attr))
+
+    def addch(self, *args):
+        args = self._args(args, 1)
+        self._put(_cell(args[0], (args[1] if len(args) > 1 else 0) |
+                        self.attr))
+
+    def hline(self, *args):
+        args = self._args(args, 2)
+        cell = _cell(args[0], self.attr)
+        self._set(self.cy, self.cx, [cell]*min(args[1], self.w - self.cx))
+
+    def border(self):
+        v = _cell(A_ALTCHARSET | ord('x'))
+        h = _cell(A_ALTCHARSET | ord('q'))
+        for y in range(1, self.h - 1):
+            self._set(y, 0, [v])
+            self._set(y, self.w - 1, [v])
+        for y, l, r in ((0, 'l', 'k'), (self.h - 1, 'm', 'j')):
+            self._set(y, 0, [h]*self.w)
+            self._set(y, 0, [_cell(A_ALTCHARSET | ord(l))])
+            self._set(y, self.w - 1, [_cell(A_ALTCHARSET | ord(r))])
+
+    def clrtoeol(self):
+        self._set(self.cy, self.cx, [self.bg]*(self.w - self.cx))
+
+    def erase(self):
+        for y in range(self.h):
+            self._set(y, 0, [self.bg]*self.w)
+
+    clear = erase
+
+    def bkgd(self, ch, attr=0):
+        self.bg = _cell(ch, attr)
+
+    def attron(self, attr):
+        self.attr |= attr
+
+    def attroff(self, attr):
+        self.attr &= ~attr
+
+    def move(self, y, x):
+        if not (0 <= y < self.h and 0 <= x < self.w):
+            raise curses.error('wmove() returned ERR')
+        self.cy, self.cx = y, x
+
+    def getyx(self):
+        return (self.cy, self.cx)
+
+    def getmaxyx(self):
+        return (self.h, self.w)
+
+    def keypad(self, enabled):
+        self.keymode = bool(enabled)
+
+    def scrollok(self, ok):
+        self._scroll = bool(ok)
+
+    def idlok(self, ok):
+        pass
+
+    def scroll(self, dy=1):
+        if not self._scroll:
+            raise curses.error('scroll() returned ERR')
+        rows  = [self._row(y) for y in range(self.h)]
+        blank = [[self.bg]*self.w for _ in range(min(abs(dy), self.h))]
+        if dy > 0:
+            rows = rows[dy:] + blank
+        elif dy < 0:
+            rows = blank + rows[:dy]
+        for y in range(self.h):
+            self._set(y, 0, rows[y])
+
+    def timeout(self, delay):
+        self.delay = delay
+
+    def getch(self):
+        return self.screen.keys.pop(0) if self.screen.keys else -1
+
+    def touchwin(self):
+        self.touched = {y: [0, self.w] for y in range(self.h)}
+
+    def touchline(self, y, n):
+        for row in range(y, min(y + n, self.h)):
+            self._touch(row, 0, self.w)
+
+    def touch_overlap(self, other, sy):
+        '''
+        Marks the columns of the line at screen row sy that overlap the
+        window other as changed, if the windows overlap there.
+        '''
+        if (self.y <= sy < self.y + self.h and other.y <= sy < other.y +
+                other.h):
+            self._touch(sy - self.y, other.x - self.x,
+                        other.x + other.w - self.x)
+
+    def derwin(self, h, w, y, x):
+        if h <= 0 or w <= 0 or y + h > self.h or x + w > self.w:
+            raise curses.error('derwin() returned NULL')
+        return FakeWindow(self.screen, h, w, self.y + y, self.x + x,
+                          self.rows, self.oy + y, self.ox + x)
+
+    def resize(self, h, w):
+        if self.oy or self.ox or len(self.rows) != self.h:
+            raise curses.error('wresize() of a derived window')
+        rows      = [(r + [self.bg]*w)[:w] for r in self.rows[:h]]
+        rows     += [[self.bg]*w for _ in range(h - len(rows))]
+        # Keep the same list so that derived windows still share it.
+        self.rows[:] = rows
+        self.h, self.w = h, w
+        self.cy = min(self.cy, h - 1)
+        self.cx = min(self.cx, w - 1)
+        self.touchwin()
+
+    def mvwin(self, y, x):
+        if y + self.h > self.screen.h or x + self.w > self.screen.w:
+            raise curses.error('mvwin() returned ERR')
+        self.y, self.x = y, x
+
+    def noutrefresh(self):
+        s = self.screen
+        for y, (x1, x2) in self.touched.items():
+            sy = self.y + y
+            if not 0 <= sy < s.h:
+                continue
+            x2 = max(min(x2, s.w - self.x), x1)
+            s.virtual[sy][self.x + x1:self.x + x2] = self._row(y)[x1:x2]
+        self.touched = {}
+        s.cursor     = (self.y + self.cy, self.x + self.cx)
+
+    def refresh(self):
+        self.noutrefresh()
+        self.screen.doupdate()
+
+
+class FakePanel(object):
+    '''
+    Implements the subset of the curses panel API that tgcurses uses.  The
+    screen's panels list is the deck, bottom first.
+    '''
+    def __init__(self, win):
+        self.win     = win
+        self._hidden = False
+        win.screen.panels.append(self)
+
+    def window(self):
+        return self.win
+
+    def _expose(self):
+        # Like curses, mark the parts of the other windows that this panel
+        # covered as changed.
+        s = self.win.screen
+        for w in [s.stdscr] + [p.win for p in s.panels if p is not self]:
+            for y in range(self.win.h):
+                w.touch_overlap(self.win, self.win.y + y)
+
+    def top(self):
+        # Like curses, moving a hidden panel in the deck shows it.
+        if not self._hidden:
+            self._expose()
+        self._hidden = False
+        self.win.screen.panels.remove(self)
+        self.win.screen.panels.append(self)
+        self.win.touchwin()
+
+    def bottom(self):
+        if not self._hidden:
+            self._expose()
+        self._hidden = False
+        self.win.screen.panels.remove(self)
+        self.win.screen.panels.insert(0, self)
+        self.win.touchwin()
+
+    def hide(self):
+        if not self._hidden:
+            self._hidden = True
+            self._expose()
+
+    show = top
+
+    def hidden(self):
+        return self._hidden
+
+    def move(self, y, x):
+        self._expose()
+        self.win.mvwin(y, x)
+        self.win.touchwin()
+
+
+_saved = {}
+
+
+def install(h=24, w=80):
+    '''
+    Replaces the curses functions used by tgcurses with fakes drawing on a
+    new FakeScreen of size (h, w), which is returned.  The screen's stdscr
+    attribute holds the window returned by curses.initscr().
+    '''
+    screen = FakeScreen(h, w)
+
+    def initscr():
+        screen.stdscr = FakeWindow(screen, screen.h, screen.w, 0, 0)
+        return screen.stdscr
+
+    def newwin(h, w, y=0, x=0):
+        if h <= 0 or w <= 0:
+            raise curses.error('curses function returned NULL')
+        return FakeWindow(screen, h, w, y, x)
+
+    def noop(*args):
+        pass
+
+    def ungetch(ch):
+        screen.keys.insert(0, ch)
+
+    fakes = dict(initscr=initscr, newwin=newwin, doupdate=screen.doupdate,
+                 ungetch=ungetch, curs_set=noop, update_lines_cols=noop,
+                 start_color=noop, use_default_colors=noop, noecho=noop,
+                 echo=noop, cbreak=noop, nocbreak=noop, endwin=noop,
+                 has_colors=lambda: True, init_pair=noop,
+                 color_pair=lambda n: n << 8, COLORS=256, COLOR_PAIRS=256)
+    for name, ch in ACS.items():
+        fakes[name] = A_ALTCHARSET | ord(ch)
+    panel_fakes = dict(new_panel=FakePanel,
+                       update_panels=screen.update_panels)
+
+    uninstall()
+    for module, values in ((curses, fakes), (curses.panel, panel_fakes)):
+        for name, value in values.items():
+            _saved[module, name] = getattr(module, name, None)
+            setattr(module, name, value)
+    return screen
+
+
+def uninstall():
+    '''
+    Restores the curses modules to their original state.
+    '''
+    for (module, name), value in _saved.items():
+        if value is None:
+            delattr(module, name)
+        else:
+            setattr(module, name, value)
+    _saved.clear()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+'''
+Measures the heap used by large numbers of menu items and frames.  Run from
+the top of the source tree:
+
+    python3 bench/memory.py
+'''
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tgcurses.canvas import BufferedCanvas
+from tgcurses.layout import StaticFrame, Frame, solve
+from tgcurses.ui import Workspace, Menu
+
+
+def measure(name, n, func):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objs   = func(n)
+    after  = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats  = after.compare_to(before, 'filename')
+    size   = sum(s.size_diff for s in stats)
+    blocks = sum(s.count_diff for s in stats)
+    print('%-24s %9u objs %12u bytes %8.1f bytes/obj %10u allocs' %
+          (name, n, size, size/n, blocks))
+    return objs
+
+
+def make_menu(n):
+    ws  = Workspace(BufferedCanvas.headless(24, 80))
+    win = ws.make_edge_window('Menu', w=40)
+    return Menu(win, ['item %u' % i for i in range(n)], checked=[0])
+
+
+def make_frames(n):
+    root   = StaticFrame(24, 80, 0, 0)
+    frames = [root]
+    for i in range(n):
+        p = frames[-1]
+        frames.append(Frame(left_anchor=p.left_anchor(),
+                            top_anchor=p.top_anchor(),
+                            right_anchor=root.right_anchor(),
+                            height=1))
+    solve(root)
+    return frames
+
+
+def main():
+    measure('Menu items', 1000000, make_menu)
+    measure('Anchored frames', 10000, make_frames)
+
+
+if __name__ == '__main__':
+    main()
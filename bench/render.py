@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+'''
+Rendering benchmarks run against a headless fake terminal (see
+fakecurses.py).  Each scenario is run with Canvas and, where it draws, with
+BufferedCanvas, and reports operations per second, the number of bytes that
+would have been written to the terminal per doupdate(), and the memory
+allocated while running.  Run from the top of the source tree:
+
+    python3 bench/render.py [scenario ...]
+
+With no arguments every scenario is run, followed by the memory benchmarks
+from memory.py.
+'''
+import curses
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import fakecurses
+import memory
+
+import tgcurses
+from tgcurses.canvas import Canvas, BufferedCanvas
+from tgcurses.layout import StaticFrame, Frame, solve
+from tgcurses.ui import Workspace, Menu, EditField
+
+
+SCENARIOS = []
+
+
+def scenario(n, canvas_classes=(Canvas, BufferedCanvas)):
+    '''
+    Registers a scenario to be run for n operations with each of the
+    specified canvas classes.  The decorated function is called with the
+    root canvas and the FakeScreen, performs any setup and returns a callable
+    that performs operation i when called with i.
+    '''
+    def decorator(func):
+        SCENARIOS.append((func.__name__, n, func, canvas_classes))
+        return func
+    return decorator
+
+
+@scenario(2000)
+def menu_scroll(root, screen):
+    ws   = Workspace(root)
+    win  = ws.make_edge_window('Menu', w=40)
+    menu = Menu(win, ['item %u' % i for i in range(10000)])
+    ws.render()
+
+    def step(i):
+        menu.handlech(curses.KEY_DOWN if (i // 500) % 2 == 0 else
+                      curses.KEY_UP)
+        ws.render()
+    return step
+
+
+@scenario(2000)
+def menu_page(root, screen):
+    ws   = Workspace(root)
+    win  = ws.make_edge_window('Menu', w=40)
+    menu = Menu(win, ['item %u' % i for i in range(10000)])
+    ws.render()
+
+    def step(i):
+        menu.handlech(curses.KEY_NPAGE if (i // 100) % 2 == 0 else
+                      curses.KEY_PPAGE)
+        ws.render()
+    return step
+
+
+@scenario(500)
+def window_create(root, screen, share_canvases=False):
+    def step(i):
+        ws = Workspace(root, share_canvases=share_canvases)
+        ws.make_edge_window('Left', w=20)
+        ws.make_edge_window('Right', w=-20)
+        ws.make_edge_window('Top', h=5)
+        ws.make_edge_window('Bottom', h=-5)
+        ws.render()
+        del root.children[:]
+    return step
+
+
+@scenario(500, canvas_classes=(Canvas,))
+def window_create_shared(root, screen):
+    return window_create(root, screen, share_canvases=True)
+
+
+@scenario(2000)
+def popup(root, screen, use_panels=False):
+    ws    = Workspace(root, use_panels=use_panels)
+    left  = ws.make_edge_window('Menu', w=40)
+    right = ws.make_edge_window('Busy', w=-40)
+    menu  = Menu(left, ['item %u' % i for i in range(10000)])
+    busy  = Menu(right, ['line %u' % i for i in range(10000)])
+    popup = ws.make_static_window('Popup', 6, 20, 10, 40)
+    ws.push_modal(popup)
+    ws.render()
+
+    def step(i):
+        menu.handlech(curses.KEY_DOWN if (i // 500) % 2 == 0 else
+                      curses.KEY_UP)
+        busy.handlech(curses.KEY_NPAGE if (i // 50) % 2 == 0 else
+                      curses.KEY_PPAGE)
+        ws.render()
+    return step
+
+
+@scenario(2000)
+def popup_panels(root, screen):
+    return popup(root, screen, use_panels=True)
+
+
+@scenario(200)
+def resize(root, screen, share_canvases=False):
+    ws    = Workspace(root, share_canvases=share_canvases)
+    left  = ws.make_edge_window('Menu', w=40)
+    right = ws.make_edge_window('Log', w=-40)
+    top   = ws.make_edge_window('Status', h=3)
+    menu  = Menu(left, ['item %u' % i for i in range(1000)])
+    ws.render()
+
+    def step(i):
+        screen.resize(*((50, 160) if i % 2 == 0 else (24, 80)))
+        for w in ws.handle_resize():
+            if w is left:
+                menu.draw()
+        ws.render()
+    return step
+
+
+@scenario(200, canvas_classes=(Canvas,))
+def resize_shared(root, screen):
+    return resize(root, screen, share_canvases=True)
+
+
+@scenario(200, canvas_classes=(Canvas,))
+def layout_solve(root, screen):
+    top    = StaticFrame(24, 80, 0, 0)
+    frames = [top]
+    for _ in range(1000):
+        p = frames[-1]
+        frames.append(Frame(left_anchor=p.left_anchor(),
+                            top_anchor=p.top_anchor(),
+                            right_anchor=top.right_anchor(),
+                            height=1))
+    solve(top)
+
+    def step(i):
+        top.resize(*((50, 160, 0, 0) if i % 2 == 0 else (24, 80, 0, 0)))
+        solve(top)
+        frames[-1].bounds
+    return step
+
+
+@scenario(1000)
+def bulk_write(root, screen):
+    ws  = Workspace(root)
+    win = ws.make_edge_window('Bulk')
+    c   = win.content
+    ws.render()
+
+    def step(i):
+        for y in range(c.height - 1):
+            c.addstr('%-*s' % (c.width, 'line %u frame %u' % (y, i)),
+                     pos=(y, 0))
+        c.addstr('%-*s' % (c.width - 1, 'frame %u' % i),
+                 pos=(c.height - 1, 0))
+        ws.render()
+    return step
+
+
+@scenario(2000)
+def edit_field(root, screen):
+    ws    = Workspace(root)
+    win   = ws.make_edge_window('Edit', h=3)
+    field = EditField(win.content, (0, 0), win.content.width - 1,
+                      scroll=True)
+    ws.render()
+
+    def step(i):
+        if i % 100 == 99:
+            field.handlech(curses.KEY_HOME)
+        else:
+            field.handlech(ord('a') + i % 26)
+        ws.render(focus=win.content)
+    return step
+
+
+def run(name, n, func, canvas_class):
+    screen = fakecurses.install(24, 80)
+    try:
+        root = tgcurses.init(canvas_class)
+        step = func(root, screen)
+        screen.reset_counters()
+        t0 = time.perf_counter()
+        for i in range(n):
+            step(i)
+        dt = time.perf_counter() - t0
+        frames = max(screen.doupdates, 1)
+        nbytes = screen.bytes
+
+        # Run the scenario again under tracemalloc, which slows it down too
+        # much to time it at the same time.
+        root = tgcurses.init(canvas_class)
+        step = func(root, screen)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for i in range(n):
+            step(i)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats  = after.compare_to(before, 'filename')
+        blocks = sum(s.count_diff for s in stats)
+    finally:
+        fakecurses.uninstall()
+
+    print('%-20s %-14s %10.0f ops/s %9.0f bytes/frame %8.1f KiB peak '
+          '%7d net allocs' % (name, canvas_class.__name__, n/dt,
+                              nbytes/frames, peak/1024, blocks))
+
+
+def main(names):
+    for name, n, func, canvas_classes in SCENARIOS:
+        if names and name not in names:
+            continue
+        for canvas_class in canvas_classes:
+            run(name, n, func, canvas_class)
+    if not names or 'memory' in names:
+        memory.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
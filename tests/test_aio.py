@@ -0,0 +1,107 @@
+import asyncio
+import curses
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+import fakecurses
+
+import tgcurses
+from tgcurses.canvas import Canvas
+from tgcurses.ui import Workspace
+from tgcurses.ui.aio import AsyncDriver
+
+
+class _Stdin(object):
+    def __init__(self, fd):
+        self.fd = fd
+
+    def fileno(self):
+        return self.fd
+
+
+class AsyncDriverTest(unittest.TestCase):
+    def setUp(self):
+        self.screen = fakecurses.install(24, 80)
+        self.addCleanup(fakecurses.uninstall)
+        self.ws     = Workspace(tgcurses.init(Canvas))
+        self.win    = self.ws.make_edge_window('Left', w=20)
+        self.ws.set_focus(self.win)
+        self.keys   = []
+
+    def run_driver(self, driver, keys):
+        # stdin is a pipe with a byte in it, so the event loop keeps calling
+        # _on_readable(), which reads keys from the fake terminal.
+        r, w = os.pipe()
+        self.addCleanup(os.close, r)
+        self.addCleanup(os.close, w)
+        os.write(w, b'x')
+        self.screen.keys.extend(keys)
+        with mock.patch.object(sys, 'stdin', _Stdin(r)):
+            asyncio.run(asyncio.wait_for(driver.run(), 5))
+
+    def on_key(self, c):
+        self.keys.append(c)
+        if c == ord('q'):
+            self.driver.stop()
+
+    def test_keys(self):
+        consumed        = []
+        self.win.on_key = lambda c: c == ord('a') and not consumed.append(c)
+        self.driver     = AsyncDriver(self.ws, on_key=self.on_key)
+        cwin            = self.win.content._cwin
+        self.win.content.timeout(100)
+        self.run_driver(self.driver, [ord('a'), curses.KEY_DOWN, ord('q'),
+                                      ord('z')])
+
+        # The focused window consumes 'a'; everything up to 'q' falls
+        # through to on_key and the rest stays queued.
+        self.assertEqual(consumed, [ord('a')])
+        self.assertEqual(self.keys, [curses.KEY_DOWN, ord('q')])
+        self.assertEqual(self.screen.keys, [ord('z')])
+        self.assertTrue(cwin.keymode)
+        self.assertEqual(cwin.delay, 100)
+        self.assertGreater(self.screen.doupdates, 0)
+
+    def test_resize(self):
+        resized     = []
+        self.driver = AsyncDriver(self.ws, on_key=self.on_key,
+                                  on_resize=resized.append)
+        self.screen.resize(30, 100)
+        self.run_driver(self.driver, [curses.KEY_RESIZE, curses.KEY_RESIZE,
+                                      ord('q')])
+
+        # A burst of KEY_RESIZE events results in a single relayout.
+        self.assertEqual(resized, [[self.win]])
+        self.assertEqual(self.keys, [ord('q')])
+        self.assertEqual(self.win.border.height, 30)
+
+    def test_request_redraw(self):
+        driver = AsyncDriver(self.ws)
+
+        async def main():
+            task = asyncio.ensure_future(driver.run())
+            await asyncio.sleep(0)
+            self.screen.reset_counters()
+            for _ in range(3):
+                self.win.content.addstr('x', pos=(0, 0))
+                driver.request_redraw()
+            await asyncio.sleep(0)
+            driver.stop()
+            await task
+
+        r, w = os.pipe()
+        self.addCleanup(os.close, r)
+        self.addCleanup(os.close, w)
+        with mock.patch.object(sys, 'stdin', _Stdin(r)):
+            asyncio.run(main())
+
+        # Requests made before the loop goes idle are coalesced.
+        self.assertEqual(self.screen.doupdates, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import curses
+import unittest
+
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.layout import StaticFrame
+from tgcurses.layout.bounds import Bounds
+
+
+class _RecordingWin(object):
+    '''
+    Minimal curses window that records the text written to it.
+    '''
+    def __init__(self):
+        self.writes = []
+
+    def addstr(self, y, x, text, attr=0):
+        self.writes.append((y, x, text, attr))
+
+    def move(self, y, x):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+    def touchwin(self):
+        pass
+
+    def scrollok(self, ok):
+        pass
+
+    def scroll(self, dy):
+        pass
+
+
+def _canvas(h, w):
+    cwin = _RecordingWin()
+    return BufferedCanvas(None, StaticFrame(h, w, 0, 0), cwin), cwin
+
+
+class TestBufferedCanvas(unittest.TestCase):
+    def test_headless(self):
+        c = BufferedCanvas.headless(3, 10)
+        c.addstr('hello', pos=(1, 2))
+        self.assertEqual(c.row_text(1), '  hello   ')
+        self.assertEqual(c.cell(1, 2), ('h', 0))
+        self.assertEqual(c.damage, {1: [2, 7]})
+        self.assertTrue(c.offscreen)
+
+        c.noutrefresh()
+        self.assertEqual(c.damage, {})
+
+    def test_damage_merges_spans(self):
+        c = BufferedCanvas.headless(3, 10)
+        c.addstr('ab', pos=(0, 1))
+        c.addstr('cd', pos=(0, 6))
+        self.assertEqual(c.damage, {0: [1, 8]})
+
+    def test_attron(self):
+        c = BufferedCanvas.headless(1, 10)
+        c.attron(curses.A_BOLD)
+        c.addstr('a', attr=curses.A_REVERSE)
+        c.attroff(curses.A_BOLD)
+        c.addstr('b')
+        self.assertEqual(c.cell(0, 0)[1], curses.A_BOLD | curses.A_REVERSE)
+        self.assertEqual(c.cell(0, 1)[1], 0)
+
+    def test_fill_rect_clipped(self):
+        # Filling past the right edge neither spills into the next row nor
+        # grows the grid.
+        c = BufferedCanvas.headless(2, 5)
+        c.fill_rect(Bounds(3, 0, 8, 2), '#')
+        self.assertEqual([c.row_text(y) for y in range(2)], ['   ##']*2)
+        self.assertEqual(len(c._chars), 10)
+        self.assertEqual(len(c._attrs), 10)
+        self.assertEqual(c.damage, {0: [3, 5], 1: [3, 5]})
+        c.fill_rect(Bounds(6, 0, 8, 2), '#')
+        self.assertEqual(len(c._chars), 10)
+
+    def test_flush_writes_only_changes(self):
+        c, cwin = _canvas(2, 10)
+        c.addstr('hello', pos=(0, 0))
+        c.noutrefresh()
+        self.assertEqual(cwin.writes, [(0, 0, 'hello', 0)])
+        del cwin.writes[:]
+
+        # Rewriting identical cells writes nothing.
+        c.addstr('hello', pos=(0, 0))
+        c.noutrefresh()
+        self.assertEqual(cwin.writes, [])
+
+        # Only the changed run is written.
+        c.addstr('help!', pos=(0, 0))
+        c.noutrefresh()
+        self.assertEqual(cwin.writes, [(0, 3, 'p!', 0)])
+
+    def test_flush_splits_on_attributes(self):
+        c, cwin = _canvas(1, 10)
+        c.noutrefresh()
+        del cwin.writes[:]
+        c.addstr('ab', pos=(0, 0))
+        c.addstr('cd', attr=curses.A_BOLD)
+        c.noutrefresh()
+        self.assertEqual(cwin.writes, [(0, 0, 'ab', 0),
+                                       (0, 2, 'cd', curses.A_BOLD)])
+
+    def test_touch_rewrites_everything(self):
+        c, cwin = _canvas(2, 4)
+        c.addstr('abcd', pos=(0, 0))
+        c.noutrefresh()
+        del cwin.writes[:]
+        c.touch()
+        c.noutrefresh()
+        self.assertEqual(cwin.writes, [(0, 0, 'abcd', 0),
+                                       (1, 0, '    ', 0)])
+
+    def test_scroll_keeps_flushed_rows(self):
+        c, cwin = _canvas(3, 4)
+        c.scrollok(True)
+        c.addstr('a\nb\nc')
+        c.touch()
+        c.noutrefresh()
+        del cwin.writes[:]
+
+        # The curses window scrolls too, so only the row scrolled into view
+        # is written.
+        c.addstr('\nd')
+        self.assertEqual([c.row_text(y) for y in range(3)],
+                         ['b   ', 'c   ', 'd   '])
+        c.noutrefresh()
+        self.assertEqual(cwin.writes, [(2, 0, 'd   ', 0)])
+
+    def test_write_past_end(self):
+        c = BufferedCanvas.headless(1, 3)
+        with self.assertRaises(curses.error):
+            c.addstr('abcd')
+        self.assertEqual(c.row_text(0), 'abc')
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class TestWideCells(unittest.TestCase):
+    def test_wide_char(self):
+        c = BufferedCanvas.headless(1, 6)
+        c.addstr('a日b')
+        self.assertEqual(c.row_text(0), 'a日b  ')
+        self.assertEqual(c.cell(0, 1), ('日', 0))
+        self.assertEqual(c.cell(0, 2), ('', 0))
+        self.assertEqual(c.getyx(), (0, 4))
+
+    def test_wrap_at_last_column(self):
+        # A wide character doesn't fit in the last column, so it wraps whole
+        # and leaves that cell blank.
+        c = BufferedCanvas.headless(3, 5)
+        c.addstr('abcd日x')
+        self.assertEqual([c.row_text(y) for y in range(3)],
+                         ['abcd ', '日x  ', '     '])
+
+    def test_overwrite_half(self):
+        c = BufferedCanvas.headless(1, 6)
+        c.addstr('日本', pos=(0, 0))
+        c.addstr('x', pos=(0, 1))
+        self.assertEqual(c.row_text(0), ' x本  ')
+        c.addstr('y', pos=(0, 2))
+        self.assertEqual(c.row_text(0), ' xy   ')
+
+    def test_wide_bytes(self):
+        c = BufferedCanvas.headless(1, 6)
+        c.addstr('a日b'.encode('utf-8'))
+        self.assertEqual(c.row_text(0), 'a日b  ')
+        self.assertEqual(c.damage, {0: [0, 4]})
+
+    def test_combining(self):
+        c = BufferedCanvas.headless(1, 4)
+        c.addstr('éx')
+        self.assertEqual(c.row_text(0), 'éx  ')
+
+    def test_flush_wide(self):
+        c, cwin = _canvas(1, 6)
+        c.addstr('日本', pos=(0, 0))
+        c.noutrefresh()
+        self.assertEqual(cwin.writes, [(0, 0, '日本', 0)])
+        del cwin.writes[:]
+
+        # Overwriting the second half of a wide character also rewrites the
+        # blanked first half.
+        c.addstr('x', pos=(0, 3))
+        c.noutrefresh()
+        self.assertEqual(cwin.writes, [(0, 2, ' x', 0)])
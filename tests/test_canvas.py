@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+import fakecurses
+
+import tgcurses
+from tgcurses.layout import StaticFrame
+from tgcurses.ui import Workspace
+
+
+class CanvasTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(fakecurses.uninstall)
+        self.screen = fakecurses.install(24, 80)
+        self.root   = tgcurses.init()
+        self.canvas = self.root.make_canvas(StaticFrame(4, 10, 2, 2))
+        self.canvas.noutrefresh()
+
+    def row(self, y):
+        return ''.join(c for c, _ in self.canvas._cwin._row(y))
+
+    def test_damage(self):
+        c = self.canvas
+        c.addstr('abc', pos=(1, 2))
+        c.addstr('de', pos=(1, 7))
+        self.assertEqual(c.damage, {1: [2, 9]})
+        c.noutrefresh()
+        self.assertEqual(c.damage, {})
+
+    def test_damage_clamped(self):
+        c = self.canvas
+        # Spans wrap onto the next row like curses; cells left of or past
+        # the canvas are dropped.
+        c.add_damage(0, 8, 5)
+        c.add_damage(2, -3, 5)
+        c.add_damage(3, 10, 1)
+        self.assertEqual(c.damage, {0: [8, 10], 1: [0, 3], 2: [0, 2]})
+
+    def test_addstr_bytes(self):
+        c = self.canvas
+        c.addstr(b'abc', pos=(0, 1))
+        self.assertEqual(c.damage, {0: [1, 4]})
+        self.assertEqual(self.row(0), ' abc      ')
+        c.noutrefresh()
+        c.addstr(b'x\ny', pos=(2, 0))
+        self.assertEqual(c.damage, {2: [0, 10], 3: [0, 10]})
+
+    def test_addstr_wide(self):
+        c = self.canvas
+        c.addstr('日本', pos=(0, 1))
+        self.assertEqual(c.damage, {0: [1, 5]})
+        c.noutrefresh()
+        c.addstr('日本'.encode('utf-8'), pos=(1, 1))
+        self.assertEqual(c.damage, {1: [1, 5]})
+
+    def test_long_title(self):
+        ws  = Workspace(self.root)
+        win = ws.make_static_window('A title much too long to fit', 0, 0,
+                                    5, 12)
+        ws.render()
+        self.assertEqual(''.join(c for c, _ in self.screen.virtual[0][:12]),
+                         'lqqA title…k')
+
+
+if __name__ == '__main__':
+    unittest.main()
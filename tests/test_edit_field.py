@@ -0,0 +1,90 @@
+import curses
+import unittest
+
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.ui.edit_field import EditField, CTRL_A, CTRL_E, CTRL_K, CTRL_Y
+
+
+class TestEditField(unittest.TestCase):
+    def make_field(self, width=6, text='', scroll=True):
+        self.canvas = BufferedCanvas.headless(1, width + 2)
+        return EditField(self.canvas, (0, 1), width, text=text,
+                         scroll=scroll)
+
+    def assertField(self, field, text, cursor):
+        # cursor is the screen column of the edit point.
+        field.move()
+        self.assertEqual(self.canvas.row_text(0)[1:-1], text)
+        self.assertEqual(self.canvas.getyx(), (0, cursor))
+
+    def type(self, field, text):
+        for ch in text:
+            self.assertTrue(field.handlech(ord(ch)))
+
+    def test_scroll(self):
+        field = self.make_field()
+        self.type(field, 'abcdef')
+        self.assertEqual(field.left, 1)
+        self.assertField(field, 'bcdef ', 6)
+
+        field.handlech(curses.KEY_HOME)
+        self.assertEqual((field.text_pos, field.left), (0, 0))
+        self.assertField(field, 'abcdef', 1)
+
+        field.handlech(curses.KEY_END)
+        self.assertEqual((field.text_pos, field.left), (6, 1))
+        self.assertField(field, 'bcdef ', 6)
+
+        for _ in range(5):
+            field.handlech(curses.KEY_LEFT)
+        self.assertField(field, 'bcdef ', 1)
+        field.handlech(curses.KEY_LEFT)
+        self.assertField(field, 'abcdef', 1)
+
+        field.handlech(CTRL_E)
+        field.handlech(curses.KEY_BACKSPACE)
+        self.assertField(field, 'bcde  ', 5)
+        field.handlech(CTRL_A)
+        field.handlech(CTRL_K)
+        self.assertField(field, '      ', 1)
+        self.assertEqual(field.killed, 'abcde')
+        field.handlech(CTRL_Y)
+        self.assertField(field, 'abcde ', 6)
+
+    def test_wide(self):
+        field = self.make_field()
+        self.type(field, 'ab')
+        field.insert('日本語')
+        self.assertEqual(field.left, 3)
+        self.assertField(field, '本語  ', 5)
+
+        field.handlech(curses.KEY_HOME)
+        self.assertField(field, 'ab日本', 1)
+        field.handlech(curses.KEY_RIGHT)
+        field.handlech(curses.KEY_RIGHT)
+        field.handlech(curses.KEY_RIGHT)
+        self.assertField(field, 'ab日本', 5)
+
+        # The edit point moves onto '語', which is two columns wide, so the
+        # field scrolls until the whole character fits.
+        field.handlech(curses.KEY_RIGHT)
+        self.assertEqual(field.left, 2)
+        self.assertField(field, '日本語', 5)
+
+        field.handlech(curses.KEY_HOME)
+        field.handlech(curses.KEY_DC)
+        self.assertField(field, 'b日本 ', 1)
+
+    def test_no_scroll(self):
+        field = self.make_field(text='x', scroll=False)
+        field.set_text_pos(1)
+        field.insert('日本語')
+        self.assertEqual(field.text, 'x日本')
+        self.assertField(field, 'x日本 ', 6)
+        field.insert('yz')
+        self.assertEqual(field.text, 'x日本y')
+        self.assertField(field, 'x日本y', 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
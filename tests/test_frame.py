@@ -0,0 +1,66 @@
+import unittest
+
+from tgcurses.layout import Frame, StaticFrame
+
+
+def _edges(frame):
+    b = frame.bounds
+    return (b.x1, b.y1, b.x2, b.y2)
+
+
+class TestFrameBounds(unittest.TestCase):
+    def setUp(self):
+        self.root  = StaticFrame(24, 80, 0, 0)
+        self.inset = self.root.make_inset_frame(1, 2)
+
+    def test_bounds(self):
+        self.assertEqual(_edges(self.root), (0, 0, 80, 24))
+        self.assertEqual(_edges(self.inset), (2, 1, 78, 23))
+
+    def test_bounds_cached(self):
+        self.assertIs(self.inset.bounds, self.inset.bounds)
+
+    def test_resize_invalidates_dependents(self):
+        sub = self.inset.make_inset_frame(1, 1)
+        self.assertEqual(_edges(sub), (3, 2, 77, 22))
+        gen = sub.generation
+
+        self.root.resize(30, 100, 0, 0)
+        self.assertGreater(sub.generation, gen)
+        self.assertEqual(_edges(self.inset), (2, 1, 98, 29))
+        self.assertEqual(_edges(sub), (3, 2, 97, 28))
+
+    def test_invalidate_skips_unresolved(self):
+        # A dependent whose bounds were never requested has nothing to drop,
+        # so invalidation stops there.
+        sub = self.inset.make_inset_frame(1, 1)
+        self.inset.bounds
+        self.inset.invalidate()
+        self.assertIsNone(self.inset._bounds)
+        self.assertIsNone(sub._bounds)
+        self.assertEqual(_edges(sub), (3, 2, 77, 22))
+
+    def test_long_chain(self):
+        # Invalidation must not recurse once per frame in the chain.
+        frames = [self.root]
+        for _ in range(5000):
+            frames.append(Frame(left_anchor=frames[-1].left_anchor(),
+                                top_anchor=frames[-1].top_anchor(),
+                                width=1, height=1))
+        for f in frames[1:]:
+            f.bounds
+        self.root.resize(24, 80, 1, 1)
+        self.assertTrue(all(f._bounds is None for f in frames[1:]))
+        for f in frames[1:]:
+            f.bounds
+        self.assertEqual(_edges(frames[-1]), (1, 1, 2, 2))
+
+    def test_dependents_are_weak(self):
+        sub = self.root.make_inset_frame(1, 1)
+        self.assertIn(sub, self.root.dependents)
+        del sub
+        self.assertEqual(self.root.dependents, [self.inset])
+
+
+if __name__ == '__main__':
+    unittest.main()
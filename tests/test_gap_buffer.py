@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from tgcurses.ui.gap_buffer import GapBuffer
+
+
+class TestGapBuffer(unittest.TestCase):
+    def test_edit(self):
+        b = GapBuffer('hello world', gap=2)
+        self.assertEqual(b.point, 11)
+        b.move(5)
+        b.insert(', big')
+        self.assertEqual(str(b), 'hello, big world')
+        self.assertEqual(b.point, 10)
+        self.assertEqual(b.delete_back(5), ', big')
+        self.assertEqual(b.delete_forward(), ' ')
+        self.assertEqual(str(b), 'helloworld')
+        self.assertEqual(len(b), 10)
+        self.assertEqual(b.delete_forward(100), 'world')
+        self.assertEqual(b.delete_back(100), 'hello')
+        self.assertEqual(str(b), '')
+
+    def test_indexing(self):
+        b = GapBuffer('abcdef')
+        b.move(3)
+        self.assertEqual([b[i] for i in range(6)], list('abcdef'))
+        self.assertEqual(b[-1], 'f')
+        with self.assertRaises(IndexError):
+            b[6]
+
+    def test_slice(self):
+        b = GapBuffer('abcdef')
+        for point in range(7):
+            b.move(point)
+            for start in range(-1, 8):
+                for end in range(-1, 8):
+                    self.assertEqual(b.slice(start, end),
+                                     'abcdef'[max(start, 0):max(end, 0)],
+                                     (point, start, end))
+
+    def test_move_clamps(self):
+        b = GapBuffer('abc')
+        b.move(-5)
+        self.assertEqual(b.point, 0)
+        b.move(50)
+        self.assertEqual(b.point, 3)
+
+    def test_random_edits(self):
+        rng  = random.Random(1)
+        b    = GapBuffer(gap=1)
+        text = ''
+        for _ in range(2000):
+            pos = rng.randrange(len(text) + 1)
+            b.move(pos)
+            op = rng.randrange(3)
+            if op == 0:
+                s    = ''.join(rng.choice('xyz')
+                               for _ in range(rng.randrange(5)))
+                b.insert(s)
+                text = text[:pos] + s + text[pos:]
+            elif op == 1:
+                n    = rng.randrange(4)
+                b.delete_back(n)
+                text = text[:max(pos - n, 0)] + text[pos:]
+            else:
+                n    = rng.randrange(4)
+                b.delete_forward(n)
+                text = text[:pos] + text[pos + n:]
+            self.assertEqual(str(b), text)
+            self.assertEqual(len(b), len(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import curses
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+import fakecurses
+
+import tgcurses
+from tgcurses import instrument
+from tgcurses.canvas import Canvas, BufferedCanvas
+from tgcurses.ui import Workspace, Menu
+
+
+class InstrumentTest(unittest.TestCase):
+    def setUp(self):
+        self.screen = fakecurses.install(24, 80)
+        self.addCleanup(fakecurses.uninstall)
+        self.addCleanup(instrument.disable)
+        self.ws = Workspace(tgcurses.init(Canvas))
+
+    def test_counting(self):
+        stats = instrument.enable()
+        self.assertIs(instrument.enable(), stats)
+        self.assertIs(instrument.stats(), stats)
+
+        win  = self.ws.make_edge_window('Files', w=20)
+        menu = Menu(win, ['item %u' % i for i in range(5)])
+        self.ws.render()
+        self.assertEqual(stats.frames, 1)
+        self.assertGreater(stats.layouts, 0)
+        self.assertEqual(stats.draws['Menu(Files)'], 1)
+        self.assertEqual(stats.draws['Window(Files)'], 1)
+        self.assertEqual([l for l, _, _ in stats.slowest(1)],
+                         [max(stats.draw_time, key=stats.draw_time.get)])
+
+        # Only the outermost call is counted: addcells() draws with
+        # addstr(), which isn't counted again.
+        stats.reset()
+        win.content.addcells('abc', [0, curses.A_BOLD, 0], pos=(0, 0))
+        self.assertEqual(stats.calls, {'addcells': 1})
+        self.assertEqual(stats.cells, 3)
+        win.content.addstr('xy', pos=(1, 0))
+        self.assertEqual(stats.calls, {'addcells': 1, 'addstr': 1})
+        self.assertEqual(stats.cells, 5)
+
+        menu.select_next()
+        self.ws.render()
+        self.assertEqual(stats.frames, 1)
+        self.assertEqual(len(stats.report()), 2 + len(stats.draw_time))
+
+    def test_disable(self):
+        originals = {cls: dict(vars(cls))
+                     for cls in (Canvas, BufferedCanvas, Menu)}
+        doupdate  = curses.doupdate
+        stats     = instrument.enable()
+        self.assertIsNot(vars(Canvas)['addstr'], originals[Canvas]['addstr'])
+        self.assertIsNot(curses.doupdate, doupdate)
+
+        self.assertIs(instrument.disable(), stats)
+        self.assertIsNone(instrument.stats())
+        self.assertIsNone(instrument.disable())
+        for cls, attrs in originals.items():
+            self.assertEqual(dict(vars(cls)), attrs, cls.__name__)
+        self.assertIs(curses.doupdate, doupdate)
+
+        # Nothing is counted once disabled.
+        win = self.ws.make_edge_window('Files', w=20)
+        win.content.addstr('x')
+        self.ws.render()
+        self.assertEqual(stats.calls, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
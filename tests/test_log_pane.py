@@ -0,0 +1,94 @@
+import curses
+import unittest
+from unittest import mock
+
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.ui.log_pane import LogPane
+
+
+class _Window(object):
+    def __init__(self, h, w):
+        self.content = BufferedCanvas.headless(h, w)
+
+
+def _rows(pane):
+    c = pane.window.content
+    return [c.row_text(y).rstrip() for y in range(c.height)]
+
+
+class TestLogPane(unittest.TestCase):
+    def assertDrawn(self, pane):
+        # The incrementally drawn canvas must match a full redraw.
+        content = pane.window.content
+        full    = LogPane(_Window(content.height, content.width),
+                          capacity=pane.lines.maxlen, wrap=pane.wrap)
+        full.extend(pane.lines)
+        full.offset = pane.offset
+        full.draw()
+        self.assertEqual(_rows(pane), _rows(full))
+
+    def test_incremental(self):
+        pane  = LogPane(_Window(4, 10))
+        lines = ['line %u' % i for i in range(12)]
+        lines[5] = 'a long line that wraps'
+        with mock.patch.object(pane, '_draw_rows',
+                               wraps=pane._draw_rows) as draw_rows:
+            for batch in ([0], [1, 2], [3, 4], [5], [6, 7, 8]):
+                draw_rows.reset_mock()
+                pane.extend(lines[i] for i in batch)
+                pane.draw()
+                self.assertDrawn(pane)
+
+                # Only the rows of the new lines are drawn.
+                drawn = sum(len(c.args[0]) for c in draw_rows.call_args_list)
+                self.assertEqual(drawn, sum(len(pane._wrap(lines[i]))
+                                            for i in batch))
+        self.assertEqual(_rows(pane), ['ps', 'line 6', 'line 7', 'line 8'])
+
+        # A burst of a screenful or more is drawn in full.
+        pane.extend(lines[9:12] + ['x', 'y'])
+        pane.draw()
+        self.assertDrawn(pane)
+        self.assertEqual(_rows(pane), ['line 10', 'line 11', 'x', 'y'])
+
+        # Drawing again without new lines draws nothing.
+        with mock.patch.object(pane, '_draw_rows') as draw_rows:
+            pane.draw()
+        draw_rows.assert_not_called()
+
+    def test_scroll_back(self):
+        pane = LogPane(_Window(3, 10), capacity=8, wrap=False)
+        pane.extend('line %u' % i for i in range(10))
+        pane.draw()
+        self.assertEqual(_rows(pane), ['line 7', 'line 8', 'line 9'])
+
+        self.assertTrue(pane.handlech(curses.KEY_UP))
+        self.assertEqual(_rows(pane), ['line 6', 'line 7', 'line 8'])
+
+        # While scrolled back, new lines don't move the view.
+        pane.append('line 10')
+        pane.draw()
+        self.assertEqual(_rows(pane), ['line 6', 'line 7', 'line 8'])
+        self.assertDrawn(pane)
+
+        # The view stops at the oldest line still in the buffer.
+        pane.handlech(curses.KEY_HOME)
+        self.assertEqual(_rows(pane)[0], 'line 3')
+        self.assertDrawn(pane)
+
+        pane.handlech(curses.KEY_END)
+        self.assertEqual(_rows(pane), ['line 8', 'line 9', 'line 10'])
+        pane.append('line 11')
+        pane.draw()
+        self.assertEqual(_rows(pane), ['line 9', 'line 10', 'line 11'])
+        self.assertFalse(pane.handlech(ord('x')))
+
+    def test_truncate(self):
+        pane = LogPane(_Window(2, 8), wrap=False)
+        pane.append('a long line\tthat is truncated')
+        pane.draw()
+        self.assertEqual(_rows(pane), ['a long l', ''])
+
+
+if __name__ == '__main__':
+    unittest.main()
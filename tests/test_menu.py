@@ -0,0 +1,124 @@
+import unittest
+from unittest import mock
+
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.ui.menu import Menu, VirtualMenu, PagedSource
+
+
+class _Window(object):
+    def __init__(self, h, w):
+        self.content = BufferedCanvas.headless(h, w)
+
+
+def _rows(menu):
+    c = menu.window.content
+    return [c.row_text(y) for y in range(c.height)]
+
+
+class TestMenu(unittest.TestCase):
+    def make_menu(self, n=20, rows=5):
+        return Menu(_Window(rows, 12), ['item %u' % i for i in range(n)])
+
+    def assertDrawn(self, menu):
+        # The incrementally updated canvas must match a full redraw.
+        expected = Menu(_Window(menu.window.content.height,
+                                menu.window.content.width),
+                        [item.name for item in menu.items])
+        expected.top       = menu.top
+        expected.selection = menu.selection
+        expected.draw()
+        self.assertEqual(_rows(menu), _rows(expected))
+
+    def test_draw(self):
+        menu = self.make_menu()
+        self.assertEqual(_rows(menu), ['item 0      ', 'item 1      ',
+                                       'item 2      ', 'item 3      ',
+                                       'item 4     ↓'])
+
+    def test_select_next_scrolls_one_row(self):
+        menu = self.make_menu()
+        with mock.patch.object(menu, '_draw_item',
+                               wraps=menu._draw_item) as draw_item:
+            for i in range(1, 8):
+                draw_item.reset_mock()
+                self.assertTrue(menu.select_next())
+                self.assertEqual(menu.selection, i)
+                self.assertDrawn(menu)
+
+                # Scrolling redraws the exposed row, the arrow rows and the
+                # selection, not the whole viewport.
+                self.assertLessEqual(draw_item.call_count, 6)
+        self.assertEqual(menu.top, 3)
+
+        for i in range(6, -1, -1):
+            self.assertTrue(menu.select_prev())
+            self.assertEqual(menu.selection, i)
+            self.assertDrawn(menu)
+        self.assertFalse(menu.select_prev())
+        self.assertEqual(menu.top, 0)
+
+    def test_page_and_jump(self):
+        menu = self.make_menu()
+        menu.select_page_down()
+        self.assertEqual((menu.selection, menu.top), (5, 1))
+        self.assertDrawn(menu)
+        menu.select_page_down()
+        self.assertEqual((menu.selection, menu.top), (10, 6))
+        self.assertDrawn(menu)
+        menu.select_page_up()
+        self.assertEqual((menu.selection, menu.top), (5, 5))
+        self.assertDrawn(menu)
+        menu.select_last()
+        self.assertEqual((menu.selection, menu.top), (19, 15))
+        self.assertDrawn(menu)
+        self.assertFalse(menu.select_next())
+        menu.select_page_down()
+        self.assertEqual(menu.selection, 19)
+        menu.select_first()
+        self.assertEqual((menu.selection, menu.top), (0, 0))
+        self.assertDrawn(menu)
+        menu.select_page_up()
+        self.assertEqual(menu.selection, 0)
+
+
+class TestVirtualMenu(unittest.TestCase):
+    def test_paged_source(self):
+        fetched = []
+
+        def fetch(start, count):
+            fetched.append(start)
+            return ['row %u' % i for i in range(start, min(start + count,
+                                                           1000))]
+
+        source = PagedSource(fetch, 1000, page_size=10, max_pages=2)
+        menu   = VirtualMenu(_Window(5, 12), source)
+        self.assertEqual(len(menu), 1000)
+        self.assertEqual(fetched, [0])
+        self.assertEqual(_rows(menu)[0], 'row 0       ')
+
+        # Only the pages holding visible items are fetched, and the least
+        # recently used page is evicted.
+        menu.select(500)
+        self.assertEqual(fetched, [0, 490, 500])
+        self.assertEqual(_rows(menu)[-1], 'row 500    ↓')
+        self.assertEqual(list(source._pages), [49, 50])
+        menu.select(495)
+        self.assertEqual(fetched, [0, 490, 500])
+
+        source.invalidate()
+        menu.draw()
+        self.assertEqual(fetched, [0, 490, 500, 490])
+
+    def test_checkable(self):
+        menu = VirtualMenu(_Window(3, 12), ['a', 'b', 'c'], checked=[1])
+        menu.toggle_item(0)
+        menu.uncheck_item(1)
+        menu.check_item(2)
+        menu.draw()
+        self.assertEqual(menu.checked, {0, 2})
+        self.assertEqual(_rows(menu), ['[x] a       ', '[ ] b       ',
+                                       '[x] c       '])
+
+
+if __name__ == '__main__':
+    unittest.main()
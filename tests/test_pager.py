@@ -0,0 +1,186 @@
+import curses
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.ui.pager import LineIndex, Pager
+
+
+def _text(n):
+    return b''.join(b'line %u%s\n' % (i, b'x'*(i % 7)) for i in range(n))
+
+
+class TestLineIndex(unittest.TestCase):
+    def _index(self, buf, block_size=16):
+        index = LineIndex(buf, len(buf), block_size=block_size)
+        index.build()
+        return index
+
+    def test_offset_of_line(self):
+        buf   = _text(100)
+        index = self._index(buf)
+        starts = [0] + [i + 1 for i, b in enumerate(buf) if b == 0x0A][:-1]
+        self.assertTrue(index.complete)
+        self.assertEqual(index.line_count, 100)
+        for n, offset in enumerate(starts):
+            self.assertEqual(index.offset_of_line(n), offset)
+        self.assertEqual(index.offset_of_line(-1), 0)
+
+    def test_line_of_offset(self):
+        buf   = _text(50)
+        index = self._index(buf)
+        for offset in range(len(buf) + 1):
+            self.assertEqual(index.line_of_offset(offset),
+                             buf[:offset].count(b'\n'))
+
+    def test_unterminated_last_line(self):
+        index = self._index(b'a\nb\nc')
+        self.assertEqual(index.line_count, 3)
+        self.assertEqual(index.offset_of_line(2), 4)
+        self.assertEqual(self._index(b'').line_count, 0)
+
+    def test_partial_index(self):
+        # A partly built index covers a prefix of the buffer.
+        buf   = _text(100)
+        index = LineIndex(buf, len(buf), block_size=64)
+        index.counts.append(buf[:64].count(b'\n'))
+        self.assertFalse(index.complete)
+        self.assertEqual(index.indexed_bytes, 64)
+        n = index.counts[-1]
+        self.assertEqual(index.line_count, n)
+        self.assertEqual(index.offset_of_line(n + 10),
+                         index.offset_of_line(n))
+        self.assertIsNone(index.line_of_offset(65))
+
+    def test_background_build(self):
+        buf   = _text(1000)
+        index = LineIndex(buf, len(buf), block_size=256)
+        index.start()
+        index._thread.join()
+        index.stop()
+        self.assertTrue(index.complete)
+        self.assertEqual(index.line_count, 1000)
+
+
+class _Window(object):
+    def __init__(self, h, w):
+        self.content = BufferedCanvas.headless(h, w)
+
+
+class _CountingBuf(object):
+    '''
+    Wraps a buffer and counts the calls to find().
+    '''
+    def __init__(self, buf):
+        self.buf   = buf
+        self.finds = 0
+
+    def __getitem__(self, index):
+        return self.buf[index]
+
+    def find(self, *args):
+        self.finds += 1
+        return self.buf.find(*args)
+
+    def rfind(self, *args):
+        return self.buf.rfind(*args)
+
+    def close(self):
+        self.buf.close()
+
+
+class TestPager(unittest.TestCase):
+    def open_pager(self, data, h=4, w=12, **kwargs):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.unlink, path)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        pager = Pager(_Window(h, w), path, **kwargs)
+        self.addCleanup(pager.close)
+        return pager
+
+    @staticmethod
+    def rows(pager):
+        c = pager.window.content
+        return [c.row_text(y).rstrip() for y in range(c.height)]
+
+    def test_scroll(self):
+        pager = self.open_pager(b''.join(b'line %u\n' % i for i in range(20)))
+        pager.index._thread.join()
+        self.assertEqual(self.rows(pager), ['line 0', 'line 1', 'line 2',
+                                            'line 3'])
+        pager.handlech(curses.KEY_DOWN)
+        self.assertEqual(self.rows(pager)[0], 'line 1')
+        pager.handlech(curses.KEY_NPAGE)
+        self.assertEqual((self.rows(pager)[0], pager.top_line), ('line 5', 5))
+        pager.handlech(curses.KEY_UP)
+        self.assertEqual(self.rows(pager)[0], 'line 4')
+        pager.handlech(curses.KEY_END)
+        self.assertEqual(self.rows(pager), ['line 16', 'line 17', 'line 18',
+                                            'line 19'])
+        self.assertEqual(pager.top_line, 16)
+        pager.handlech(curses.KEY_DOWN)
+        self.assertEqual(self.rows(pager), ['line 17', 'line 18', 'line 19',
+                                            ''])
+        pager.handlech(curses.KEY_HOME)
+        self.assertEqual((self.rows(pager)[0], pager.top_line), ('line 0', 0))
+        self.assertEqual(pager.percent, 0)
+
+        pager.goto_line(18)
+        pager.draw()
+        self.assertEqual(self.rows(pager), ['line 18', 'line 19', '', ''])
+
+    def test_horizontal_scroll(self):
+        pager = self.open_pager(b'0123456789abcdefghij\n\t\xe6\x97\xa5x\n')
+        pager.handlech(curses.KEY_RIGHT)
+        self.assertEqual(self.rows(pager)[:2], ['89abcdefghij', '日x'])
+        pager.handlech(curses.KEY_LEFT)
+        self.assertEqual(self.rows(pager)[:2], ['0123456789ab',
+                                                '        日x'])
+
+    def test_cached_line_ends(self):
+        pager = self.open_pager(b''.join(b'line %u\n' % i for i in range(20)))
+        pager.buf = buf = _CountingBuf(pager.buf)
+        pager.draw()
+        self.assertEqual(buf.finds, 0)
+
+        # Scrolling by a line only finds the end of the line brought into
+        # view.
+        pager.handlech(curses.KEY_DOWN)
+        self.assertEqual(buf.finds, 1)
+        pager.handlech(curses.KEY_UP)
+        self.assertEqual(buf.finds, 2)
+        self.assertEqual(self.rows(pager)[0], 'line 0')
+
+    def test_partial_index(self):
+        data = b''.join(b'line %u\n' % i for i in range(100))
+        with mock.patch.object(LineIndex, 'start'):
+            pager = self.open_pager(data, block_size=64)
+
+        # Until the index is built, line numbers beyond it go to the last
+        # indexed line and percentages leave the line number unknown.
+        pager.index.counts.append(data[:64].count(b'\n'))
+        n = pager.index.counts[-1]
+        pager.handlech(curses.KEY_DOWN)
+        self.assertEqual(pager.top_line, 1)
+        pager.goto_line(50)
+        pager.draw()
+        self.assertEqual(pager.top_line, n)
+        self.assertEqual(self.rows(pager)[0], 'line %u' % n)
+        pager.goto_percent(50)
+        pager.draw()
+        self.assertIsNone(pager.top_line)
+        self.assertEqual(self.rows(pager)[0], 'line 50')
+        pager.scroll_down()
+        self.assertIsNone(pager.top_line)
+
+        pager.index.build()
+        pager.goto_line(70)
+        pager.draw()
+        self.assertEqual(self.rows(pager)[0], 'line 70')
+
+
+if __name__ == '__main__':
+    unittest.main()
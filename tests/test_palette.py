@@ -0,0 +1,94 @@
+import curses
+import unittest
+from unittest import mock
+
+from tgcurses import palette
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.layout import StaticFrame
+from tgcurses.palette import Palette
+
+
+class TestColors(unittest.TestCase):
+    def test_rgb_to_256(self):
+        self.assertEqual(palette.rgb_to_256((255, 0, 0)), 196)
+        self.assertEqual(palette.rgb_to_256((0, 0, 0)), 16)
+        self.assertEqual(palette.rgb_to_256((128, 128, 128)), 244)
+        self.assertEqual(palette.TO_16[196], 9)
+        self.assertEqual(palette.TO_8[196], 1)
+
+    def test_color(self):
+        p = Palette(colors=256, pairs=256)
+        self.assertEqual(p.color(None), -1)
+        self.assertEqual(p.color(-1), -1)
+        self.assertEqual(p.color(42), 42)
+        self.assertEqual(p.color((255, 0, 0)), 196)
+        for c in (256, 300, -2):
+            with self.assertRaises(ValueError):
+                p.color(c)
+
+    def test_downsample(self):
+        self.assertEqual(Palette(colors=16, pairs=64).color(196), 9)
+        self.assertEqual(Palette(colors=8, pairs=64).color(196), 1)
+        self.assertEqual(Palette(colors=8, pairs=64).color(3), 3)
+
+
+class TestPalette(unittest.TestCase):
+    def setUp(self):
+        self.pairs = {}
+        patches = [
+            mock.patch.object(curses, 'init_pair', self._init_pair,
+                              create=True),
+            mock.patch.object(curses, 'color_pair', lambda n: n << 8,
+                              create=True),
+            ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _init_pair(self, n, fg, bg):
+        self.pairs[n] = (fg, bg)
+
+    def test_attr(self):
+        p = Palette(colors=256, pairs=256)
+        a = p.attr(1, 2, curses.A_BOLD)
+        self.assertEqual(a, (1 << 8) | curses.A_BOLD)
+        self.assertEqual(self.pairs, {1: (1, 2)})
+
+        # The same colors reuse the pair, whatever the other attributes.
+        self.assertEqual(p.attr(1, 2), 1 << 8)
+        self.assertEqual(p.attr(3, None), 2 << 8)
+        self.assertEqual(self.pairs, {1: (1, 2), 2: (3, -1)})
+
+    def test_lru_eviction(self):
+        p = Palette(colors=256, pairs=4)
+        self.assertEqual([p.attr(c) >> 8 for c in (1, 2, 3)], [1, 2, 3])
+
+        # Pair 1 was least recently used until it was looked up again, so
+        # pair 2 is redefined.
+        p.attr(1)
+        self.assertEqual(p.attr(4) >> 8, 2)
+        self.assertEqual(self.pairs[2], (4, -1))
+
+        # The cached attribute for the evicted colors is stale and must be
+        # reallocated.
+        self.assertEqual(p.attr(2) >> 8, 3)
+        self.assertEqual(self.pairs[3], (2, -1))
+        self.assertEqual(p.attr(1) >> 8, 1)
+        self.assertEqual(len(p.pairs), 3)
+
+    def test_no_colors(self):
+        p = Palette(colors=2, pairs=0)
+        self.assertEqual(p.attr(1, 2, curses.A_BOLD), curses.A_BOLD)
+        self.assertEqual(self.pairs, {})
+
+    def test_canvas_palette(self):
+        root  = BufferedCanvas.headless(10, 10)
+        child = root.make_canvas(StaticFrame(2, 2, 1, 1))
+        self.assertIsNone(child.palette)
+        p            = Palette(colors=256, pairs=256)
+        root.palette = p
+        self.assertIs(child.palette, p)
+
+
+if __name__ == '__main__':
+    unittest.main()
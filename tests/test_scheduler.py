@@ -0,0 +1,81 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+import fakecurses
+
+import tgcurses
+from tgcurses.canvas import Canvas
+from tgcurses.ui import Workspace, RenderScheduler
+
+
+class RenderSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.screen = fakecurses.install(24, 80)
+        self.addCleanup(fakecurses.uninstall)
+        self.ws     = Workspace(tgcurses.init(Canvas))
+        self.win    = self.ws.make_edge_window('Log', w=20)
+        self.ws.render()
+        self.now    = 100.0
+        self.sched  = RenderScheduler(self.ws, fps=10,
+                                      clock=lambda: self.now)
+        self.screen.reset_counters()
+
+    def screen_text(self, y, x, n):
+        return ''.join(c for c, _ in self.screen.virtual[y][x:x + n])
+
+    def test_coalescing(self):
+        c = self.win.content
+        self.assertIsNone(self.sched.time_until_flush())
+        self.assertFalse(self.sched.flush())
+        for i in range(5):
+            c.addstr('line %u' % i, pos=(0, 0))
+            c.update()
+
+        # Updates only mark the canvas dirty until the next flush.
+        self.assertEqual(self.screen.doupdates, 0)
+        self.assertEqual(self.sched.dirty, {c})
+        self.assertEqual(self.sched.time_until_flush(), 0)
+        self.assertTrue(self.sched.flush())
+        self.assertEqual(self.screen.doupdates, 1)
+        self.assertEqual(self.screen_text(1, 1, 6), 'line 4')
+
+        # Further flushes are held back to the frame rate.
+        c.addstr('line 5', pos=(0, 0))
+        c.update()
+        self.now += 0.04
+        self.assertAlmostEqual(self.sched.time_until_flush(), 0.06)
+        self.assertFalse(self.sched.flush())
+        self.assertEqual(self.screen.doupdates, 1)
+        self.now += 0.06
+        self.assertTrue(self.sched.flush())
+        self.assertEqual(self.screen.doupdates, 2)
+        self.assertEqual(self.screen_text(1, 1, 6), 'line 5')
+        self.assertEqual(self.sched.flushes, 2)
+
+    def test_force_and_uninstall(self):
+        c = self.win.content
+        c.addstr('a', pos=(0, 0))
+        c.update()
+        self.assertTrue(self.sched.flush())
+        c.addstr('b', pos=(0, 0))
+        c.update()
+        self.assertTrue(self.sched.flush(force=True))
+        self.assertEqual(self.screen.doupdates, 2)
+
+        c.addstr('c', pos=(0, 0))
+        c.update()
+        self.sched.uninstall()
+        self.assertEqual(self.screen.doupdates, 3)
+        self.assertEqual(self.screen_text(1, 1, 1), 'c')
+
+        # Without a scheduler, update() reaches the virtual screen at once.
+        c.addstr('d', pos=(0, 0))
+        c.update()
+        self.assertEqual(self.screen_text(1, 1, 1), 'd')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from tgcurses.layout import Frame, StaticFrame, solve, LayoutCycleError
+from tgcurses.layout import solver
+
+
+def _anchored(frame, dx=0, dy=0):
+    return Frame(left_anchor=frame.left_anchor(dx),
+                 top_anchor=frame.top_anchor(dy), width=1, height=1)
+
+
+class TestSolver(unittest.TestCase):
+    def setUp(self):
+        self.root = StaticFrame(24, 80, 0, 0)
+
+    def test_order(self):
+        a = _anchored(self.root, 1, 1)
+        b = _anchored(a, 1, 1)
+        c = Frame(left_anchor=a.left_anchor(), right_anchor=b.right_anchor(),
+                  top_anchor=self.root.top_anchor(), height=1)
+        order = solve(self.root)
+        self.assertEqual(len(order), 4)
+        for f, deps in ((a, [self.root]), (b, [a]), (c, [a, b, self.root])):
+            for d in deps:
+                self.assertLess(order.index(d), order.index(f))
+        self.assertEqual((c.bounds.x1, c.bounds.x2), (1, 3))
+
+    def test_long_chain(self):
+        # Resolving the last frame directly would recurse through the whole
+        # chain; solve() resolves it in a single pass.
+        f = self.root
+        for _ in range(5000):
+            f = _anchored(f, 1)
+        solve(self.root)
+        self.assertEqual(f.bounds.x1, 5000)
+
+    def test_cycle(self):
+        a = _anchored(self.root)
+        b = _anchored(a)
+        c = _anchored(b)
+        # The public constructors can't build a cycle, so close one by hand.
+        a._left_anchor = c.left_anchor()
+        c._add_dependent(a)
+        with self.assertRaises(LayoutCycleError):
+            solver.sort(self.root)
+        with self.assertRaises(LayoutCycleError):
+            solve(self.root)
+
+
+if __name__ == '__main__':
+    unittest.main()
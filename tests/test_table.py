@@ -0,0 +1,84 @@
+import unittest
+
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.ui.table import Column, Table
+
+
+class _Window(object):
+    def __init__(self, h, w):
+        self.content = BufferedCanvas.headless(h, w)
+
+
+ROWS = [('pear', 3), ('apple', 10), ('fig', 1), ('kiwi', 7)]
+
+
+def _table(rows=ROWS, h=6, w=20):
+    columns = [Column('Name'),
+               Column('N', width=3, align='>', key=lambda v: -v)]
+    return Table(_Window(h, w), columns, rows)
+
+
+class TestTable(unittest.TestCase):
+    def _names(self, table):
+        return [table.rows[table.row_index(p)][0] for p in range(len(table))]
+
+    def test_sort(self):
+        t = _table()
+        self.assertEqual(self._names(t), ['pear', 'apple', 'fig', 'kiwi'])
+        t.sort(0)
+        self.assertEqual(self._names(t), ['apple', 'fig', 'kiwi', 'pear'])
+        t.sort(0, reverse=True)
+        self.assertEqual(self._names(t), ['pear', 'kiwi', 'fig', 'apple'])
+        t.sort(1)
+        self.assertEqual(self._names(t), ['apple', 'kiwi', 'pear', 'fig'])
+        t.sort(None)
+        self.assertEqual(self._names(t), ['pear', 'apple', 'fig', 'kiwi'])
+
+    def test_sort_cached(self):
+        t = _table()
+        t.sort(0)
+        perm = t._perm
+        t.sort(1)
+        t.sort(0)
+        self.assertIs(t._perm, perm)
+
+    def test_sort_stable(self):
+        # Rows with equal keys stay in their original order in both
+        # directions, whichever direction is sorted first.
+        rows = [('b', 1), ('a', 1), ('c', 2), ('d', 1), ('e', 2)]
+        for first in (False, True):
+            t = _table(rows)
+            t.sort(1, reverse=first)
+            t.sort(1, reverse=not first)
+            t.sort(1, reverse=first)
+            for reverse, names in ((False, ['c', 'e', 'b', 'a', 'd']),
+                                   (True, ['b', 'a', 'd', 'c', 'e'])):
+                t.sort(1, reverse=reverse)
+                self.assertEqual(self._names(t), names, (first, reverse))
+
+    def test_invalidate(self):
+        rows = list(ROWS)
+        t    = _table(rows)
+        t.sort(0)
+        rows.append(('banana', 2))
+        t.invalidate()
+        self.assertEqual(self._names(t),
+                         ['apple', 'banana', 'fig', 'kiwi', 'pear'])
+
+    def test_draw(self):
+        t = _table()
+        t.sort(0)
+        c = t.window.content
+        self.assertEqual(c.row_text(0), 'Name               N')
+        self.assertEqual(c.row_text(1), 'apple             10')
+        self.assertEqual(c.row_text(5), ' '*20)
+
+    def test_column_widths(self):
+        columns = [Column('a', flex=1), Column('b', flex=3),
+                   Column('c', width=5)]
+        t = Table(_Window(3, 30), columns, [])
+        self.assertEqual(t.column_widths(), [7, 16, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from tgcurses import text
+
+
+class TestText(unittest.TestCase):
+    def test_char_width(self):
+        self.assertEqual(text.char_width('a'), 1)
+        self.assertEqual(text.char_width('日'), 2)
+        self.assertEqual(text.char_width('Ａ'), 2)
+        self.assertEqual(text.char_width('́'), 0)
+        self.assertEqual(text.char_width('\t'), 0)
+        self.assertEqual(text.char_width('é'), 1)
+
+    def test_text_width(self):
+        self.assertEqual(text.text_width('abc'), 3)
+        self.assertEqual(text.text_width('a日b'), 4)
+        self.assertEqual(text.text_width('é'), 1)
+        # Control characters are zero-width on the fast path too.
+        self.assertEqual(text.text_width('a\x01b'), 2)
+        self.assertEqual(text.text_width(''), 0)
+
+    def test_truncate(self):
+        self.assertEqual(text.truncate('abcdef', 3), 'abc')
+        self.assertEqual(text.truncate('abc', -1), '')
+        self.assertEqual(text.truncate('日本語', 5), '日本')
+        self.assertEqual(text.truncate('日本語', 1), '')
+        self.assertEqual(text.truncate('aéb', 2), 'aé')
+
+    def test_columns(self):
+        self.assertEqual(text.columns('abcdef', 2, 3), 'cde')
+        self.assertEqual(text.columns('日本語', 2, 2), '本')
+        # Wide characters straddling either edge are left out.
+        self.assertEqual(text.columns('日本語', 1, 4), '本')
+        self.assertEqual(text.columns('日本語', 0, 3), '日')
+
+    def test_fit(self):
+        E = text.ELLIPSIS
+        self.assertEqual(text.fit('abc', 5), 'abc  ')
+        self.assertEqual(text.fit('abc', 5, align='>'), '  abc')
+        self.assertEqual(text.fit('abc', 5, pad=False), 'abc')
+        self.assertEqual(text.fit('abcdef', 4), 'abc' + E)
+        self.assertEqual(text.fit('abcdef', 4, ellipsis=''), 'abcd')
+        self.assertEqual(text.fit('abc', 1), 'a')
+        self.assertEqual(text.fit('abc', 0), '')
+        self.assertEqual(text.fit('日本語', 6), '日本語')
+        self.assertEqual(text.fit('日本語', 5), '日本' + E)
+        self.assertEqual(text.fit('日本語', 4), '日' + E + ' ')
+        self.assertEqual(text.fit('a\tb', 10), 'a       b ')
+        for s in ('日本語abc', 'ééé', 'a\tb日'):
+            for width in range(1, 12):
+                self.assertEqual(text.text_width(text.fit(s, width)), width)
+
+    def test_wrap(self):
+        self.assertEqual(text.wrap('abcdefg', 3), ['abc', 'def', 'g'])
+        self.assertEqual(text.wrap('abc', 3), ['abc'])
+        self.assertEqual(text.wrap('', 3), [''])
+        self.assertEqual(text.wrap('abc', 0), ['abc'])
+        # A wide character that doesn't fit starts the next row.
+        self.assertEqual(text.wrap('ab日c', 3), ['ab', '日c'])
+        self.assertEqual(text.wrap('ábc', 2), ['áb', 'c'])
+        self.assertEqual(text.wrap('a\tb', 4), ['a   ', '    ', 'b'])
+        for s in ('日本語abc日', 'ab日本cd'):
+            for width in range(2, 8):
+                rows = text.wrap(s, width)
+                self.assertEqual(''.join(rows), s)
+                self.assertTrue(all(text.text_width(r) <= width
+                                    for r in rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import curses
+import unittest
+
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.ui.text_area import TextArea
+
+
+class _Window(object):
+    def __init__(self, h, w):
+        self.content = BufferedCanvas.headless(h, w)
+
+
+def _area(text='', h=3, w=12):
+    return TextArea(_Window(h, w), text)
+
+
+def _rows(area):
+    c = area.window.content
+    return [c.row_text(y) for y in range(c.height)]
+
+
+class TestTextArea(unittest.TestCase):
+    def test_edit(self):
+        a = _area('one\ntwo')
+        a.move_cursor(0, 3)
+        a.insert_text('!\nnew')
+        self.assertEqual(a.text, 'one!\nnew\ntwo')
+        a.handlech(curses.KEY_BACKSPACE)
+        a.handlech(curses.KEY_BACKSPACE)
+        a.handlech(curses.KEY_BACKSPACE)
+        a.handlech(curses.KEY_BACKSPACE)
+        self.assertEqual(a.text, 'one!\ntwo')
+        self.assertEqual((a.row, a.col), (0, 4))
+        a.handlech(curses.KEY_DC)
+        self.assertEqual(a.text, 'one!two')
+        self.assertEqual(_rows(a), ['one!two     ', ' '*12, ' '*12])
+
+    def test_tabs(self):
+        a = _area('a\tb')
+        self.assertEqual(a.text, 'a       b')
+        a.move_cursor(0, 1)
+        a.insert_text('\t')
+        # The tab is expanded from the column it was inserted at.
+        self.assertEqual(a.text, 'a       ' + '       b')
+        self.assertEqual(a.col, 8)
+
+    def test_tabs_after_wide(self):
+        # Tab stops are display columns, so wide characters count twice.
+        a = _area('日本\tx', w=20)
+        self.assertEqual(a.text, '日本    x')
+        a.move_cursor(0, 1)
+        a.insert_text('\t')
+        self.assertEqual(a.text, '日      本    x')
+        self.assertEqual(a.window.content.getyx(), (0, 8))
+
+    def test_wide_cursor(self):
+        a = _area('日本語', w=12)
+        a.move_cursor(0, 2)
+        self.assertEqual(a.window.content.getyx(), (0, 4))
+        self.assertEqual(_rows(a)[0], '日本語      ')
+
+    def test_horizontal_scroll(self):
+        a = _area('日本語日本語日本語')
+        a.move_cursor(0, 9)
+        self.assertEqual(a.left, 4)
+        self.assertEqual(a.window.content.getyx(), (0, 10))
+        self.assertEqual(_rows(a)[0], '本語日本語  ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import random
+import unittest
+
+from tgcurses.canvas.buffered import BufferedCanvas
+from tgcurses.ui.menu import Menu
+from tgcurses.ui.type_ahead import TypeAheadIndex
+
+
+NAMES = ['Apple', 'banana', 'Grape', 'pineapple', 'apricot', 'Straße']
+
+
+def _brute(query, mode):
+    query = query.casefold()
+    if mode == 'prefix':
+        return sorted((i for i, n in enumerate(NAMES)
+                       if n.casefold().startswith(query)),
+                      key=lambda i: NAMES[i].casefold())
+    return [i for i, n in enumerate(NAMES) if query in n.casefold()]
+
+
+class TestTypeAheadIndex(unittest.TestCase):
+    def _check(self, index, query):
+        self.assertEqual(list(index.results), _brute(query, index.mode),
+                         '%s %r' % (index.mode, query))
+
+    def test_push_pop(self):
+        for mode in ('substring', 'prefix'):
+            index = TypeAheadIndex(NAMES, mode=mode)
+            self._check(index, '')
+            for i, ch in enumerate('APPle'):
+                index.push(ch)
+                self._check(index, 'APPle'[:i + 1])
+            for i in range(4, -1, -1):
+                index.pop()
+                self._check(index, 'apple'[:i])
+            index.pop()
+            self._check(index, '')
+
+    def test_search(self):
+        for mode in ('substring', 'prefix'):
+            index = TypeAheadIndex(NAMES, mode=mode)
+            for query in ('ap', 'apr', 'a', 'ine', 'x', 'GRAPE', ''):
+                self.assertEqual(list(index.search(query)),
+                                 _brute(query, mode))
+
+    def test_casefold_expansion(self):
+        # 'ß' folds to 'ss'; each folded character is a separate entry, so
+        # push and pop stay in step with the query.
+        for mode in ('substring', 'prefix'):
+            index = TypeAheadIndex(NAMES, mode=mode)
+            for ch in 'straß':
+                index.push(ch)
+            self.assertEqual(index.query, 'strass')
+            self._check(index, 'strass')
+            index.pop()
+            self.assertEqual(index.query, 'stras')
+            self._check(index, 'stras')
+            self.assertEqual(list(index.search('STRASSE')), [5])
+
+    def test_posting_lists(self):
+        # Long queries are narrowed by the rarest trigram; check the results
+        # against a brute-force scan both before and after the posting lists
+        # are built.
+        rng   = random.Random(0)
+        names = [''.join(rng.choice('abcab-') for _ in range(rng.randrange(9)))
+                 for _ in range(500)]
+        keys  = [n.casefold() for n in names]
+        index = TypeAheadIndex(names, background=True)
+        for q in ('a', 'ab', 'abc', 'abca', 'abcab', 'b-a', 'b-ab', 'cc'):
+            self.assertEqual(list(index.search(q)),
+                             [i for i, k in enumerate(keys) if q in k], q)
+        index._thread.join()
+        self.assertTrue(index.complete)
+        for q in ('a', 'ab', 'abc', 'abca', 'abcab', 'b-a', 'b-ab', 'cc', ''):
+            self.assertEqual(list(index.search(q)),
+                             [i for i, k in enumerate(keys) if q in k], q)
+
+    def test_stop(self):
+        index = TypeAheadIndex(NAMES, background=True)
+        index.stop()
+        self.assertIsNone(index._thread)
+        self.assertEqual(list(index.search('ap')), _brute('ap', 'substring'))
+
+
+class _Window(object):
+    def __init__(self, h, w):
+        self.content = BufferedCanvas.headless(h, w)
+
+
+class TestMenuFilter(unittest.TestCase):
+    def test_filter(self):
+        menu = Menu(_Window(4, 10), NAMES)
+        self.assertEqual(menu.type_ahead.mode, 'prefix')
+        menu.filter('ap')
+        self.assertEqual([menu.item_index(i) for i in range(len(menu))],
+                         [0, 4])
+        self.assertEqual(menu.window.content.row_text(0).rstrip(), 'Apple')
+
+        menu.filter_mode = 'substring'
+        menu.filter('ap')
+        self.assertEqual(menu.type_ahead.mode, 'substring')
+        self.assertEqual([menu.item_index(i) for i in range(len(menu))],
+                         [0, 2, 3, 4])
+
+    def test_invalidate_filter(self):
+        menu = Menu(_Window(4, 10), NAMES, filter_mode='substring')
+        index = menu.type_ahead
+        self.assertIsNotNone(index)
+        menu.filter('ap')
+        menu.items[1].name = 'Papaya'
+        menu.invalidate_filter()
+        self.assertIsNot(menu.type_ahead, index)
+        self.assertEqual(len(menu), len(NAMES))
+        menu.filter('ap')
+        self.assertEqual([menu.item_index(i) for i in range(len(menu))],
+                         [0, 1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import threading
+import unittest
+
+from tgcurses.ui.update_queue import UpdateQueue
+
+
+class TestUpdateQueue(unittest.TestCase):
+    def test_order(self):
+        q   = UpdateQueue()
+        out = []
+        q.post(out.append, 1)
+        q.post_latest('k', out.append, 'latest')
+        q.post(out.append, 2)
+        self.assertEqual(len(q), 3)
+        self.assertEqual(q.drain(), 3)
+        self.assertEqual(out, [1, 2, 'latest'])
+        self.assertEqual(len(q), 0)
+        self.assertEqual(q.drain(), 0)
+
+    def test_drop_oldest(self):
+        q   = UpdateQueue(maxlen=3)
+        out = []
+        for i in range(5):
+            q.post(out.append, i)
+        self.assertEqual(q.dropped, 2)
+        q.drain()
+        self.assertEqual(out, [2, 3, 4])
+
+    def test_post_latest_coalesces(self):
+        q   = UpdateQueue()
+        out = []
+        for i in range(3):
+            q.post_latest('a', out.append, ('a', i))
+            q.post_latest('b', out.append, ('b', i))
+        self.assertEqual(q.drain(), 2)
+        self.assertEqual(out, [('a', 2), ('b', 2)])
+
+    def test_max_items(self):
+        calls = []
+        q     = UpdateQueue(notify=lambda: calls.append(1))
+        out   = []
+        for i in range(5):
+            q.post(out.append, i)
+        self.assertEqual(len(calls), 1)
+
+        # A partial drain signals again so that the rest isn't forgotten.
+        self.assertEqual(q.drain(max_items=2), 2)
+        self.assertEqual(out, [0, 1])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(q.drain(), 3)
+        self.assertEqual(out, [0, 1, 2, 3, 4])
+        self.assertEqual(len(calls), 2)
+
+    def test_notify_once_per_drain(self):
+        calls = []
+        q     = UpdateQueue(notify=lambda: calls.append(1))
+        q.post(int)
+        q.post_latest('k', int)
+        q.post(int)
+        self.assertEqual(len(calls), 1)
+        q.drain()
+        q.post(int)
+        self.assertEqual(len(calls), 2)
+
+    def test_block(self):
+        q   = UpdateQueue(maxlen=2, policy='block')
+        out = []
+        q.post(out.append, 0)
+        q.post(out.append, 1)
+
+        t = threading.Thread(target=q.post, args=(out.append, 2))
+        t.start()
+        t.join(0.05)
+        self.assertTrue(t.is_alive())
+        q.drain()
+        t.join(5)
+        self.assertFalse(t.is_alive())
+        q.drain()
+        self.assertEqual(out, [0, 1, 2])
+        self.assertEqual(q.dropped, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import curses
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+import fakecurses
+
+import tgcurses
+from tgcurses.canvas import Canvas
+from tgcurses.ui import Workspace
+
+
+class WindowChromeTest(unittest.TestCase):
+    '''
+    Checks that a Window's border and title are only redrawn when its size,
+    hilite state or title change.
+    '''
+    def setUp(self):
+        self.screen = fakecurses.install(24, 80)
+        self.addCleanup(fakecurses.uninstall)
+        self.ws  = Workspace(tgcurses.init(Canvas))
+        self.win = self.ws.make_edge_window('Files', w=20)
+        self.ws.render()
+        self.calls = []
+        for name in ('border', 'hline', 'addstr', 'erase'):
+            orig = getattr(self.win.border, name)
+            setattr(self.win.border, name,
+                    mock.Mock(side_effect=self._record(name, orig)))
+
+    def _record(self, name, orig):
+        def record(*args, **kwargs):
+            self.calls.append(name)
+            return orig(*args, **kwargs)
+        return record
+
+    def top_row(self):
+        self.ws.render()
+        return ''.join(c for c, _ in self.screen.virtual[0][:20])
+
+    def test_unchanged(self):
+        self.win.show()
+        self.win.dehilite()
+        self.win.title = 'Files'
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.top_row(), 'lqqFilesqqqqqqqqqqqk')
+
+    def test_hilite(self):
+        self.win.hilite()
+        self.assertEqual(self.calls, ['addstr'])
+        self.ws.render()
+        self.assertEqual(self.screen.virtual[0][2:9],
+                         [('q', curses.A_ALTCHARSET)] +
+                         [(c, curses.A_REVERSE) for c in 'Files'] +
+                         [('q', curses.A_ALTCHARSET)])
+        self.win.hilite()
+        self.assertEqual(self.calls, ['addstr'])
+
+    def test_title(self):
+        self.win.title = 'Src'
+        self.assertEqual(self.calls, ['hline', 'addstr'])
+        self.assertEqual(self.top_row(), 'lqqSrcqqqqqqqqqqqqqk')
+
+        # Long titles are truncated to fit the border.
+        self.win.title = 'A very long window title'
+        self.assertEqual(self.top_row(), 'lqqA very long win…k')
+
+    def test_resize(self):
+        # Widening the terminal doesn't change the window's size.
+        self.screen.resize(24, 100)
+        self.assertEqual(self.ws.handle_resize(), [])
+        self.assertEqual(self.calls, [])
+
+        self.screen.resize(30, 100)
+        self.assertEqual(self.ws.handle_resize(), [self.win])
+        self.assertEqual(self.calls, ['erase', 'border', 'addstr'])
+        self.ws.render()
+        self.assertEqual(self.screen.virtual[29][0],
+                         ('m', curses.A_ALTCHARSET))
+
+        del self.calls[:]
+
+        self.win.invalidate()
+        self.win.show()
+        self.assertEqual(self.calls, ['border', 'addstr'])
+        self.assertEqual(self.top_row(), 'lqqFilesqqqqqqqqqqqk')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+import curses
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+import fakecurses
+
+import tgcurses
+from tgcurses.canvas import Canvas, BufferedCanvas
+from tgcurses.layout.bounds import Bounds
+from tgcurses.ui import Workspace
+
+
+MODES = [(Canvas, False, False), (Canvas, True, False), (Canvas, False, True),
+         (Canvas, True, True), (BufferedCanvas, False, False),
+         (BufferedCanvas, True, False)]
+
+
+def _describe(mode):
+    canvas_class, use_panels, share_canvases = mode
+    return '%s%s%s' % (canvas_class.__name__, ' panels'*use_panels,
+                       ' shared'*share_canvases)
+
+
+def _paint(screen, win):
+    for y in range(win.h):
+        sy = win.y + y
+        if 0 <= sy < screen.h:
+            n = max(min(win.w, screen.w - win.x), 0)
+            screen_row = screen.expected[sy]
+            screen_row[win.x:win.x + n] = win._row(y)[:n]
+
+
+class WorkspaceTest(unittest.TestCase):
+    '''
+    Composes windows on a fake terminal and checks that the virtual screen
+    shows each visible window's curses window over those stacked below it.
+    '''
+    def setUp(self):
+        self.addCleanup(fakecurses.uninstall)
+
+    def workspace(self, canvas_class, use_panels, share_canvases):
+        self.screen = fakecurses.install(24, 80)
+        root        = tgcurses.init(canvas_class)
+        return Workspace(root, use_panels=use_panels,
+                         share_canvases=share_canvases)
+
+    def make_window(self, ws, title, y, x, h, w):
+        win = ws.make_static_window(title, y, x, h, w)
+        self.fill(win)
+        return win
+
+    @staticmethod
+    def fill(win):
+        c = win.content
+        for row in range(c.height):
+            c.addstr(win.title[-1]*(c.width - (row == c.height - 1)),
+                     pos=(row, 0))
+        c.update()
+
+    def assertScreen(self, ws):
+        s          = self.screen
+        s.expected = [list(row) for row in s.virtual]
+        _paint(s, s.stdscr)
+        for w in ws.windows:
+            if w.visible:
+                _paint(s, w.border._cwin)
+                if not w.content.shared:
+                    _paint(s, w.content._cwin)
+        self.assertEqual(self.rows(s.virtual), self.rows(s.expected))
+        self.assertEqual(s.virtual, s.expected)
+
+    @staticmethod
+    def rows(cells):
+        return [''.join(c for c, _ in row) for row in cells]
+
+    def test_make_window(self):
+        for mode in MODES:
+            with self.subTest(mode=_describe(mode)):
+                ws = self.workspace(*mode)
+                ws.render()
+                w1 = self.make_window(ws, 'W1', 2, 2, 10, 30)
+                w2 = self.make_window(ws, 'W2', 5, 10, 10, 30)
+                ws.render()
+                self.assertScreen(ws)
+                self.assertIn('W2', self.rows(self.screen.virtual)[5])
+
+    def test_raise_lower(self):
+        for mode in MODES:
+            with self.subTest(mode=_describe(mode)):
+                ws = self.workspace(*mode)
+                w1 = self.make_window(ws, 'W1', 2, 2, 10, 30)
+                w2 = self.make_window(ws, 'W2', 5, 10, 10, 30)
+                w3 = self.make_window(ws, 'W3', 8, 20, 10, 30)
+                ws.render()
+                for op, w in ((ws.raise_window, w1), (ws.lower_window, w3),
+                              (ws.raise_window, w2), (ws.lower_window, w2),
+                              (ws.raise_window, w3)):
+                    op(w)
+                    ws.render()
+                    self.assertScreen(ws)
+
+    def test_hide_show(self):
+        for mode in MODES:
+            with self.subTest(mode=_describe(mode)):
+                ws = self.workspace(*mode)
+                w1 = self.make_window(ws, 'W1', 2, 2, 10, 30)
+                w2 = self.make_window(ws, 'W2', 5, 10, 10, 30)
+                w3 = self.make_window(ws, 'W3', 8, 20, 10, 30)
+                ws.render()
+                for op in (w2.hide, w2.show, w3.hide, w1.hide, w3.show,
+                           w1.show):
+                    op()
+                    ws.render()
+                    self.assertScreen(ws)
+
+    def test_modal(self):
+        for mode in MODES:
+            with self.subTest(mode=_describe(mode)):
+                ws    = self.workspace(*mode)
+                w1    = self.make_window(ws, 'W1', 0, 0, 20, 40)
+                w2    = self.make_window(ws, 'W2', 0, 40, 20, 40)
+                popup = self.make_window(ws, 'Popup', 6, 20, 8, 40)
+                popup.hide()
+                ws.set_focus(w1)
+                ws.render(focus=w1.content)
+                ws.push_modal(popup)
+                ws.render(focus=popup.content)
+                self.assertScreen(ws)
+                ws.pop_modal()
+                ws.render(focus=w1.content)
+                self.assertScreen(ws)
+
+                # Moving a hidden window in the stacking order keeps it hidden.
+                ws.lower_window(popup)
+                ws.raise_window(popup)
+                ws.render(focus=w1.content)
+                self.assertScreen(ws)
+                self.assertFalse(any('Popup' in r
+                                     for r in self.rows(self.screen.virtual)))
+
+                popup.show()
+                ws.render()
+                self.assertScreen(ws)
+
+    def test_focus(self):
+        for mode in MODES:
+            with self.subTest(mode=_describe(mode)):
+                ws = self.workspace(*mode)
+                w1 = self.make_window(ws, 'W1', 2, 2, 10, 30)
+                w2 = self.make_window(ws, 'W2', 1, 10, 10, 30)
+                ws.render()
+
+                # Changing the focus redraws the titles, which lie in border
+                # rows partly covered by the other window.
+                for w in (w1, w2, w1, None):
+                    ws.set_focus(w)
+                    ws.render(focus=w.content if w is not None else None)
+                    self.assertScreen(ws)
+                ws.set_focus(w1)
+                w1.content.move(3, 4)
+                ws.render(focus=w1.content)
+                self.assertEqual(self.screen.cursor, (6, 7))
+
+    def test_resize(self):
+        for mode in MODES:
+            with self.subTest(mode=_describe(mode)):
+                ws   = self.workspace(*mode)
+                left = ws.make_edge_window('Left', w=20)
+                self.fill(left)
+                w1   = self.make_window(ws, 'W1', 2, 30, 8, 20)
+                ws.set_focus(w1)
+                ws.render(focus=w1.content)
+
+                # Only the window whose bounds change is relaid out; a
+                # burst of KEY_RESIZE events is drained, but not the key
+                # queued after it.
+                self.screen.resize(30, 100)
+                self.screen.keys.extend([curses.KEY_RESIZE,
+                                         curses.KEY_RESIZE, ord('x')])
+                self.assertEqual(ws.handle_resize(ws.canvas), [left])
+                self.assertEqual(self.screen.keys, [ord('x')])
+                self.assertEqual(left.content.height, 28)
+                self.fill(left)
+                ws.render(focus=w1.content)
+                self.assertScreen(ws)
+                self.assertEqual(self.rows(self.screen.virtual)[5][31:49],
+                                 '1'*18)
+
+    def test_bulk_writes(self):
+        for mode in MODES:
+            with self.subTest(mode=_describe(mode)):
+                ws = self.workspace(*mode)
+                w1 = self.make_window(ws, 'W1', 2, 2, 10, 30)
+                w2 = self.make_window(ws, 'W2', 6, 20, 10, 30)
+                ws.render()
+
+                c = w1.content
+                c.fill_rect(Bounds(0, 0, c.width, 2), '#', curses.A_BOLD)
+                c.addcells('abc', [0, curses.A_BOLD, curses.A_UNDERLINE],
+                           pos=(2, 0))
+                c.attron(curses.A_DIM)
+                c.blit(['xy', 'zw'], attrs=curses.A_REVERSE, pos=(2, 25))
+                c.attroff(curses.A_DIM)
+                ws.render()
+                self.assertScreen(ws)
+
+                v = self.screen.virtual
+                self.assertEqual(v[3][3], ('#', curses.A_BOLD))
+                self.assertEqual(v[5][3:6], [('a', 0), ('b', curses.A_BOLD),
+                                             ('c', curses.A_UNDERLINE)])
+                self.assertEqual(v[5][28:30],
+                                 [('x', curses.A_REVERSE | curses.A_DIM),
+                                  ('y', curses.A_REVERSE | curses.A_DIM)])
+
+                # W2's border covers the rest of the blit.
+                self.assertEqual(v[6][28][0], 'q')
+                ws.lower_window(w2)
+                ws.render()
+                self.assertScreen(ws)
+                self.assertEqual(v[6][28:30],
+                                 [('z', curses.A_REVERSE | curses.A_DIM),
+                                  ('w', curses.A_REVERSE | curses.A_DIM)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,20 @@
 import locale
 import curses
 
-from .canvas import Canvas
+from .canvas import Canvas, BufferedCanvas
+from .palette import Palette
+from . import instrument
 
 
-def init():
+def init(canvas_class=Canvas):
     stdscr = curses.initscr()
     curses.start_color()
     curses.use_default_colors()
     curses.noecho()
     curses.cbreak()
 
-    s = Canvas._from_stdscr(stdscr)
+    s = canvas_class._from_stdscr(stdscr)
+    s.palette = Palette()
     s.keypad(1)
     s.refresh()
     return s
@@ -1 +1,2 @@
 from .canvas import Canvas
+from .buffered import BufferedCanvas
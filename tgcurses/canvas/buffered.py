@@ -0,0 +1,445 @@
+import array
+import curses
+import unicodedata
+
+from ..layout import StaticFrame
+from ..text import char_width
+from .canvas import Canvas, _split_ch
+
+
+# Value stored in the flushed grid for cells whose contents on the curses
+# window are unknown; it never matches a real character.
+UNKNOWN = 0xFFFFFFFF
+
+# Value stored in the cell following a wide character, which the character
+# also covers on the terminal.
+WIDE = 0xFFFFFFFE
+
+
+def _codes(text):
+    '''
+    Converts text to an array of cell codes.  Each wide character is
+    followed by a WIDE cell and zero-width characters, which can't occupy a
+    cell of their own, are combined with the preceding character where
+    Unicode allows it and dropped otherwise.
+    '''
+    if text.isascii():
+        return array.array('I', map(ord, text))
+    codes = array.array('I')
+    for ch in unicodedata.normalize('NFC', text):
+        w = char_width(ch)
+        if w or ch < ' ':
+            codes.append(ord(ch))
+        if w == 2:
+            codes.append(WIDE)
+    return codes
+
+
+class BufferedCanvas(Canvas):
+    '''
+    A BufferedCanvas implements the Canvas API on top of an off-screen grid
+    of cells kept in Python.  Drawing operations only update the grid; when
+    the canvas is refreshed, the damaged rows are compared against the grid
+    as it was last flushed and only the cells that actually differ are
+    written to the underlying curses window.
+
+    A BufferedCanvas doesn't need a curses window at all: one created with
+    headless() keeps its grid in memory only, which allows rendering code to
+    be exercised and inspected without a terminal.
+
+    Wide characters occupy two cells, the second holding WIDE, so that the
+    grid stays aligned with the terminal's columns.
+    '''
+    def __init__(self, parent, frame, cwin):
+        super(BufferedCanvas, self).__init__(parent, frame, cwin)
+        self._y        = 0
+        self._x        = 0
+        self._bg       = (ord(' '), 0)
+        self._scrollok = False
+        self._alloc_grid()
+
+    @staticmethod
+    def headless(h, w):
+        '''
+        Returns a root BufferedCanvas of the specified dimensions that is not
+        backed by any curses window.
+        '''
+        return BufferedCanvas(None, StaticFrame(h, w, 0, 0), None)
+
+    def _alloc_grid(self):
+        _, _, h, w   = self._alloc
+        self._chars  = array.array('I', [self._bg[0]])*(h*w)
+        self._attrs  = array.array('L', [self._bg[1]])*(h*w)
+        self._fchars = array.array('I', [UNKNOWN])*(h*w)
+        self._fattrs = array.array('L', [0])*(h*w)
+
+    def make_canvas(self, frame):
+        '''
+        Return a new child BufferedCanvas anchored using the specified anchors.
+        The child is off-screen if this canvas is.
+        '''
+        cwin = None
+        if self._cwin is not None:
+            b    = frame.bounds
+            cwin = curses.newwin(b.height, b.width, b.y1, b.x1)
+        return BufferedCanvas(self, frame, cwin)
+
+    def make_subcanvas(self, frame):
+        '''
+        BufferedCanvases can't share a curses window, since flushing the
+        parent's grid would overwrite the child's cells, so this is the same
+        as make_canvas().
+        '''
+        return self.make_canvas(frame)
+
+    def _realloc(self, alloc):
+        if self._cwin is not None:
+            super(BufferedCanvas, self)._realloc(alloc)
+        self._regrid(alloc)
+        return True
+
+    def _resize_root(self, h, w):
+        self._regrid((0, 0, h, w))
+
+    def _regrid(self, alloc):
+        '''
+        Reallocates the grids for the new allocation, preserving the
+        overlapping contents.  The whole window is left needing a flush.
+        '''
+        _, _, oh, ow = self._alloc
+        chars, attrs = self._chars, self._attrs
+        self._alloc  = alloc
+        self._alloc_grid()
+        _, _, h, w = alloc
+        n          = min(w, ow)
+        for y in range(min(h, oh)):
+            self._chars[y*w:y*w + n] = chars[y*ow:y*ow + n]
+            self._attrs[y*w:y*w + n] = attrs[y*ow:y*ow + n]
+        self._y = min(self._y, h - 1)
+        self._x = min(self._x, w - 1)
+
+    def cell(self, y, x):
+        '''
+        Returns the (character, attributes) tuple for the specified cell.
+        '''
+        i = y*self._alloc[3] + x
+        c = self._chars[i]
+        return ('' if c == WIDE else chr(c)), self._attrs[i]
+
+    def row_text(self, y):
+        '''
+        Returns the characters in the specified row as a string.
+        '''
+        w = self._alloc[3]
+        return ''.join(chr(c) for c in self._chars[y*w:(y + 1)*w]
+                       if c != WIDE)
+
+    def _fill(self, y, x, n, code, attr):
+        # Clip to the row; assigning past its end would grow the grid.
+        w = self._alloc[3]
+        n = min(n, w - x)
+        if n <= 0:
+            return
+        i                     = y*w + x
+        self._chars[i:i + n]  = array.array('I', [code])*n
+        self._attrs[i:i + n]  = array.array('L', [attr])*n
+        self.add_damage(y, x, n)
+
+    def _write(self, codes, attrs):
+        '''
+        Writes the array of code points at the cursor position, advancing the
+        cursor and wrapping or scrolling like curses does.  attrs is either a
+        single attribute for all cells or an array with one per cell.
+        '''
+        _, _, h, w = self._alloc
+        uniform    = isinstance(attrs, int)
+        if uniform:
+            attrs = array.array('L', [attrs])
+        chars      = self._chars
+        while codes:
+            n = min(len(codes), w - self._x)
+            i = self._y*w + self._x
+            if n < len(codes) and codes[n] == WIDE and w > 1:
+                # A wide character that doesn't fit in the last column wraps
+                # whole to the next row, leaving the cell blank, as it does
+                # on the terminal.
+                codes = (codes[:n - 1] + array.array('I', [ord(' ')]) +
+                         codes[n - 1:])
+                if not uniform:
+                    attrs = attrs[:n] + attrs[n - 1:]
+
+            # Blank the other halves of any wide characters we overwrite
+            # half of.
+            if self._x and chars[i] == WIDE and codes[0] != WIDE:
+                chars[i - 1] = ord(' ')
+                self.add_damage(self._y, self._x - 1, 1)
+            if self._x + n < w and chars[i + n] == WIDE:
+                chars[i + n] = ord(' ')
+                self.add_damage(self._y, self._x + n, 1)
+
+            chars[i:i + n]       = codes[:n]
+            self._attrs[i:i + n] = attrs*n if uniform else attrs[:n]
+            self.add_damage(self._y, self._x, n)
+            codes    = codes[n:]
+            if not uniform:
+                attrs = attrs[n:]
+            self._x += n
+            if self._x < w:
+                break
+
+            if self._y + 1 < h:
+                self._x  = 0
+                self._y += 1
+            elif self._scrollok:
+                self._x = 0
+                self._scroll_grid(1)
+            else:
+                self._x = w - 1
+                raise curses.error('write past end of canvas')
+
+    def _newline(self):
+        _, _, h, w = self._alloc
+        self._fill(self._y, self._x, w - self._x, *self._bg)
+        self._x = 0
+        if self._y + 1 < h:
+            self._y += 1
+        elif self._scrollok:
+            self._scroll_grid(1)
+        else:
+            raise curses.error('newline past end of canvas')
+
+    def _scroll_grid(self, dy):
+        _, _, h, w = self._alloc
+        dy         = max(-h, min(dy, h))
+        n          = (h - abs(dy))*w
+        blanks     = ((self._chars, self._bg[0]), (self._attrs, self._bg[1]),
+                      (self._fchars, UNKNOWN), (self._fattrs, 0))
+        for grid, blank in blanks:
+            fill = array.array(grid.typecode, [blank])*(abs(dy)*w)
+            if dy > 0:
+                grid[:n] = grid[dy*w:]
+                grid[n:] = fill
+            else:
+                grid[-dy*w:] = grid[:n]
+                grid[:-dy*w] = fill
+
+        # The flushed grid moves along with the curses window contents, so
+        # only the rows scrolled into view need to be written on the next
+        # flush.
+        if self._cwin is not None:
+            self._cwin.scrollok(True)
+            self._cwin.scroll(dy)
+            self._cwin.scrollok(False)
+        self.damage = {y - dy: span for y, span in self.damage.items()
+                       if 0 <= y - dy < h}
+        for y in (range(h - dy, h) if dy > 0 else range(0, -dy)):
+            self.add_damage(y, 0, w)
+
+    def flush(self):
+        '''
+        Writes all cells that changed since the last flush to the underlying
+        curses window, if any, without refreshing it.
+        '''
+        w = self._alloc[3]
+        for y, (x1, x2) in sorted(self.damage.items()):
+            i1, i2 = y*w + x1, y*w + x2
+            if self._cwin is not None:
+                self._flush_span(y, x1, x2)
+            self._fchars[i1:i2] = self._chars[i1:i2]
+            self._fattrs[i1:i2] = self._attrs[i1:i2]
+        if self._cwin is not None:
+            self._cwin.move(self._y, self._x)
+
+    def _flush_span(self, y, x1, x2):
+        w      = self._alloc[3]
+        chars  = self._chars
+        attrs  = self._attrs
+        fchars = self._fchars
+        fattrs = self._fattrs
+        i      = y*w + x1
+        end    = y*w + x2
+        while i < end:
+            if chars[i] == fchars[i] and attrs[i] == fattrs[i]:
+                i += 1
+                continue
+
+            # Emit the run of changed cells sharing the same attributes,
+            # starting from the wide character if only its second half
+            # changed.
+            start = i
+            attr  = attrs[i]
+            if chars[start] == WIDE and start > y*w:
+                start -= 1
+            while (i < end and attrs[i] == attr and
+                   (chars[i] != fchars[i] or attrs[i] != fattrs[i])):
+                i += 1
+            text = ''.join([chr(c) for c in chars[start:i] if c != WIDE])
+            try:
+                self._cwin.addstr(y, start - y*w, text, attr)
+            except curses.error:
+                # Writing the bottom-right cell returns an error even though
+                # the cell was written.
+                pass
+
+    def noutrefresh(self):
+        if self.occluded:
+            return
+        damage = self.damage
+        self.flush()
+        self.damage = {}
+        if self._cwin is not None and self.panel is None:
+            self._cwin.noutrefresh()
+        if self.overlapped_by:
+            self._refresh_overlapping(damage)
+
+    def refresh(self):
+        self.flush()
+        self.damage = {}
+        if self._cwin is not None:
+            self._cwin.refresh()
+
+    def keypad(self, enabled):
+        if self._cwin is not None:
+            self._cwin.keypad(enabled)
+
+    def timeout(self, delay):
+        self.delay = delay
+        if self._cwin is not None:
+            self._cwin.timeout(delay)
+
+    def getch(self):
+        if self._cwin is None:
+            return -1
+        self.flush()
+        return self._cwin.getch()
+
+    def touch(self):
+        self._fchars[:] = array.array('I', [UNKNOWN])*len(self._fchars)
+        self.damage_all()
+        if self._cwin is not None:
+            self._cwin.touchwin()
+
+    def erase(self):
+        _, _, h, w = self._alloc
+        self._fill(0, 0, h*w, *self._bg)
+        self._y = self._x = 0
+
+    def clear(self):
+        self.erase()
+        self.touch()
+        if self._cwin is not None:
+            self._cwin.clear()
+
+    def move(self, y, x):
+        _, _, h, w = self._alloc
+        if not (0 <= y < h and 0 <= x < w):
+            raise curses.error('move to (%d, %d) outside canvas' % (y, x))
+        self._y = y
+        self._x = x
+
+    def getyx(self):
+        return self._y, self._x
+
+    def addch(self, ch, pos=None, attr=None):
+        if pos is not None:
+            self.move(pos[0], pos[1])
+        code, attr = _split_ch(ch, self._attr | (attr or 0))
+        self._write(array.array('I', [code]), attr)
+
+    def addcells(self, chs, attrs=None, pos=None):
+        if pos is not None:
+            self.move(pos[0], pos[1])
+        if isinstance(chs, str):
+            # Per-cell attributes are given one per character.
+            per_cell = not (attrs is None or isinstance(attrs, int))
+            codes    = (array.array('I', map(ord, chs)) if per_cell else
+                        _codes(chs))
+            cattrs   = None
+        else:
+            cells  = [_split_ch(c, 0) for c in chs]
+            codes  = array.array('I', [c for c, _ in cells])
+            cattrs = array.array('L', [a for _, a in cells])
+
+        if attrs is None or isinstance(attrs, int):
+            attrs = self._attr | (attrs or 0)
+            if cattrs is not None and any(cattrs):
+                attrs = array.array('L', [a | attrs for a in cattrs])
+        else:
+            attrs = array.array('L', [a | self._attr for a in attrs])
+            if cattrs is not None:
+                attrs = array.array('L', [a | c for a, c in zip(attrs,
+                                                                cattrs)])
+        self._write(codes, attrs)
+
+    def fill_rect(self, bounds, ch=' ', attr=None):
+        code, attr = _split_ch(ch, self._attr | (attr or 0))
+        for y in range(bounds.y1, bounds.y2):
+            self._fill(y, bounds.x1, bounds.width, code, attr)
+
+    def addstr(self, text, pos=None, attr=None):
+        if pos is not None:
+            self.move(pos[0], pos[1])
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        attr  = self._attr | (attr or 0)
+        lines = text.split('\n')
+        for i, l in enumerate(lines):
+            if i:
+                self._newline()
+            if l:
+                self._write(_codes(l), attr)
+
+    def border(self):
+        _, _, h, w = self._alloc
+        ul = _split_ch(getattr(curses, 'ACS_ULCORNER', ord('+')), 0)
+        ur = _split_ch(getattr(curses, 'ACS_URCORNER', ord('+')), 0)
+        ll = _split_ch(getattr(curses, 'ACS_LLCORNER', ord('+')), 0)
+        lr = _split_ch(getattr(curses, 'ACS_LRCORNER', ord('+')), 0)
+        hl = _split_ch(getattr(curses, 'ACS_HLINE', ord('-')), 0)
+        vl = _split_ch(getattr(curses, 'ACS_VLINE', ord('|')), 0)
+        for y in (0, h - 1):
+            self._fill(y, 0, w, *hl)
+        for y in range(h):
+            self._fill(y, 0, 1, *vl)
+            self._fill(y, w - 1, 1, *vl)
+        self._fill(0, 0, 1, *ul)
+        self._fill(0, w - 1, 1, *ur)
+        self._fill(h - 1, 0, 1, *ll)
+        self._fill(h - 1, w - 1, 1, *lr)
+
+    def scrollok(self, ok):
+        self._scrollok = bool(ok)
+
+    def idlok(self, ok):
+        if self._cwin is not None:
+            self._cwin.idlok(ok)
+
+    def scroll(self, dy):
+        if not self._scrollok:
+            raise curses.error('scroll() requires scrollok()')
+        self._scroll_grid(dy)
+
+    def attron(self, attr):
+        self._attr |= attr
+
+    def attroff(self, attr):
+        self._attr &= ~attr
+
+    def bkgd(self, ch, attr=None):
+        old_code, old_attr = self._bg
+        self._bg           = _split_ch(ch, attr or 0)
+        for i, c in enumerate(self._chars):
+            if c == old_code and self._attrs[i] == old_attr:
+                self._chars[i] = self._bg[0]
+                self._attrs[i] = self._bg[1]
+        self.damage_all()
+
+    def clrline(self, y):
+        self.move(y, 0)
+        self._fill(y, 0, self._alloc[3], *self._bg)
+
+    def hline(self, n, ch=None, pos=None):
+        ch   = getattr(curses, 'ACS_HLINE', ord('-')) if ch is None else ch
+        y, x = pos if pos is not None else (self._y, self._x)
+        n    = min(n, self._alloc[3] - x)
+        self._fill(y, x, n, *_split_ch(ch, self._attr))
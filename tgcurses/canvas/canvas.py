@@ -1,6 +1,37 @@
 import curses
+import curses.panel
+import itertools
 
-from ..layout import Bounds, Frame, StaticFrame
+from ..layout import Bounds, Frame, StaticFrame, solve
+from ..text import text_width
+
+
+def _split_ch(ch, attr):
+    '''
+    Splits a character as passed to addch() into a (code point, attributes)
+    tuple.  Integer characters may carry attribute bits, as the ACS_*
+    constants do.
+    '''
+    if isinstance(ch, int):
+        return ch & curses.A_CHARTEXT, (ch & curses.A_ATTRIBUTES) | attr
+    return ord(ch), attr
+
+
+def _runs(chs, attrs):
+    '''
+    Splits a sequence of cells into (text, attr) runs of consecutive cells
+    sharing the same attributes.  See Canvas.addcells() for the formats of
+    chs and attrs.
+    '''
+    if attrs is None or isinstance(attrs, int):
+        if isinstance(chs, str):
+            yield chs, attrs
+            return
+        attrs = itertools.repeat(attrs or 0)
+    cells = (_split_ch(c, a) for c, a in zip(chs, attrs))
+    for attr, run in itertools.groupby(cells, key=lambda cell: cell[1]):
+        # Runs without attributes of their own use the window's.
+        yield ''.join(chr(c) for c, _ in run), attr or None
 
 
 class Canvas(object):
@@ -15,6 +46,21 @@ class Canvas(object):
     class isn't actually exposed publicly at all and can't be spelled in
     python.
 
+    Every drawing operation records the region it touched in the damage
+    dictionary, which maps a row to the [x1, x2) span of columns written in
+    that row since the canvas was last refreshed.  This lets a Workspace skip
+    refreshing canvases that haven't changed.
+
+    Canvases may overlap.  overlapped_by lists the canvases stacked above
+    this one that overlap it; since noutrefresh() paints over them in the
+    curses virtual screen, it copies the rows of them that it painted over
+    again afterwards.  An occluded canvas, one completely covered by opaque
+    canvases, isn't copied at all and keeps its damage until it is exposed.
+    Both are maintained by the Workspace.
+
+    Attributes passed to the drawing methods are combined with those enabled
+    with attron().
+
     Canvas is essentially a wrapper for an ncurses window object.  We don't
     just call it a window because our ui library has a window class that
     provides borders and a title like a real GUI-type window and we don't want
@@ -26,15 +72,30 @@ class Canvas(object):
         self.frame    = frame
         self._cwin    = cwin
         self.children = []
+        self.delay     = -1
+        self.damage    = {}
+        self.scheduler = None
+        self.panel     = None
+        self.occluded  = False
+        self.shared    = False
+        self._attr     = 0
+        self._views    = False
+        self._palette  = None
+
+        self.overlapped_by = ()
+
+        b                = frame.bounds
+        self._alloc      = (b.y1, b.x1, b.height, b.width)
+        self._generation = frame.generation
 
         if parent:
             parent.children.append(self)
 
-    @staticmethod
-    def _from_stdscr(cwin):
+    @classmethod
+    def _from_stdscr(cls, cwin):
         h, w  = cwin.getmaxyx()
         frame = StaticFrame(h, w, 0, 0)
-        return Canvas(None, frame, cwin)
+        return cls(None, frame, cwin)
 
     def make_canvas(self, frame):
         '''
@@ -42,12 +103,209 @@ class Canvas(object):
         '''
         b    = frame.bounds
         cwin = curses.newwin(b.height, b.width, b.y1, b.x1)
-        return Canvas(self.parent, frame, cwin)
+        return Canvas(self, frame, cwin)
+
+    def make_subcanvas(self, frame):
+        '''
+        Return a new child Canvas for a frame lying within this canvas that
+        shares this canvas' curses window instead of allocating its own: its
+        curses window is a derwin() view of ours, so the cells are stored
+        once.  curses doesn't mark our lines as changed when the child draws,
+        so the child records its damage in ours instead and refreshing the
+        child refreshes this canvas, which copies the child's cells too.  The
+        view is recreated whenever the child is laid out again; if that fails
+        the child keeps its old view and bounds.
+        '''
+        b    = frame.bounds
+        y, x = self._alloc[:2]
+        c    = Canvas(self, frame,
+                      self._cwin.derwin(b.height, b.width, b.y1 - y, b.x1 - x))
+        c.shared    = True
+        self._views = True
+        return c
+
+    def descendants(self):
+        '''
+        Returns a list of all canvases created from this one, directly or
+        indirectly.
+        '''
+        canvases = list(self.children)
+        for c in canvases:
+            canvases.extend(c.children)
+        return canvases
+
+    def relayout(self):
+        '''
+        Moves and resizes the underlying curses window if the bounds of the
+        canvas' frame have changed since the window was last laid out.  Returns
+        True if the window was changed, in which case its contents need to be
+        redrawn.
+        '''
+        if self._generation == self.frame.generation:
+            return False
+        self._generation = self.frame.generation
+
+        b     = self.frame.bounds
+        alloc = (b.y1, b.x1, max(b.height, 1), max(b.width, 1))
+        if alloc == self._alloc:
+            return False
+
+        if not self._realloc(alloc):
+            return False
+        self._alloc = alloc
+        self.damage_all()
+        return True
+
+    def _realloc(self, alloc):
+        '''
+        Moves and resizes the curses window to the new allocation.  Returns
+        False if the canvas must keep its old allocation.
+        '''
+        y, x, h, w   = alloc
+        _, _, oh, ow = self._alloc
+        if self.shared:
+            # Derived windows can't be moved or resized independently of
+            # their parent, so make a new view of the parent's window.
+            py, px = self.parent._alloc[:2]
+            try:
+                self._cwin = self.parent._cwin.derwin(h, w, y - py, x - px)
+            except curses.error:
+                return False
+            return True
+        try:
+            # Shrink first so that mvwin() doesn't push us off the screen.
+            self._cwin.resize(min(h, oh), min(w, ow))
+            if self.panel is not None:
+                self.panel.move(y, x)
+            else:
+                self._cwin.mvwin(y, x)
+            self._cwin.resize(h, w)
+        except curses.error:
+            pass
+        return True
+
+    def handle_resize(self):
+        '''
+        Called on the root canvas after the terminal has been resized (i.e.
+        after getch() returned KEY_RESIZE).  Resizes the root frame to match
+        the new terminal dimensions, re-solves the layout and then moves or
+        resizes only those canvases whose bounds actually changed.  Returns the
+        list of changed canvases.
+        '''
+        assert self.parent is None
+        if hasattr(curses, 'update_lines_cols'):
+            curses.update_lines_cols()
+        h, w = self._cwin.getmaxyx()
+        self.frame.resize(h, w, 0, 0)
+        self._resize_root(h, w)
+        self._generation = self.frame.generation
+
+        solve(self.frame)
+        return [c for c in self.descendants() if c.relayout()]
+
+    def _resize_root(self, h, w):
+        # curses has already resized stdscr to match the terminal.
+        self._alloc = (0, 0, h, w)
 
     @property
     def bounds(self):
         return self.frame.bounds
 
+    @property
+    def root(self):
+        '''
+        The root canvas, which covers the whole screen.
+        '''
+        c = self
+        while c.parent is not None:
+            c = c.parent
+        return c
+
+    @property
+    def palette(self):
+        '''
+        The Palette used to allocate color pairs for the screen, which
+        tgcurses.init() sets on the root canvas, or None.  All canvases
+        return the root canvas' palette.
+        '''
+        return self.root._palette
+
+    @palette.setter
+    def palette(self, palette):
+        self.root._palette = palette
+
+    @property
+    def offscreen(self):
+        '''
+        True if the canvas isn't backed by a curses window.
+        '''
+        return self._cwin is None
+
+    def add_damage(self, y, x, n):
+        '''
+        Records that n cells starting at (y, x) have been written, wrapping
+        onto the following rows as curses does.  Cells outside the canvas
+        are ignored.  A shared canvas records them in its parent.
+        '''
+        oy, ox, h, w = self._alloc
+        if x >= w:
+            return
+        if x < 0:
+            n += x
+            x  = 0
+        if self.shared:
+            oy -= self.parent._alloc[0]
+            ox -= self.parent._alloc[1]
+        while n > 0 and y < h:
+            end = min(x + n, w)
+            if self.shared:
+                self.parent.add_damage(y + oy, x + ox, end - x)
+            elif y >= 0:
+                span = self.damage.get(y)
+                if span is None:
+                    self.damage[y] = [x, end]
+                else:
+                    span[0] = min(span[0], x)
+                    span[1] = max(span[1], end)
+            n -= end - x
+            x  = 0
+            y += 1
+
+    def damage_all(self):
+        '''
+        Records that the entire canvas has been written.
+        '''
+        _, _, h, w  = self._alloc
+        if self.shared:
+            for y in range(h):
+                self.add_damage(y, 0, w)
+            return
+        self.damage = {y: [0, w] for y in range(h)}
+
+    def damage_bounds(self):
+        '''
+        Returns the smallest Bounds, in canvas coordinates, enclosing all of
+        the damage recorded since the last refresh or None if the canvas is
+        undamaged.
+        '''
+        if not self.damage:
+            return None
+        return Bounds(min(s[0] for s in self.damage.values()),
+                      min(self.damage),
+                      max(s[1] for s in self.damage.values()),
+                      max(self.damage) + 1)
+
+    def _text_damage(self, text, pos):
+        y, x = pos if pos is not None else self._cwin.getyx()
+        if isinstance(text, bytes):
+            # curses decodes bytes as UTF-8 in a UTF-8 locale.
+            text = text.decode('utf-8', 'replace')
+        if '\n' in text:
+            _, _, h, w = self._alloc
+            self.add_damage(y, x, (h - y)*w - x)
+        else:
+            self.add_damage(y, x, text_width(text))
+
     @property
     def width(self):
         return self.frame.bounds.width
@@ -72,6 +330,7 @@ class Canvas(object):
               > 0 | Waits delay ms; returns -1 if no input.
             ------+----------------------------------------
         '''
+        self.delay = delay
         self._cwin.timeout(delay)
 
     def getch(self):
@@ -90,9 +349,100 @@ class Canvas(object):
         noutrefresh() across multiple canvases can be used to batch drawing
         commands into the virtual screen and finally update the physical screen
         in a single operation via screen.doupdate().
-        '''
+
+        A canvas in a curses panel is only flushed: copying it directly would
+        mark its lines as unchanged, so curses.panel.update_panels() wouldn't
+        copy the panels above it again.  update_panels(), which
+        Workspace.render() calls, copies it instead.
+        '''
+        if self.shared:
+            self.parent.noutrefresh()
+            if self.parent.panel is None:
+                self.place_cursor()
+            return
+        if self.occluded:
+            return
+        self.flush()
+        damage      = self.damage
+        self.damage = {}
+        if self.panel is None:
+            self._cwin.noutrefresh()
+        if self.overlapped_by:
+            self._refresh_overlapping(damage)
+
+    def place_cursor(self):
+        '''
+        Leaves the screen cursor at the canvas' cursor position after the
+        next doupdate().  Lines of the canvas that haven't already been
+        copied to the curses virtual screen are copied too.
+        '''
+        if self.occluded:
+            return
+        if self.shared:
+            # Our curses window's lines are never refreshed, so position the
+            # cursor through the parent's.
+            y, x = self.getyx()
+            self.parent.move(y + self._alloc[0] - self.parent._alloc[0],
+                             x + self._alloc[1] - self.parent._alloc[1])
+            self.parent.place_cursor()
+            return
+        self.flush()
         self._cwin.noutrefresh()
 
+    def flush(self):
+        '''
+        Makes sure everything drawn in the canvas is in its curses window,
+        ready to be copied to the curses virtual screen by noutrefresh() or
+        curses.panel.update_panels().  A Canvas draws into its curses window
+        directly, so this only marks the rows drawn through subcanvases as
+        changed, which curses doesn't do itself.  curses then copies those
+        rows whole, so their damage is widened to the full row to have
+        noutrefresh() restore the canvases above across all of it.
+        '''
+        if self._views:
+            w = self._alloc[3]
+            for y, span in self.damage.items():
+                self._cwin.touchline(y, 1)
+                span[0], span[1] = 0, w
+
+    def _refresh_overlapping(self, damage):
+        '''
+        Copies the rows of the canvases overlapping this one from above that
+        intersect the specified damage back into the curses virtual screen.
+        '''
+        y0, x0, _, _ = self._alloc
+        for c in self.overlapped_by:
+            cy, cx, ch, cw = c._alloc
+            rows = [y + y0 - cy for y, (x1, x2) in damage.items()
+                    if 0 <= y + y0 - cy < ch and
+                    x1 + x0 < cx + cw and x2 + x0 > cx]
+            if rows:
+                c.touchline(min(rows), max(rows) - min(rows) + 1)
+                c.noutrefresh()
+
+    def make_panel(self):
+        '''
+        Places the canvas' curses window in a curses panel, which is stacked
+        on top of any existing panels, and returns it.
+        '''
+        if self.panel is None:
+            self.panel = curses.panel.new_panel(self._cwin)
+        return self.panel
+
+    def update(self):
+        '''
+        Requests that the canvas contents be copied to the curses virtual
+        screen.  Widgets call this instead of noutrefresh() after drawing: if
+        a render scheduler is installed on the root canvas the copy is
+        deferred until its next flush, otherwise noutrefresh() is invoked
+        immediately.
+        '''
+        scheduler = self.root.scheduler
+        if scheduler is None:
+            self.noutrefresh()
+        else:
+            scheduler.mark_dirty(self)
+
     def refresh(self):
         '''
         Updates the curses virtual screen with the canvas contents and then
@@ -102,20 +452,43 @@ class Canvas(object):
             canvas.noutrefresh()
             screen.doupdate()
         '''
+        self.flush()
+        self.damage = {}
         self._cwin.refresh()
 
+    def touch(self):
+        '''
+        Marks the entire canvas as changed so that the next noutrefresh() or
+        refresh() copies all of it to the curses virtual screen.
+        '''
+        self.damage_all()
+        self._cwin.touchwin()
+
+    def touchline(self, y, n):
+        '''
+        Marks n rows starting at row y as changed so that the next
+        noutrefresh() copies them to the curses virtual screen.
+        '''
+        w = self._alloc[3]
+        for row in range(y, y + n):
+            self.add_damage(row, 0, w)
+        if self._cwin is not None:
+            self._cwin.touchline(y, n)
+
     def erase(self):
         '''
         Draws the background character over the entire canvas.  Does not
         automatically refresh anything, a call to noutrefresh() or refresh()
         is required to see the change.
         '''
+        self.damage_all()
         self._cwin.erase()
 
     def clear(self):
         '''
         Seems to do the same thing as erase().
         '''
+        self.damage_all()
         self._cwin.clear()
 
     def move(self, y, x):
@@ -142,13 +515,17 @@ class Canvas(object):
         Draws the character (specified as an integer and not a character-string)
         at the specified position.
         '''
+        y, x = pos if pos is not None else self._cwin.getyx()
+        self.add_damage(y, x, 1)
+        if attr:
+            attr |= self._attr
         if pos is not None:
-            if attr is not None:
+            if attr:
                 self._cwin.addch(pos[0], pos[1], ch, attr)
             else:
                 self._cwin.addch(pos[0], pos[1], ch)
         else:
-            if attr is not None:
+            if attr:
                 self._cwin.addch(ch, attr)
             else:
                 self._cwin.addch(ch)
@@ -158,10 +535,50 @@ class Canvas(object):
         Draws the character sequence (specified as an array of integers and not
         a character-string) at the specified position.
         '''
-        if pos is not None:
-            self.move(pos[0], pos[1])
-        for c in chs:
-            self.addch(c, attr=attr)
+        self.addcells(chs, attrs=attr, pos=pos)
+
+    def addcells(self, chs, attrs=None, pos=None):
+        '''
+        Draws a row of cells at the specified position, or at the cursor if
+        pos is None.  chs may be a string or a sequence (list, array, ...) of
+        integer characters, which may carry attribute bits as the ACS_*
+        constants do.  attrs may be None, a single attribute for every cell or
+        a sequence holding one attribute per cell.  Consecutive cells with the
+        same attributes are drawn with a single curses call.
+        '''
+        for text, attr in _runs(chs, attrs):
+            self.addstr(text, pos=pos, attr=attr)
+            pos = None
+
+    def fill_rect(self, bounds, ch=' ', attr=None):
+        '''
+        Fills the specified Bounds, in canvas coordinates, with the character
+        ch.  Each row is drawn with a single curses call.
+        '''
+        code, attr = _split_ch(ch, attr or 0)
+        text       = chr(code)*bounds.width
+        for y in range(bounds.y1, bounds.y2):
+            try:
+                self.addstr(text, pos=(y, bounds.x1), attr=attr)
+            except curses.error:
+                # Filling the bottom-right cell returns an error even though
+                # the cell was written.
+                if y != self.height - 1 or bounds.x2 != self.width:
+                    raise
+
+    def blit(self, rows, attrs=None, pos=(0, 0)):
+        '''
+        Draws a rectangle of cells with its top-left corner at the specified
+        position.  rows is a sequence of rows in any of the formats accepted
+        by addcells().  attrs may be None, a single attribute for every cell
+        or a sequence holding, for each row, anything addcells() accepts as
+        attrs.
+        '''
+        if attrs is None or isinstance(attrs, int):
+            attrs = itertools.repeat(attrs)
+        y, x = pos
+        for i, (row, row_attrs) in enumerate(zip(rows, attrs)):
+            self.addcells(row, attrs=row_attrs, pos=(y + i, x))
 
     def addstr(self, text, pos=None, attr=None):
         '''
@@ -170,13 +587,16 @@ class Canvas(object):
         of the canvas at which to draw the text.  Otherwise the text is drawn
         at the current cursor position.
         '''
+        self._text_damage(text, pos)
+        if attr:
+            attr |= self._attr
         if pos is not None:
-            if attr is not None:
+            if attr:
                 self._cwin.addstr(pos[0], pos[1], text, attr)
             else:
                 self._cwin.addstr(pos[0], pos[1], text)
         else:
-            if attr is not None:
+            if attr:
                 self._cwin.addstr(text, attr)
             else:
                 self._cwin.addstr(text)
@@ -185,8 +605,8 @@ class Canvas(object):
         '''
         Draws a string centered in the canvas.
         '''
-        x = (self.frame.width - len(text))/2
-        y = self.frame.height/2
+        x = max((self.width - text_width(text))//2, 0)
+        y = self.height//2
         self.addstr(text, pos=(y, x))
 
     def border(self):
@@ -195,6 +615,7 @@ class Canvas(object):
         border are included in the canvas content, so the usable width and
         height of the canvas is decreased by 2 in each dimension.
         '''
+        self.damage_all()
         self._cwin.border()
 
     def scrollok(self, ok):
@@ -205,23 +626,33 @@ class Canvas(object):
         '''
         self._cwin.scrollok(ok)
 
+    def idlok(self, ok):
+        '''
+        Whether or not curses may use the terminal's hardware line insertion
+        and deletion, which makes scrolling much cheaper to transmit.
+        '''
+        self._cwin.idlok(ok)
+
     def scroll(self, dy):
         '''
         Scrolls the canvas contents up 'dy' lines.  If 'dy' is negative, the
         contents will scroll down instead.
         '''
+        self.damage_all()
         self._cwin.scroll(dy)
 
     def attron(self, attr):
         '''
         Enables the specified curses attribute for the background character.
         '''
+        self._attr |= attr
         self._cwin.attron(attr)
 
     def attroff(self, attr):
         '''
         Disables the specified curses attribute for the background character.
         '''
+        self._attr &= ~attr
         self._cwin.attroff(attr)
 
     def bkgd(self, ch, attr=None):
@@ -229,6 +660,7 @@ class Canvas(object):
         Sets the background character to ch and applies the optional attr
         parameter.  The background is then repainted.
         '''
+        self.damage_all()
         if attr is not None:
             self._cwin.bkgd(ch, attr)
         else:
@@ -239,10 +671,13 @@ class Canvas(object):
         Clears the entire line at the specified y coordinate.
         '''
         self.move(y, 0)
+        self.add_damage(y, 0, self._alloc[3])
         self._cwin.clrtoeol()
 
     def hline(self, n, ch=None, pos=None):
-        ch = curses.ACS_HLINE if ch is None else ch
+        ch   = curses.ACS_HLINE if ch is None else ch
+        y, x = pos if pos is not None else self._cwin.getyx()
+        self.add_damage(y, x, n)
         if pos is not None:
             self._cwin.hline(pos[0], pos[1], ch, n)
         else:
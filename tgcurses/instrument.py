@@ -0,0 +1,219 @@
+'''
+Opt-in instrumentation of the rendering hot paths.  enable() wraps the
+drawing and refresh methods of the canvas classes, the draw methods of the
+widgets in tgcurses.ui, frame bounds computation and curses.doupdate() with
+counting versions and returns the Stats object they update; disable() puts
+the original methods back.  When not enabled nothing is wrapped, so the
+instrumentation costs nothing.
+
+    stats = tgcurses.instrument.enable()
+    ...
+    for line in stats.report():
+        print(line)
+'''
+import collections
+import curses
+import functools
+import time
+
+
+# Canvas methods whose calls are counted.
+CANVAS_METHODS = ('addstr', 'addch', 'addcells', 'hline', 'fill_rect',
+                  'blit', 'border', 'erase', 'clear', 'scroll',
+                  'noutrefresh', 'refresh')
+
+
+class Stats(object):
+    '''
+    Counters collected while instrumentation is enabled:
+
+        calls     - Counter of calls per canvas method name, plus doupdate.
+                    Only the outermost call is counted when one method
+                    calls another on the same canvas.
+        draws     - Counter of draw() calls per widget label.
+        draw_time - seconds spent in draw() per widget label.
+        layouts   - number of frame bounds computations.
+        cells     - number of cells written by drawing calls, which is
+                    roughly the number of bytes of text sent to curses.
+
+    Widgets are labelled with their class name and, if they belong to a
+    Window, its title, e.g. 'Menu(Files)'.
+    '''
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        '''
+        Zeroes all counters.
+        '''
+        self.calls     = collections.Counter()
+        self.draws     = collections.Counter()
+        self.draw_time = collections.defaultdict(float)
+        self.layouts   = 0
+        self.cells     = 0
+        self.started   = time.perf_counter()
+
+    @property
+    def frames(self):
+        return self.calls['doupdate']
+
+    def slowest(self, n=None):
+        '''
+        Returns a list of (label, total seconds, draws) tuples for the n
+        widgets with the most total draw time, most expensive first.
+        '''
+        labels = sorted(self.draw_time, key=self.draw_time.get, reverse=True)
+        return [(l, self.draw_time[l], self.draws[l]) for l in labels[:n]]
+
+    def report(self, n=None):
+        '''
+        Returns a list of text lines summarizing the counters, with the n
+        most expensive widgets.
+        '''
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        lines   = ['%u frames (%.1f/s), %u layouts, %u cells (%.0f/frame)' %
+                   (self.frames, self.frames/elapsed, self.layouts,
+                    self.cells, self.cells/max(self.frames, 1))]
+        lines.append(', '.join('%s %u' % kv
+                               for kv in self.calls.most_common()
+                               if kv[0] != 'doupdate'))
+        for label, t, count in self.slowest(n):
+            lines.append('%-24s %6u draws %8.2f ms %7.3f ms/draw' %
+                         (label, count, t*1e3, t*1e3/count))
+        return lines
+
+
+_stats    = None
+_patched  = []
+
+# Objects currently inside an instrumented call.  Calls an instrumented method
+# makes to other instrumented methods of the same object, such as addchs()
+# calling addcells() calling addstr(), aren't counted again.
+_active   = set()
+
+
+def _label(widget):
+    window = getattr(widget, 'window', widget)
+    title  = getattr(window, 'title', None)
+    name   = type(widget).__name__
+    return name if title is None else '%s(%s)' % (name, title)
+
+
+def _patch(cls, name, make_wrapper):
+    if name not in cls.__dict__:
+        return
+    orig    = cls.__dict__[name]
+    wrapper = functools.wraps(orig)(make_wrapper(orig))
+    _patched.append((cls, name, orig))
+    setattr(cls, name, wrapper)
+
+
+def _count_call(name, orig):
+    def wrapper(self, *args, **kwargs):
+        key = id(self)
+        if key in _active:
+            return orig(self, *args, **kwargs)
+        _stats.calls[name] += 1
+        _active.add(key)
+        try:
+            return orig(self, *args, **kwargs)
+        finally:
+            _active.discard(key)
+    return wrapper
+
+
+def _count_damage(orig):
+    def wrapper(self, y, x, n):
+        # Shared canvases pass their damage on to their parents.
+        if not self.shared:
+            _stats.cells += n
+        return orig(self, y, x, n)
+    return wrapper
+
+
+def _time_draw(orig):
+    def wrapper(self, *args, **kwargs):
+        key = id(self)
+        if key in _active:
+            return orig(self, *args, **kwargs)
+        _active.add(key)
+        t0 = time.perf_counter()
+        try:
+            return orig(self, *args, **kwargs)
+        finally:
+            _active.discard(key)
+            label = _label(self)
+            _stats.draws[label]     += 1
+            _stats.draw_time[label] += time.perf_counter() - t0
+    return wrapper
+
+
+def _count_layout(orig):
+    def wrapper(self):
+        _stats.layouts += 1
+        return orig(self)
+    return wrapper
+
+
+def _subclasses(cls):
+    classes = [cls]
+    for c in cls.__subclasses__():
+        classes += _subclasses(c)
+    return classes
+
+
+def enable():
+    '''
+    Starts collecting statistics and returns the Stats object.  If
+    instrumentation is already enabled the existing Stats are returned.
+    '''
+    global _stats
+    if _stats is not None:
+        return _stats
+
+    from .canvas import Canvas
+    from .layout.frame import _Frame
+    from . import ui
+
+    _stats = Stats()
+    for cls in _subclasses(Canvas):
+        for name in CANVAS_METHODS:
+            _patch(cls, name, functools.partial(_count_call, name))
+        _patch(cls, 'add_damage', _count_damage)
+    for cls in (ui.Menu, ui.LogPane, ui.Pager, ui.Table, ui.TextArea,
+                ui.Window):
+        for c in _subclasses(cls):
+            _patch(c, 'draw', _time_draw)
+            _patch(c, 'show', _time_draw)
+    _patch(ui.EditField, 'show', _time_draw)
+    _patch(_Frame, '_compute_bounds', _count_layout)
+
+    orig_doupdate = curses.doupdate
+
+    @functools.wraps(orig_doupdate)
+    def doupdate():
+        _stats.calls['doupdate'] += 1
+        return orig_doupdate()
+    _patched.append((curses, 'doupdate', orig_doupdate))
+    curses.doupdate = doupdate
+    return _stats
+
+
+def disable():
+    '''
+    Stops collecting statistics and removes all instrumentation.  Returns
+    the final Stats, or None if instrumentation wasn't enabled.
+    '''
+    global _stats
+    while _patched:
+        obj, name, orig = _patched.pop()
+        setattr(obj, name, orig)
+    stats, _stats = _stats, None
+    return stats
+
+
+def stats():
+    '''
+    Returns the current Stats, or None if instrumentation isn't enabled.
+    '''
+    return _stats
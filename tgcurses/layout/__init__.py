@@ -1,2 +1,3 @@
 from .frame import Frame, StaticFrame
 from .bounds import Bounds
+from .solver import solve, LayoutCycleError
@@ -2,6 +2,8 @@ class Bounds(object):
     '''
     Object describing some boundary.
     '''
+    __slots__ = ('x1', 'y1', 'x2', 'y2')
+
     def __init__(self, x1, y1, x2, y2):
         self.x1  = x1
         self.y1  = y1
@@ -25,3 +27,10 @@ class Bounds(object):
                 b.x2 > 0 and b.x2 <= self.width and
                 b.y2 > 0 and b.y2 <= self.height and
                 b.x1 < b.x2 and b.y1 < b.y2)
+
+    def intersects(self, bounds):
+        '''
+        Tests whether or not we overlap the specified bounds.
+        '''
+        return (self.x1 < bounds.x2 and bounds.x1 < self.x2 and
+                self.y1 < bounds.y2 and bounds.y1 < self.y2)
@@ -1,3 +1,5 @@
+import weakref
+
 from .anchor import LeftAnchor, RightAnchor, TopAnchor, BottomAnchor
 from .bounds import Bounds
 
@@ -8,10 +10,43 @@ V_ANCHORS = (TopAnchor, BottomAnchor)
 class _Frame(object):
     '''
     Base class for frame-like objects.
+
+    The resolved bounds of a frame are cached the first time they are
+    requested.  Whenever the frame may have moved (because some frame it is
+    anchored to was resized) the cache is dropped and the generation counter
+    is bumped; clients can compare generation values to cheaply tell if a
+    frame needs to be laid out again.
     '''
+    __slots__ = ('min_width', 'min_height', 'generation', '_bounds',
+                 '_dependents', '__weakref__')
+
     def __init__(self, min_width=1, min_height=1):
-        self.min_width  = min_width
-        self.min_height = min_height
+        self.min_width   = min_width
+        self.min_height  = min_height
+        self.generation  = 0
+        self._bounds     = None
+        self._dependents = None
+
+    @property
+    def dependents(self):
+        '''
+        The list of frames directly anchored to this frame.
+        '''
+        if not self._dependents:
+            return []
+        frames = [r() for r in self._dependents.values()]
+        if None in frames:
+            self._dependents = {k: r for k, r in self._dependents.items()
+                                if r() is not None}
+        return [f for f in frames if f is not None]
+
+    def _add_dependent(self, frame):
+        # Dependents are held weakly, keyed by id() so that a frame anchored
+        # to us by more than one edge is only recorded once.  This is much
+        # lighter than a WeakSet, which matters with many frames.
+        if self._dependents is None:
+            self._dependents = {}
+        self._dependents[id(frame)] = weakref.ref(frame)
 
     def left_anchor(self, dx=0):
         return LeftAnchor(self, dx)
@@ -37,14 +72,35 @@ class _Frame(object):
     def compute_bottom_edge(self):
         raise NotImplementedError
 
-    @property
-    def bounds(self):
+    def _compute_bounds(self):
         x1 = self.compute_left_edge()
         x2 = self.compute_right_edge()
         y1 = self.compute_top_edge()
         y2 = self.compute_bottom_edge()
         return Bounds(x1, y1, x2, y2)
 
+    @property
+    def bounds(self):
+        if self._bounds is None:
+            self._bounds = self._compute_bounds()
+        return self._bounds
+
+    def invalidate(self):
+        '''
+        Discards the cached bounds for this frame and every frame anchored to
+        it, directly or indirectly.  The bounds will be recomputed the next
+        time they are requested.
+        '''
+        # Iterative rather than recursive so that long chains of anchored
+        # frames can't exhaust the stack.
+        stack = [self]
+        while stack:
+            f             = stack.pop()
+            f.generation += 1
+            if f._bounds is not None:
+                f._bounds = None
+                stack.extend(f.dependents)
+
     def is_size_valid(self):
         '''
         Checks if the frame meets its minimum dimensions.
@@ -80,6 +136,9 @@ class Frame(_Frame):
     objects in some coordinate space but themselves do not have any physical
     representation.
     '''
+    __slots__ = ('_left_anchor', '_right_anchor', '_top_anchor',
+                 '_bottom_anchor', '_width', '_height')
+
     def __init__(self, left_anchor=None, right_anchor=None,
                  top_anchor=None, bottom_anchor=None, width=None, height=None,
                  min_width=1, min_height=1):
@@ -101,6 +160,10 @@ class Frame(_Frame):
         assert height is None or height != 0
         assert width is None or width != 0
 
+        for a in (left_anchor, right_anchor, top_anchor, bottom_anchor):
+            if a:
+                a.frame._add_dependent(self)
+
     def compute_left_edge(self):
         if self._left_anchor:
             return self._left_anchor.compute()
@@ -127,6 +190,8 @@ class StaticFrame(_Frame):
     A frame-like class which has static dimensions and is anchored at an
     absolute position in the coordinate system.
     '''
+    __slots__ = ('_x1', '_y1', '_x2', '_y2')
+
     def __init__(self, h, w, y, x):
         super(StaticFrame, self).__init__(min_width=w, min_height=h)
         self.resize(h, w, y, x)
@@ -137,6 +202,11 @@ class StaticFrame(_Frame):
         self._x2 = x + w
         self._y2 = y + h
 
+        self.generation += 1
+        self._bounds = Bounds(self._x1, self._y1, self._x2, self._y2)
+        for f in self.dependents:
+            f.invalidate()
+
     def compute_left_edge(self):
         return self._x1
 
@@ -0,0 +1,64 @@
+class LayoutCycleError(Exception):
+    '''
+    Raised when a set of frames is anchored to each other in a cycle and so
+    their bounds can never be resolved.
+    '''
+    pass
+
+
+def _collect(root):
+    '''
+    Returns the list of all frames anchored to root, directly or indirectly,
+    including root itself.
+    '''
+    frames = [root]
+    seen   = set(frames)
+    i      = 0
+    while i < len(frames):
+        for f in frames[i].dependents:
+            if f not in seen:
+                seen.add(f)
+                frames.append(f)
+        i += 1
+    return frames
+
+
+def sort(root):
+    '''
+    Returns the list of all frames anchored to root, directly or indirectly,
+    ordered such that every frame comes after all of the frames it is
+    anchored to.  Raises LayoutCycleError if the anchors form a cycle.
+    '''
+    frames  = _collect(root)
+    pending = {f: 0 for f in frames}
+    for f in frames:
+        for d in f.dependents:
+            pending[d] += 1
+
+    order = [f for f in frames if pending[f] == 0]
+    i     = 0
+    while i < len(order):
+        for d in order[i].dependents:
+            pending[d] -= 1
+            if pending[d] == 0:
+                order.append(d)
+        i += 1
+
+    if len(order) != len(frames):
+        raise LayoutCycleError('Anchor cycle detected among %u frames' %
+                               (len(frames) - len(order)))
+    return order
+
+
+def solve(root):
+    '''
+    Resolves the bounds of root and every frame anchored to it in a single
+    pass over the anchor graph.  Each frame's edges are computed exactly once,
+    after the edges of every frame it depends on, so the total cost is linear
+    in the number of frames.  Frames whose cached bounds are still valid are
+    not recomputed.  Returns the frames in the order they were resolved.
+    '''
+    order = sort(root)
+    for f in order:
+        f.bounds
+    return order
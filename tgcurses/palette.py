@@ -0,0 +1,155 @@
+'''
+Allocation of curses color pairs.  A Palette hands out the attribute for a
+(fg, bg, attrs) combination, initializing a color pair the first time a
+(fg, bg) pair of colors is used and reusing it afterwards, so that drawing
+code can simply ask for the colors it wants on every draw.  tgcurses.init()
+creates one for the screen, which every canvas returns as canvas.palette:
+
+    canvas.addstr('hot', attr=canvas.palette.attr((255, 64, 0),
+                                                  attrs=A_BOLD))
+
+Colors may be given as terminal color numbers, as (r, g, b) tuples with
+components from 0 to 255, or as None or -1 for the terminal's default color.
+Colors the terminal can't display are mapped to the nearest one it can, using
+tables computed once when the module is imported.
+
+When every color pair is in use, the least recently used one is redefined.
+Text already drawn with the old pair changes color on the terminal, so a
+screen should not use more distinct color combinations at once than the
+terminal has pairs.
+'''
+import collections
+import curses
+import functools
+
+
+# Intensities of the six levels of each component in the xterm 6x6x6 color
+# cube.
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+# Maximum number of (fg, bg, attrs) lookups a Palette remembers.
+ATTR_CACHE_SIZE = 4096
+
+
+def _xterm_rgb():
+    '''
+    Returns the list of the (r, g, b) values of the 256 xterm colors.
+    '''
+    rgb = [(0, 0, 0), (128, 0, 0), (0, 128, 0), (128, 128, 0),
+           (0, 0, 128), (128, 0, 128), (0, 128, 128), (192, 192, 192),
+           (128, 128, 128), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+           (0, 0, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255)]
+    rgb += [(r, g, b) for r in CUBE_LEVELS for g in CUBE_LEVELS
+            for b in CUBE_LEVELS]
+    rgb += [(8 + 10*i,)*3 for i in range(24)]
+    return rgb
+
+
+def _distance(a, b):
+    return (a[0] - b[0])**2 + (a[1] - b[1])**2 + (a[2] - b[2])**2
+
+
+def _nearest(rgb, n):
+    '''
+    Returns the number of the one of the first n xterm colors nearest rgb.
+    '''
+    return min(range(n), key=lambda i: _distance(rgb, XTERM_RGB[i]))
+
+
+XTERM_RGB = _xterm_rgb()
+
+# Index of the nearest cube level for each component intensity.
+_CUBE_INDEX = [min(range(6), key=lambda i: abs(v - CUBE_LEVELS[i]))
+               for v in range(256)]
+
+# The nearest of the 16 and of the 8 basic colors for each xterm color.
+TO_16 = [_nearest(rgb, 16) for rgb in XTERM_RGB]
+TO_8  = [_nearest(rgb, 8) for rgb in XTERM_RGB]
+
+
+@functools.lru_cache(maxsize=4096)
+def rgb_to_256(rgb):
+    '''
+    Returns the number of the xterm color nearest the (r, g, b) tuple, from
+    the color cube or the grayscale ramp.
+    '''
+    r, g, b = rgb
+    cube    = 16 + 36*_CUBE_INDEX[r] + 6*_CUBE_INDEX[g] + _CUBE_INDEX[b]
+    gray    = 232 + min(max((r + g + b)//3 - 3, 0)//10, 23)
+    if _distance(rgb, XTERM_RGB[gray]) < _distance(rgb, XTERM_RGB[cube]):
+        return gray
+    return cube
+
+
+class Palette(object):
+    '''
+    Maps (fg, bg, attrs) combinations to curses attributes, allocating color
+    pairs on demand.  colors and pairs default to curses.COLORS and
+    curses.COLOR_PAIRS and so can only be omitted after
+    curses.start_color().  Pair 0 is reserved by curses and, since the pair
+    number must fit in the A_COLOR bits of an attribute, at most 255 other
+    pairs are used.  On a terminal without colors attr() returns attrs
+    unchanged.
+    '''
+    def __init__(self, colors=None, pairs=None):
+        self.colors = curses.COLORS if colors is None else colors
+        pairs       = curses.COLOR_PAIRS if pairs is None else pairs
+        self.pairs  = collections.OrderedDict()
+        self._free  = list(range(min(pairs, 256) - 1, 0, -1))
+        self._attrs = {}
+
+    def color(self, c):
+        '''
+        Returns the number of the terminal color nearest c, or -1 for the
+        default color.  Raises ValueError for colors that aren't one of the
+        256 xterm colors.
+        '''
+        if c is None or c == -1:
+            return -1
+        if isinstance(c, tuple):
+            c = rgb_to_256(c)
+        elif not 0 <= c < 256:
+            raise ValueError('color %r out of range' % (c,))
+        if c < self.colors:
+            return c
+        return TO_16[c] if self.colors >= 16 else TO_8[c]
+
+    def attr(self, fg=None, bg=None, attrs=0):
+        '''
+        Returns the curses attribute drawing in the fg and bg colors with the
+        additional attrs.
+        '''
+        if self.colors < 8:
+            return attrs
+        key   = (fg, bg, attrs)
+        entry = self._attrs.get(key)
+        if entry is not None and self.pairs.get(entry[0]) == entry[1]:
+            self.pairs.move_to_end(entry[0])
+            return entry[2]
+
+        colors = (self.color(fg), self.color(bg))
+        n      = self.pairs.get(colors)
+        if n is None:
+            n = self._alloc(colors)
+        else:
+            self.pairs.move_to_end(colors)
+        attr = curses.color_pair(n) | attrs
+        if len(self._attrs) >= ATTR_CACHE_SIZE:
+            self._attrs.clear()
+        self._attrs[key] = (colors, n, attr)
+        return attr
+
+    def _alloc(self, colors):
+        '''
+        Initializes a color pair for the (fg, bg) color numbers, redefining
+        the least recently used one if none are free, and returns its number.
+        '''
+        if self._free:
+            n = self._free.pop()
+        else:
+            if not self.pairs:
+                raise curses.error('terminal has no color pairs')
+            _, n = self.pairs.popitem(last=False)
+        curses.init_pair(n, *colors)
+        self.pairs[colors] = n
+        return n
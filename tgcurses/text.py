@@ -0,0 +1,139 @@
+'''
+Measuring and fitting text by the number of terminal columns it occupies
+rather than by its length: East Asian wide and fullwidth characters, which
+include most CJK and emoji, take two columns, and combining marks take none.
+
+Widths are computed with unicodedata and cached, as are fitted strings, so
+text that is redrawn repeatedly is only measured once.  Printable ASCII text
+takes a fast path that never consults unicodedata.
+
+Control characters are measured as zero columns wide.  fit() and wrap()
+expand tabs to 8-column stops first; other control characters should be
+removed by the caller.
+'''
+import functools
+import unicodedata
+
+
+ELLIPSIS = u'\u2026'
+
+
+def _printable_ascii(text):
+    return text.isascii() and text.isprintable()
+
+
+@functools.lru_cache(maxsize=4096)
+def char_width(ch):
+    '''
+    Returns the number of columns the character occupies: 0 for combining
+    marks, format and control characters, 2 for wide and fullwidth
+    characters and 1 otherwise.
+    '''
+    if ' ' <= ch < '\x7f':
+        return 1
+    if unicodedata.combining(ch) or unicodedata.category(ch) in ('Mn', 'Me',
+                                                                 'Cf', 'Cc'):
+        return 0
+    if unicodedata.east_asian_width(ch) in ('W', 'F'):
+        return 2
+    return 1
+
+
+@functools.lru_cache(maxsize=8192)
+def text_width(text):
+    '''
+    Returns the number of columns the string occupies.
+    '''
+    if _printable_ascii(text):
+        return len(text)
+    return sum(map(char_width, text))
+
+
+def truncate(text, width):
+    '''
+    Returns the longest prefix of text that fits in width columns.
+    '''
+    if _printable_ascii(text):
+        return text[:max(width, 0)]
+    w = 0
+    for i, ch in enumerate(text):
+        w += char_width(ch)
+        if w > width:
+            return text[:i]
+    return text
+
+
+def columns(text, start, width):
+    '''
+    Returns the part of text occupying columns [start, start + width).  A
+    wide character straddling either edge is left out.
+    '''
+    if _printable_ascii(text):
+        return text[start:start + width]
+    chars = []
+    x     = 0
+    end   = start + width
+    for ch in text:
+        if x >= end:
+            break
+        w = char_width(ch)
+        if x >= start and x + w <= end:
+            chars.append(ch)
+        x += w
+    return ''.join(chars)
+
+
+@functools.lru_cache(maxsize=4096)
+def fit(text, width, align='<', ellipsis=ELLIPSIS, pad=True):
+    '''
+    Fits text into width columns.  Text that is too wide is truncated and
+    ends with ellipsis, if it fits; if pad is True, narrower text is padded
+    with spaces, on the right if align is '<' or on the left if it is '>',
+    so that the result is exactly width columns wide.
+    '''
+    if width <= 0:
+        return ''
+    if '\t' in text:
+        text = text.expandtabs()
+    w = text_width(text)
+    if w > width:
+        ew = text_width(ellipsis)
+        if ew < width:
+            text = truncate(text, width - ew) + ellipsis
+        else:
+            text = truncate(text, width)
+        w = text_width(text)
+    if not pad or w >= width:
+        return text
+    if align == '>':
+        return ' '*(width - w) + text
+    return text + ' '*(width - w)
+
+
+def wrap(text, width):
+    '''
+    Splits text into a list of rows no more than width columns wide.  A wide
+    character that doesn't fit at the end of a row starts the next one.
+    '''
+    if '\t' in text:
+        text = text.expandtabs()
+    if width <= 0:
+        return [text]
+    if _printable_ascii(text):
+        if len(text) <= width:
+            return [text]
+        return [text[i:i + width] for i in range(0, len(text), width)]
+
+    rows = []
+    row  = []
+    w    = 0
+    for ch in text:
+        cw = char_width(ch)
+        if w + cw > width and row:
+            rows.append(''.join(row))
+            row = []
+            w   = 0
+        row.append(ch)
+        w += cw
+    rows.append(''.join(row))
+    return rows
@@ -2,8 +2,16 @@ import curses
 
 from .window import Window
 from .workspace import Workspace
-from .menu import Menu
+from .menu import Menu, VirtualMenu, PagedSource
 from .edit_field import EditField
+from .text_area import TextArea
+from .log_pane import LogPane
+from .pager import Pager
+from .stats_pane import StatsPane
+from .table import Table, Column
+from .scheduler import RenderScheduler
+from .update_queue import UpdateQueue
+from .aio import AsyncDriver
 
 
 def doupdate():
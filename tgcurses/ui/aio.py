@@ -0,0 +1,134 @@
+import asyncio
+import curses
+import sys
+
+
+class AsyncDriver(object):
+    '''
+    Drives a Workspace from an asyncio event loop instead of a polling getch()
+    loop.  stdin is registered with the event loop, so nothing runs while the
+    user is idle; when input arrives every pending key is read and delivered
+    to the focused Window's handlech() method, falling back to the on_key
+    callable for keys the window didn't consume.  Keys are read from the
+    focused window's content canvas, with keypad mode enabled so that KEY_*
+    codes are delivered, and its timeout is left as it was.  KEY_RESIZE is
+    handled by relaying out the workspace and passing the list of resized
+    windows to the on_resize callable.
+
+    Background tasks may draw into any canvas and then call request_redraw();
+    all requests made before the event loop next becomes idle are coalesced
+    into a single Workspace.render(), i.e. one noutrefresh() per damaged
+    canvas followed by one doupdate().  If a RenderScheduler is installed on
+    the workspace, redraws are additionally held back to its frame rate.
+
+        driver = AsyncDriver(workspace, on_key=handle_key)
+        asyncio.run(driver.run())
+    '''
+    def __init__(self, workspace, on_key=None, on_resize=None):
+        self.workspace = workspace
+        self.on_key    = on_key
+        self.on_resize = on_resize
+        self.loop      = None
+        self._redraw   = None
+        self._done     = None
+
+    def request_redraw(self):
+        '''
+        Schedules a render of the workspace the next time the event loop runs
+        its callbacks.  May only be called from the event loop's thread.
+        '''
+        if self._redraw is not None or self.loop is None:
+            return
+        scheduler = self.workspace.canvas.scheduler
+        delay     = scheduler.time_until_flush() if scheduler else None
+        if delay:
+            self._redraw = self.loop.call_later(delay, self.redraw)
+        else:
+            self._redraw = self.loop.call_soon(self.redraw)
+
+    def redraw(self):
+        '''
+        Renders the workspace immediately.
+        '''
+        self._redraw = None
+        scheduler    = self.workspace.canvas.scheduler
+        if scheduler is not None:
+            scheduler.flush(force=True)
+        else:
+            focus = self.workspace.focus
+            self.workspace.render(focus.content if focus is not None else None)
+
+    def attach_queue(self, queue):
+        '''
+        Drains the specified UpdateQueue on the event loop whenever worker
+        threads post to it, and then requests a redraw.  Must be called from
+        run() or a task running alongside it.
+        '''
+        loop         = self.loop
+        queue.notify = lambda: loop.call_soon_threadsafe(self._drain, queue)
+        if len(queue):
+            loop.call_soon(self._drain, queue)
+
+    def _drain(self, queue):
+        if queue.drain():
+            self.request_redraw()
+
+    def _input_canvas(self):
+        focus = self.workspace.focus
+        return focus.content if focus is not None else self.workspace.canvas
+
+    def _on_readable(self):
+        canvas = self._input_canvas()
+        delay  = canvas.delay
+        canvas.keypad(1)
+        canvas.timeout(0)
+        try:
+            c = canvas.getch()
+            while c != -1:
+                self.dispatch(c)
+                if self._done is None or self._done.done():
+                    break
+                c = canvas.getch()
+        finally:
+            canvas.timeout(delay)
+        self.request_redraw()
+
+    def dispatch(self, c):
+        '''
+        Delivers a single key as if it had been read from the terminal.
+        '''
+        if c == curses.KEY_RESIZE:
+            windows = self.workspace.handle_resize(self._input_canvas())
+            if self.on_resize is not None:
+                self.on_resize(windows)
+            return
+
+        focus = self.workspace.focus
+        if focus is not None and focus.handlech(c):
+            return
+        if self.on_key is not None:
+            self.on_key(c)
+
+    async def run(self):
+        '''
+        Processes input and redraw requests until stop() is called.
+        '''
+        self.loop  = asyncio.get_running_loop()
+        self._done = self.loop.create_future()
+        fd         = sys.stdin.fileno()
+        self.loop.add_reader(fd, self._on_readable)
+        self.request_redraw()
+        try:
+            await self._done
+        finally:
+            self.loop.remove_reader(fd)
+            if self._redraw is not None:
+                self._redraw.cancel()
+                self._redraw = None
+
+    def stop(self):
+        '''
+        Makes run() return once the current callback completes.
+        '''
+        if self._done is not None and not self._done.done():
+            self._done.set_result(None)
@@ -1,18 +1,42 @@
 import curses
 import curses.ascii
 
+from ..text import fit, text_width, truncate
+
+
+CTRL_A = curses.ascii.ctrl(ord('a'))
+CTRL_E = curses.ascii.ctrl(ord('e'))
+CTRL_K = curses.ascii.ctrl(ord('k'))
+CTRL_U = curses.ascii.ctrl(ord('u'))
+CTRL_W = curses.ascii.ctrl(ord('w'))
+CTRL_Y = curses.ascii.ctrl(ord('y'))
+
 
 class EditField(object):
     '''
     An EditField is a single-line region of a canvas that can be used to input
     text.
+
+    By default the text is limited to the width of the field.  If scroll is
+    True the text is unbounded and the field scrolls horizontally to keep the
+    edit point visible; left is the index of the first visible character.
+    Widths and the screen cursor are measured in display columns, so wide
+    characters take two.
+
+    Editing redraws only from the edit point to the end of the visible span
+    (or the whole field if it had to scroll).  Besides the usual cursor keys
+    the field supports word-wise movement with shifted arrows and
+    emacs-style ^A/^E, ^K/^U/^W kill and ^Y yank.
     '''
-    def __init__(self, canvas, pos, width, text=''):
+    def __init__(self, canvas, pos, width, text='', scroll=False):
         self.canvas   = canvas
         self.pos      = pos
         self.width    = width
         self.text     = text
         self.text_pos = 0
+        self.scroll   = scroll
+        self.left     = 0
+        self.killed   = ''
         self.show()
 
     def hide(self):
@@ -20,38 +44,154 @@ class EditField(object):
         Removes the edit field from the screen on the next update.
         '''
         self.canvas.addstr(' '*self.width, pos=self.pos)
-        self.canvas.noutrefresh()
+        self.canvas.update()
 
     def show(self):
         '''
         Displays the edit field on the next update.
         '''
-        self.canvas.addstr('%-*s' % (self.width, self.text),
-                            pos=self.pos, attr=curses.A_UNDERLINE)
-        self.canvas.noutrefresh()
+        self._scroll_to_cursor()
+        self._draw(self.left)
+
+    def _scroll_to_cursor(self):
+        '''
+        Adjusts left so that the edit point is visible and returns True if it
+        changed.
+        '''
+        if not self.scroll:
+            return False
+        left = self.left
+        if self.text_pos < self.left:
+            self.left = self.text_pos
+        else:
+            # Keep the cell under the cursor, which may be a wide character,
+            # inside the field.
+            cursor = text_width(self.text[self.text_pos:self.text_pos + 1])
+            before = self.text[self.left:self.text_pos]
+            n      = len(truncate(before[::-1], self.width - max(cursor, 1)))
+            if n < len(before):
+                self.left = self.text_pos - n
+        self.left = max(0, min(self.left, len(self.text)))
+        return left != self.left
+
+    def _draw(self, start):
+        '''
+        Draws the field from text index start to the end of the visible span.
+        '''
+        x = text_width(self.text[self.left:start])
+        if x >= self.width:
+            return
+        self.canvas.addstr(fit(self.text[start:], self.width - x, ellipsis=''),
+                           pos=(self.pos[0], self.pos[1] + x),
+                           attr=curses.A_UNDERLINE)
+        self.canvas.update()
+
+    def _redraw(self, start):
+        '''
+        Redraws after a change to the text at or after index start.
+        '''
+        if self._scroll_to_cursor():
+            self._draw(self.left)
+        else:
+            self._draw(max(start, self.left))
 
     def move(self):
         '''
         Positions the screen cursor at the edit point for this field.
         '''
-        self.canvas.move(self.pos[0], self.pos[1] + self.text_pos)
-        self.canvas.noutrefresh()
+        self.canvas.move(self.pos[0], self.pos[1] +
+                         text_width(self.text[self.left:self.text_pos]))
+        self.canvas.update()
+
+    def set_text_pos(self, text_pos):
+        '''
+        Moves the edit point, scrolling the field if necessary.
+        '''
+        self.text_pos = max(0, min(text_pos, len(self.text)))
+        if self._scroll_to_cursor():
+            self._draw(self.left)
+
+    def insert(self, text):
+        '''
+        Inserts text at the edit point.  If the field doesn't scroll, the text
+        is truncated to fit.
+        '''
+        if not self.scroll:
+            text = truncate(text, self.width - text_width(self.text))
+        if not text:
+            return
+        start          = self.text_pos
+        self.text      = self.text[:start] + text + self.text[start:]
+        self.text_pos += len(text)
+        self._redraw(start)
+
+    def delete(self, start, end):
+        '''
+        Deletes and returns the text between indices start and end, leaving
+        the edit point at start.
+        '''
+        removed       = self.text[start:end]
+        self.text     = self.text[:start] + self.text[end:]
+        self.text_pos = start
+        if removed:
+            self._redraw(start)
+        return removed
+
+    def word_left(self):
+        '''
+        Returns the index of the start of the word before the edit point.
+        '''
+        i = self.text_pos
+        while i and self.text[i - 1].isspace():
+            i -= 1
+        while i and not self.text[i - 1].isspace():
+            i -= 1
+        return i
+
+    def word_right(self):
+        '''
+        Returns the index of the end of the word after the edit point.
+        '''
+        i = self.text_pos
+        n = len(self.text)
+        while i < n and self.text[i].isspace():
+            i += 1
+        while i < n and not self.text[i].isspace():
+            i += 1
+        return i
 
     def handlech(self, c):
         '''
-        Handle the specified editing character.
+        Handle the specified editing character.  Returns True if it was
+        consumed.
         '''
         if c in (curses.KEY_BACKSPACE, curses.ascii.BS, curses.ascii.DEL):
             if self.text_pos:
-                self.text      = (self.text[:self.text_pos - 1] +
-                                  self.text[self.text_pos:])
-                self.text_pos -= 1
+                self.delete(self.text_pos - 1, self.text_pos)
+        elif c == curses.KEY_DC:
+            self.delete(self.text_pos, self.text_pos + 1)
         elif c == curses.KEY_LEFT:
-            self.text_pos = max(self.text_pos - 1, 0)
+            self.set_text_pos(self.text_pos - 1)
         elif c == curses.KEY_RIGHT:
-            self.text_pos = min(self.text_pos + 1, len(self.text))
+            self.set_text_pos(self.text_pos + 1)
+        elif c == curses.KEY_SLEFT:
+            self.set_text_pos(self.word_left())
+        elif c == curses.KEY_SRIGHT:
+            self.set_text_pos(self.word_right())
+        elif c in (curses.KEY_HOME, CTRL_A):
+            self.set_text_pos(0)
+        elif c in (curses.KEY_END, CTRL_E):
+            self.set_text_pos(len(self.text))
+        elif c == CTRL_K:
+            self.killed = self.delete(self.text_pos, len(self.text))
+        elif c == CTRL_U:
+            self.killed = self.delete(0, self.text_pos)
+        elif c == CTRL_W:
+            self.killed = self.delete(self.word_left(), self.text_pos)
+        elif c == CTRL_Y:
+            self.insert(self.killed)
         elif curses.ascii.isprint(c):
-            if len(self.text) < self.width:
-                self.text      = (self.text[:self.text_pos] + chr(c) +
-                                  self.text[self.text_pos:])
-                self.text_pos += 1
+            self.insert(chr(c))
+        else:
+            return False
+        return True
@@ -0,0 +1,93 @@
+class GapBuffer(object):
+    '''
+    A GapBuffer holds a sequence of characters with an unused gap at the edit
+    point.  Inserting or deleting at the gap is amortized O(1) regardless of
+    the length of the text; moving the gap costs the distance moved.  This
+    suits editing, where consecutive edits happen close together.
+    '''
+    def __init__(self, text='', gap=16):
+        self._buf   = list(text) + [None]*gap
+        self._start = len(text)
+        self._end   = len(self._buf)
+
+    def __len__(self):
+        return len(self._buf) - (self._end - self._start)
+
+    def __str__(self):
+        return ''.join(self._buf[:self._start] + self._buf[self._end:])
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index < self._start:
+            return self._buf[index]
+        return self._buf[index + self._end - self._start]
+
+    @property
+    def point(self):
+        '''
+        The position of the gap, i.e. where text is inserted.
+        '''
+        return self._start
+
+    def slice(self, start, end):
+        '''
+        Returns the text between the specified positions as a string.
+        '''
+        start = max(0, min(start, len(self)))
+        end   = max(start, min(end, len(self)))
+        gap   = self._end - self._start
+        if end <= self._start:
+            return ''.join(self._buf[start:end])
+        if start >= self._start:
+            return ''.join(self._buf[start + gap:end + gap])
+        return ''.join(self._buf[start:self._start] +
+                       self._buf[self._end:end + gap])
+
+    def move(self, pos):
+        '''
+        Moves the gap to the specified position.
+        '''
+        pos = max(0, min(pos, len(self)))
+        if pos < self._start:
+            n           = self._start - pos
+            self._buf[self._end - n:self._end] = self._buf[pos:self._start]
+            self._start = pos
+            self._end  -= n
+        elif pos > self._start:
+            n           = pos - self._start
+            self._buf[self._start:pos] = self._buf[self._end:self._end + n]
+            self._start = pos
+            self._end  += n
+
+    def insert(self, text):
+        '''
+        Inserts text at the gap, leaving the gap after it.
+        '''
+        n = len(text)
+        if n > self._end - self._start:
+            grow       = max(n, len(self._buf))
+            self._buf[self._end:self._end] = [None]*grow
+            self._end += grow
+        self._buf[self._start:self._start + n] = text
+        self._start += n
+
+    def delete_back(self, n=1):
+        '''
+        Deletes up to n characters before the gap and returns them.
+        '''
+        n            = min(n, self._start)
+        text         = ''.join(self._buf[self._start - n:self._start])
+        self._start -= n
+        return text
+
+    def delete_forward(self, n=1):
+        '''
+        Deletes up to n characters after the gap and returns them.
+        '''
+        n          = min(n, len(self._buf) - self._end)
+        text       = ''.join(self._buf[self._end:self._end + n])
+        self._end += n
+        return text
@@ -0,0 +1,174 @@
+import collections
+import curses
+import _curses
+
+from ..text import fit, truncate, wrap
+
+
+class LogPane(object):
+    '''
+    A LogPane displays a stream of text lines in a Window's content canvas,
+    like the output of tail -f.  Lines are kept in a ring buffer holding the
+    most recent capacity lines; append() is O(1) and draws nothing, so lines
+    can arrive much faster than the screen is updated.  draw() brings the
+    canvas up to date: if the view is following the tail it scrolls the
+    canvas and draws only the rows for lines appended since the last draw,
+    otherwise it redraws the visible rows.  Long lines are wrapped to the
+    canvas width (or truncated if wrap is False) only when they are drawn.
+
+    The view can be scrolled back through the buffer; while scrolled back,
+    new lines don't move the view.
+    '''
+    def __init__(self, window, capacity=10000, wrap=True):
+        self.window   = window
+        self.lines    = collections.deque(maxlen=capacity)
+        self.wrap     = wrap
+        self.offset   = 0
+        self.appended = 0
+        self._drawn   = None
+        self._used    = 0
+        self.draw()
+
+    def append(self, line):
+        '''
+        Appends a line of text to the buffer, discarding the oldest line if
+        the buffer is full.  The line should not contain newlines.
+        '''
+        self.lines.append(line)
+        self.appended += 1
+        if self.offset:
+            self.offset = min(self.offset + 1, len(self.lines) - 1)
+
+    def extend(self, lines):
+        '''
+        Appends each of the specified lines.
+        '''
+        for l in lines:
+            self.append(l)
+
+    def clear(self):
+        '''
+        Discards all lines.
+        '''
+        self.lines.clear()
+        self.offset = 0
+        self.invalidate()
+
+    def invalidate(self):
+        '''
+        Forces the next draw() to redraw every visible row.
+        '''
+        self._drawn = None
+
+    def scroll_back(self, n):
+        '''
+        Scrolls the view n lines back towards the start of the buffer.
+        '''
+        offset = max(0, min(self.offset + n, len(self.lines) - 1))
+        if offset != self.offset:
+            self.offset = offset
+            self.invalidate()
+
+    def scroll_forward(self, n):
+        '''
+        Scrolls the view n lines forward towards the tail of the buffer.
+        '''
+        self.scroll_back(-n)
+
+    def follow(self):
+        '''
+        Scrolls the view to the tail of the buffer, where it follows new
+        lines.
+        '''
+        self.scroll_back(-self.offset)
+
+    def handlech(self, c):
+        '''
+        Handle the specified scrolling key and redraw.  Returns True if the
+        key was consumed.
+        '''
+        page = max(self.window.content.height - 1, 1)
+        if c == curses.KEY_UP:
+            self.scroll_back(1)
+        elif c == curses.KEY_DOWN:
+            self.scroll_forward(1)
+        elif c == curses.KEY_PPAGE:
+            self.scroll_back(page)
+        elif c == curses.KEY_NPAGE:
+            self.scroll_forward(page)
+        elif c == curses.KEY_HOME:
+            self.scroll_back(len(self.lines))
+        elif c == curses.KEY_END:
+            self.follow()
+        else:
+            return False
+        self.draw()
+        return True
+
+    def _wrap(self, line):
+        width = self.window.content.width
+        line  = line.expandtabs()
+        if not self.wrap:
+            return [truncate(line, width)]
+        return wrap(line, width)
+
+    def _tail_rows(self, n, skip=0, count=None):
+        '''
+        Returns up to the last n display rows of the buffer, ignoring the
+        last skip lines and considering at most count lines.  Only as many
+        lines as are needed are wrapped.
+        '''
+        rows = []
+        i    = len(self.lines) - 1 - skip
+        end  = -1 if count is None else max(i - count, -1)
+        while i > end and len(rows) < n:
+            rows[0:0] = self._wrap(self.lines[i])
+            i        -= 1
+        return rows[-n:] if n else []
+
+    def _draw_rows(self, rows, y):
+        content = self.window.content
+        width   = content.width
+        for i, r in enumerate(rows):
+            try:
+                content.addstr(fit(r, width, ellipsis=''), pos=(y + i, 0))
+            except _curses.error:
+                pass
+
+    def draw(self):
+        '''
+        Updates the canvas to show the current contents of the buffer.
+        '''
+        content = self.window.content
+        height  = content.height
+        new     = None if self._drawn is None else self.appended - self._drawn
+        if new == 0:
+            return
+
+        if self.offset == 0 and new is not None and new < height:
+            rows = self._tail_rows(height, count=new)
+            k    = len(rows)
+            if self._used + k <= height:
+                self._draw_rows(rows, self._used)
+                self._used += k
+                self._drawn = self.appended
+                content.update()
+                return
+            if k < height:
+                content.idlok(True)
+                content.scrollok(True)
+                content.scroll(self._used + k - height)
+                content.scrollok(False)
+                self._draw_rows(rows, height - k)
+                self._used  = height
+                self._drawn = self.appended
+                content.update()
+                return
+
+        rows = self._tail_rows(height, self.offset)
+        self._draw_rows(rows, 0)
+        for y in range(len(rows), height):
+            content.clrline(y)
+        self._used  = len(rows)
+        self._drawn = self.appended
+        content.update()
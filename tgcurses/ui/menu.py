@@ -1,8 +1,15 @@
+import collections
 import curses
+import curses.ascii
 import _curses
 
+from ..text import fit
+from .type_ahead import TypeAheadIndex
+
 
 class MenuItem(object):
+    __slots__ = ('name', 'checked')
+
     def __init__(self, name, checked=None):
         self.name    = name
         self.checked = checked
@@ -26,7 +33,22 @@ class MenuItem(object):
 
 
 class Menu(object):
-    def __init__(self, window, items, selection=0, checked=None):
+    '''
+    A scrollable list of items drawn in a Window's content canvas.  The menu
+    can be filtered by typing: filter() restricts the displayed items to
+    those matching a query.  Positions such as selection and top are indices
+    into the displayed (possibly filtered) list; item indices, as taken by
+    check_item() and friends, refer to the full list and can be obtained
+    with item_index().
+
+    filter_mode selects how queries match item names: 'prefix' matches the
+    start of the name and takes a pair of binary searches per keystroke,
+    while 'substring' matches anywhere in the name and, although its index
+    narrows most queries quickly, is slower when a long query matches many
+    items.
+    '''
+    def __init__(self, window, items, selection=0, checked=None,
+                 filter_mode='prefix'):
         self.window = window
         if checked is not None:
             self.items = [MenuItem(n, i in checked)
@@ -36,51 +58,207 @@ class Menu(object):
         self.selection   = selection
         self.top         = 0
         self.hilite_attr = curses.A_REVERSE
+        self.view        = None
+        self.filter_mode = filter_mode
+        self.type_ahead  = None
+        if self.items:
+            self._build_filter()
+        self.draw()
+
+    def __len__(self):
+        return self._item_count() if self.view is None else len(self.view)
+
+    def _item_count(self):
+        return len(self.items)
+
+    def _item_name(self, index):
+        return self.items[index].name
+
+    def _item_text(self, index):
+        return str(self.items[index])
+
+    def item_index(self, pos):
+        '''
+        Returns the item index of the item displayed at position pos.
+        '''
+        return pos if self.view is None else self.view[pos]
+
+    @property
+    def selected_index(self):
+        '''
+        The item index of the selected item, or None if the filter matched
+        nothing.
+        '''
+        if self.selection >= len(self):
+            return None
+        return self.item_index(self.selection)
+
+    @property
+    def filter_text(self):
+        return self.type_ahead.query if self.type_ahead else ''
+
+    def filter(self, text):
+        '''
+        Restricts the displayed items to those whose names match text, as a
+        case-insensitive substring or, if filter_mode is 'prefix', prefix.
+        An empty text removes the filter.  The search index is built when the
+        items are set, in the background for substring mode, or else the first
+        time the menu is filtered; call invalidate_filter() if the item names
+        change.
+        '''
+        if (self.type_ahead is None or
+                self.type_ahead.mode != self.filter_mode):
+            self._build_filter()
+        results        = self.type_ahead.search(text)
+        self.view      = results if text else None
+        self.selection = 0
+        self.top       = 0
         self.draw()
 
+    def _build_filter(self):
+        if self.type_ahead is not None:
+            self.type_ahead.stop()
+        self.type_ahead = TypeAheadIndex(
+                [self._item_name(i) for i in range(self._item_count())],
+                mode=self.filter_mode, background=True)
+
+    def invalidate_filter(self):
+        '''
+        Discards the filter and rebuilds its search index.
+        '''
+        if self.type_ahead is not None:
+            self.type_ahead.stop()
+            self.type_ahead = None
+        if self.items:
+            self._build_filter()
+        self.view = None
+        self.draw()
+
+    def handlech(self, c):
+        '''
+        Handle the specified navigation or type-ahead character.  The arrow,
+        page and home/end keys move the selection; printable characters are
+        appended to the filter and backspace deletes the last one.  Returns
+        True if the character was consumed.
+        '''
+        if c == curses.KEY_DOWN:
+            self.select_next()
+        elif c == curses.KEY_UP:
+            self.select_prev()
+        elif c == curses.KEY_NPAGE:
+            self.select_page_down()
+        elif c == curses.KEY_PPAGE:
+            self.select_page_up()
+        elif c == curses.KEY_HOME:
+            self.select_first()
+        elif c == curses.KEY_END:
+            self.select_last()
+        elif c in (curses.KEY_BACKSPACE, curses.ascii.BS, curses.ascii.DEL):
+            if not self.filter_text:
+                return False
+            self.filter(self.filter_text[:-1])
+        elif 0 <= c < 256 and curses.ascii.isprint(c):
+            self.filter(self.filter_text + chr(c))
+        else:
+            return False
+        return True
+
     def draw_item(self, index):
+        self._draw_item(index)
+        self.window.content.update()
+
+    def _draw_item(self, index):
         rows = self.window.content.height
-        if index < self.top or index >= self.top + rows:
+        if (index < self.top or index >= self.top + rows or
+                index >= len(self)):
             return
 
-        row  = index - self.top
-        attr = self.hilite_attr if index == self.selection else 0
+        row   = index - self.top
+        attr  = self.hilite_attr if index == self.selection else 0
+        width = self.window.content.width
+        text  = self._item_text(self.item_index(index))
         if self.top > 0 and row == 0:
-            s = '%-*s\u2191' % (self.window.content.width - 1,
-                                self.items[index])
-            s.encode('utf-8')
-        elif self.top + rows < len(self.items) and row == rows - 1:
-            s = '%-*s\u2193' % (self.window.content.width - 1,
-                                self.items[index])
-            s.encode('utf-8')
+            s = fit(text, width - 1) + u'\u2191'
+        elif self.top + rows < len(self) and row == rows - 1:
+            s = fit(text, width - 1) + u'\u2193'
         else:
-            s = '%-*s' % (self.window.content.width, self.items[index])
+            s = fit(text, width)
         try:
             self.window.content.addstr(s, pos=(row, 0), attr=attr)
         except _curses.error as e:
             pass
-        self.window.content.noutrefresh()
 
     def draw(self):
-        for i in range(len(self.items)):
-            self.draw_item(i)
+        rows = self.window.content.height
+        n    = min(self.top + rows, len(self))
+        for i in range(self.top, n):
+            self._draw_item(i)
+        for row in range(n - self.top, rows):
+            self.window.content.clrline(row)
+        self.window.content.update()
+
+    def _scroll(self, dy):
+        '''
+        Scrolls the content canvas by dy rows and redraws only the rows whose
+        contents don't simply move: the newly exposed row and the rows that
+        may gain or lose a scroll arrow.
+        '''
+        content = self.window.content
+        rows    = content.height
+        self.top += dy
+        content.idlok(True)
+        content.scrollok(True)
+        content.scroll(dy)
+        content.scrollok(False)
+        for row in {0, 1, rows - 2, rows - 1}:
+            self._draw_item(self.top + row)
 
     def select(self, index):
+        '''
+        Selects the item at the specified position, scrolling it into view.
+        '''
+        if not len(self):
+            return
+        index          = max(0, min(index, len(self) - 1))
         rows           = self.window.content.height
         prev_selection = self.selection
         self.selection = index
-        if index < self.top:
+        if index == self.top - 1 and rows > 2:
+            self._scroll(-1)
+        elif index == self.top + rows and rows > 2:
+            self._scroll(1)
+        elif index < self.top:
             self.top = index
             self.draw()
+            return
         elif index >= self.top + rows:
             self.top = index - rows + 1
             self.draw()
-        else:
-            self.draw_item(prev_selection)
-            self.draw_item(self.selection)
+            return
+        self._draw_item(prev_selection)
+        self._draw_item(self.selection)
+        self.window.content.update()
+
+    def select_page_down(self):
+        '''
+        Moves the selection down by one screenful.
+        '''
+        self.select(self.selection + self.window.content.height)
+
+    def select_page_up(self):
+        '''
+        Moves the selection up by one screenful.
+        '''
+        self.select(self.selection - self.window.content.height)
+
+    def select_first(self):
+        self.select(0)
+
+    def select_last(self):
+        self.select(len(self) - 1)
 
     def select_next(self):
-        if self.selection + 1 < len(self.items):
+        if self.selection + 1 < len(self):
             self.select(self.selection + 1)
             return True
         return False
@@ -99,3 +277,84 @@ class Menu(object):
 
     def toggle_item(self, index):
         self.items[index].toggle()
+
+
+class VirtualMenu(Menu):
+    '''
+    A Menu whose items are provided by a data source rather than held in a
+    list of MenuItem objects.  The source must support len() and indexing by
+    item number and return item names; only the items currently visible in
+    the window are ever fetched and formatted.  If checkable is True or a
+    checked list is given, items display a check box; the indices of checked
+    items are kept in a set so unchecked items take no memory at all.  The
+    filter's search index fetches every item, so it is only built the first
+    time the menu is filtered.
+    '''
+    def __init__(self, window, source, selection=0, checked=None,
+                 checkable=False, filter_mode='prefix'):
+        self.source    = source
+        self.checkable = checkable or checked is not None
+        self.checked   = set(checked or ())
+        super(VirtualMenu, self).__init__(window, [], selection=selection,
+                                          filter_mode=filter_mode)
+
+    def _item_count(self):
+        return len(self.source)
+
+    def _item_name(self, index):
+        return self.source[index]
+
+    def _item_text(self, index):
+        if self.checkable:
+            return '[%c] %s' % (('x' if index in self.checked else ' '),
+                                self.source[index])
+        return str(self.source[index])
+
+    def check_item(self, index):
+        assert self.checkable
+        self.checked.add(index)
+
+    def uncheck_item(self, index):
+        assert self.checkable
+        self.checked.discard(index)
+
+    def toggle_item(self, index):
+        assert self.checkable
+        self.checked ^= {index}
+
+
+class PagedSource(object):
+    '''
+    Data source for a VirtualMenu that fetches items a page at a time.
+    fetch(start, count) must return a sequence of up to count item names
+    starting at item number start; length is either the total number of
+    items or a callable returning it.  The most recently used max_pages pages
+    are cached.
+    '''
+    def __init__(self, fetch, length, page_size=256, max_pages=16):
+        self.fetch     = fetch
+        self.length    = length
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages    = collections.OrderedDict()
+
+    def __len__(self):
+        return self.length() if callable(self.length) else self.length
+
+    def __getitem__(self, index):
+        n, i = divmod(index, self.page_size)
+        page = self._pages.get(n)
+        if page is None:
+            page = self.fetch(n*self.page_size, self.page_size)
+            self._pages[n] = page
+            if len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(n)
+        return page[i]
+
+    def invalidate(self):
+        '''
+        Discards all cached pages so that items are fetched again.
+        '''
+        self._pages.clear()
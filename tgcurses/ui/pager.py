@@ -0,0 +1,255 @@
+import array
+import bisect
+import curses
+import _curses
+import mmap
+import threading
+
+from ..text import columns, fit
+
+
+class LineIndex(object):
+    '''
+    Sparse index of the line boundaries in a buffer such as an mmap.  The
+    buffer is divided into fixed-size blocks and counts[i] holds the number of
+    newlines preceding block i, so the index is tiny even for huge files and
+    locating a line is a binary search followed by a scan of a single block.
+
+    start() builds the index in a background thread; the index can be used
+    while it is being built and simply covers a growing prefix of the buffer.
+    '''
+    def __init__(self, buf, size, block_size=65536):
+        self.buf        = buf
+        self.size       = size
+        self.block_size = block_size
+        self.counts     = array.array('Q', [0])
+        self._stop      = False
+        self._thread    = None
+
+    @property
+    def indexed_bytes(self):
+        return min((len(self.counts) - 1)*self.block_size, self.size)
+
+    @property
+    def complete(self):
+        return self.indexed_bytes == self.size
+
+    @property
+    def line_count(self):
+        '''
+        The number of lines indexed so far, counting a final line that isn't
+        terminated by a newline once the index is complete.
+        '''
+        n = self.counts[-1]
+        if self.complete and self.size and self.buf[self.size - 1] != 0x0A:
+            n += 1
+        return n
+
+    def build(self):
+        '''
+        Indexes the rest of the buffer in the calling thread.
+        '''
+        bs = self.block_size
+        while not self._stop and not self.complete:
+            start = (len(self.counts) - 1)*bs
+            end   = min(start + bs, self.size)
+            self.counts.append(self.counts[-1] +
+                               self.buf[start:end].count(b'\n'))
+
+    def start(self):
+        '''
+        Builds the index in a background thread.
+        '''
+        self._thread = threading.Thread(target=self.build, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''
+        Stops the background thread, if any, and waits for it to exit.
+        '''
+        self._stop = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def offset_of_line(self, n):
+        '''
+        Returns the offset of the first byte of line n, counting from 0.  If
+        line n lies beyond the indexed part of the buffer, the offset of the
+        last indexed line is returned instead.
+        '''
+        n = min(n, self.counts[-1])
+        if n <= 0:
+            return 0
+
+        # Block i is the last block with fewer than n newlines before it, so
+        # the n-th newline lies within it.
+        i   = bisect.bisect_left(self.counts, n) - 1
+        pos = i*self.block_size
+        for _ in range(n - self.counts[i]):
+            pos = self.buf.find(b'\n', pos) + 1
+        return pos
+
+    def line_of_offset(self, offset):
+        '''
+        Returns the number of the line containing the specified offset or
+        None if the offset hasn't been indexed yet.
+        '''
+        if offset > self.indexed_bytes:
+            return None
+        i = min(offset // self.block_size, len(self.counts) - 1)
+        return (self.counts[i] +
+                self.buf[i*self.block_size:offset].count(b'\n'))
+
+
+class Pager(object):
+    '''
+    A Pager displays a text file of any size in a Window's content canvas.
+    The file is memory-mapped rather than read, so opening it is instant, and
+    only the lines currently visible are ever decoded.  A LineIndex of the
+    file is built in the background; jumping to a line number or to a
+    percentage of the file costs a binary search in the index plus a scan of
+    at most one index block.  The end offsets of the visible lines are kept
+    between draws, so scrolling only has to find the ends of the lines it
+    brings into view.
+    '''
+    def __init__(self, window, path, encoding='utf-8', block_size=65536):
+        self.window   = window
+        self.path     = path
+        self.encoding = encoding
+        self.top      = 0
+        self.top_line = 0
+        self.left     = 0
+        self._ends    = {}
+        self._file    = open(path, 'rb')
+        self.size     = self._file.seek(0, 2)
+        if self.size:
+            self.buf = mmap.mmap(self._file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        else:
+            self.buf = b''
+        self.index = LineIndex(self.buf, self.size, block_size=block_size)
+        self.index.start()
+        self.draw()
+
+    def close(self):
+        '''
+        Stops indexing and unmaps and closes the file.
+        '''
+        self.index.stop()
+        if self.size:
+            self.buf.close()
+        self._file.close()
+
+    def _line_end(self, offset):
+        end = self._ends.get(offset)
+        if end is None:
+            end = self.buf.find(b'\n', offset)
+            if end == -1:
+                end = self.size
+        return end
+
+    def draw(self):
+        '''
+        Draws the visible lines.
+        '''
+        content = self.window.content
+        width   = content.width
+        offset  = self.top
+        ends    = {}
+        for y in range(content.height):
+            if offset >= self.size:
+                content.clrline(y)
+                continue
+
+            # Never decode more of a line than could possibly be visible.
+            end    = ends[offset] = self._line_end(offset)
+            limit  = min(end, offset + 4*(self.left + width) + 4)
+            text   = self.buf[offset:limit].decode(self.encoding, 'replace')
+            text   = columns(text.expandtabs(), self.left, width)
+            offset = end + 1
+            try:
+                content.addstr(fit(text, width), pos=(y, 0))
+            except _curses.error:
+                pass
+        self._ends = ends
+        content.update()
+
+    def scroll_down(self, n=1):
+        '''
+        Scrolls the view n lines towards the end of the file.
+        '''
+        for _ in range(n):
+            end = self._line_end(self.top)
+            if end + 1 >= self.size:
+                break
+            self.top = end + 1
+            if self.top_line is not None:
+                self.top_line += 1
+
+    def scroll_up(self, n=1):
+        '''
+        Scrolls the view n lines towards the start of the file.
+        '''
+        for _ in range(n):
+            if self.top == 0:
+                break
+            self.top = self.buf.rfind(b'\n', 0, self.top - 1) + 1
+            if self.top_line is not None:
+                self.top_line -= 1
+
+    def goto_line(self, n):
+        '''
+        Scrolls the view so that line n, counting from 0, is at the top.  If
+        the index doesn't extend to line n yet, the view goes to the last
+        indexed line instead.
+        '''
+        n             = max(0, min(n, self.index.counts[-1]))
+        self.top      = self.index.offset_of_line(n)
+        self.top_line = n
+        if self.top >= self.size and n:
+            self.goto_line(n - 1)
+
+    def goto_percent(self, percent):
+        '''
+        Scrolls the view to the line containing the byte at the specified
+        percentage of the file size.
+        '''
+        offset        = min(int(self.size*percent/100), max(self.size - 1, 0))
+        self.top      = self.buf.rfind(b'\n', 0, offset) + 1
+        self.top_line = self.index.line_of_offset(self.top)
+
+    @property
+    def percent(self):
+        '''
+        The position of the top of the view as a percentage of the file.
+        '''
+        return 100*self.top/self.size if self.size else 100
+
+    def handlech(self, c):
+        '''
+        Handle the specified navigation key and redraw.  Returns True if the
+        key was consumed.
+        '''
+        rows = self.window.content.height
+        if c == curses.KEY_DOWN:
+            self.scroll_down()
+        elif c == curses.KEY_UP:
+            self.scroll_up()
+        elif c == curses.KEY_NPAGE:
+            self.scroll_down(rows)
+        elif c == curses.KEY_PPAGE:
+            self.scroll_up(rows)
+        elif c == curses.KEY_HOME:
+            self.goto_line(0)
+        elif c == curses.KEY_END:
+            self.goto_percent(100)
+            self.scroll_up(rows - 1)
+        elif c == curses.KEY_RIGHT:
+            self.left += 8
+        elif c == curses.KEY_LEFT:
+            self.left = max(self.left - 8, 0)
+        else:
+            return False
+        self.draw()
+        return True
@@ -0,0 +1,71 @@
+import time
+
+
+class RenderScheduler(object):
+    '''
+    A RenderScheduler decouples drawing from updating the terminal.  Once
+    installed on a Workspace, Canvas.update() no longer copies a canvas to the
+    curses virtual screen immediately but just marks it dirty; flush() then
+    renders all dirty canvases with a single doupdate(), and does so at most
+    fps times per second.  Widgets fed by high-frequency data can therefore
+    redraw as often as they like while the terminal only sees one write per
+    frame.
+
+    The application must call flush() periodically, e.g. from its input loop
+    with a getch() timeout of time_until_flush(), or let an AsyncDriver do it.
+    '''
+    def __init__(self, workspace, fps=30, clock=time.monotonic):
+        self.workspace  = workspace
+        self.fps        = fps
+        self.clock      = clock
+        self.dirty      = set()
+        self.last_flush = None
+        self.flushes    = 0
+        workspace.canvas.scheduler = self
+
+    def uninstall(self):
+        '''
+        Flushes any pending updates and restores immediate updates.
+        '''
+        self.flush(force=True)
+        self.workspace.canvas.scheduler = None
+
+    def mark_dirty(self, canvas):
+        '''
+        Records that canvas needs to be copied to the screen on the next
+        flush.
+        '''
+        self.dirty.add(canvas)
+
+    def time_until_flush(self):
+        '''
+        Returns the number of seconds until flush() will next update the
+        screen, 0 if it would update it now or None if nothing is dirty.
+        '''
+        if not self.dirty:
+            return None
+        if self.last_flush is None:
+            return 0
+        return max(0, self.last_flush + 1.0/self.fps - self.clock())
+
+    def flush(self, force=False):
+        '''
+        Renders all dirty canvases with a single doupdate() unless nothing is
+        dirty or, if force is False, the previous flush was less than a frame
+        interval ago.  Returns True if the screen was updated.
+        '''
+        if not self.dirty:
+            return False
+        now = self.clock()
+        if (not force and self.last_flush is not None and
+                now - self.last_flush < 1.0/self.fps):
+            return False
+
+        focus      = self.workspace.focus
+        dirty      = self.dirty
+        self.dirty = set()
+        self.workspace.render(focus.content if focus is not None else None,
+                              dirty=dirty)
+        self.last_flush  = now
+        self.flushes    += 1
+        return True
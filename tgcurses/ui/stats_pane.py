@@ -0,0 +1,31 @@
+import _curses
+
+from ..text import fit
+
+
+class StatsPane(object):
+    '''
+    A StatsPane displays an instrumentation Stats summary (see
+    tgcurses.instrument) in a Window's content canvas: frame and layout
+    counts, curses calls per method and the widgets with the most draw time.
+    Call draw() periodically, e.g. once a second, to refresh it.
+    '''
+    def __init__(self, window, stats):
+        self.window = window
+        self.stats  = stats
+        self.draw()
+
+    def draw(self):
+        '''
+        Draws the current statistics.
+        '''
+        content = self.window.content
+        width   = content.width
+        lines   = self.stats.report(max(content.height - 2, 0))
+        for y in range(content.height):
+            text = lines[y] if y < len(lines) else ''
+            try:
+                content.addstr(fit(text, width, ellipsis=''), pos=(y, 0))
+            except _curses.error:
+                pass
+        content.update()
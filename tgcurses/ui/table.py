@@ -0,0 +1,267 @@
+import array
+import curses
+import _curses
+
+from .. import text
+
+
+class Column(object):
+    '''
+    Describes one column of a Table.  A column either has a fixed width or,
+    if width is None, is flexible: the space left over after laying out the
+    fixed columns is shared among the flexible ones in proportion to their
+    flex values, never making them narrower than min_width.  Values are
+    converted to text with format and aligned according to align, which is
+    '<' or '>'.  Sorting on the column compares key(value).
+    '''
+    def __init__(self, title, width=None, flex=1, min_width=4, align='<',
+                 format=str, key=None):
+        assert align in ('<', '>')
+        self.title     = title
+        self.width     = width
+        self.flex      = flex
+        self.min_width = min_width
+        self.align     = align
+        self.format    = format
+        self.key       = key
+
+
+class Table(object):
+    '''
+    A Table displays rows of values in columns in a Window's content canvas,
+    with a header line showing the column titles.  rows may be any sequence
+    of row sequences; it is never copied.  Only the visible rows and the
+    visible columns are ever formatted, so the table can be arbitrarily long
+    and wide: the view scrolls vertically by row and horizontally by column.
+
+    Column widths are computed once per canvas width.  The table can be
+    sorted on any column; the permutation for each (column, reverse) pair is
+    computed once and cached until invalidate() is called.
+
+    cell_attr, if given, is called as cell_attr(row_index, column_index,
+    value) for each visible cell and returns the curses attributes to draw it
+    with.  Positions such as selection and top are indices into the displayed
+    (possibly sorted) rows; row_index() maps them back to indices into rows.
+    '''
+    def __init__(self, window, columns, rows, cell_attr=None):
+        self.window       = window
+        self.columns      = columns
+        self.rows         = rows
+        self.cell_attr    = cell_attr
+        self.header_attr  = curses.A_UNDERLINE
+        self.hilite_attr  = curses.A_REVERSE
+        self.selection    = 0
+        self.top          = 0
+        self.left         = 0
+        self.sort_column  = None
+        self.sort_reverse = False
+        self._perm        = None
+        self._perms       = {}
+        self._widths      = None
+        self._widths_for  = None
+        self.draw()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def row_index(self, pos):
+        '''
+        Returns the index into rows of the row displayed at position pos.
+        '''
+        return pos if self._perm is None else self._perm[pos]
+
+    def invalidate(self):
+        '''
+        Discards cached sort permutations after the rows have changed, re-sorts
+        if necessary and redraws.
+        '''
+        self._perms.clear()
+        if self.sort_column is not None:
+            self.sort(self.sort_column, self.sort_reverse)
+        else:
+            self.draw()
+
+    def sort(self, column, reverse=False):
+        '''
+        Sorts the displayed rows on the specified column index, or restores
+        the original order if column is None.
+        '''
+        self.sort_column  = column
+        self.sort_reverse = reverse
+        if column is None:
+            self._perm = None
+        else:
+            self._perm = self._perms.get((column, reverse))
+            if self._perm is None:
+                self._perm = self._perms[(column, reverse)] = \
+                    self._sort_perm(column, reverse)
+        self.draw()
+
+    def _sort_perm(self, column, reverse):
+        rows = self.rows
+        key  = self.columns[column].key
+        if key is None:
+            sort_key = lambda i: rows[i][column]
+        else:
+            sort_key = lambda i: key(rows[i][column])
+
+        # Re-sorting the permutation for the opposite order only takes a
+        # linear number of comparisons, and unlike reversing it keeps rows
+        # with equal keys in their original order.
+        other = self._perms.get((column, not reverse))
+        if other is None:
+            other = range(len(rows))
+        return array.array('l', sorted(other, key=sort_key, reverse=reverse))
+
+    def column_widths(self):
+        '''
+        Returns the list of column widths for the current canvas width.
+        '''
+        width = self.window.content.width
+        if self._widths_for == width:
+            return self._widths
+
+        widths = [c.width if c.width is not None else c.min_width
+                  for c in self.columns]
+        spare  = width - sum(widths) - (len(widths) - 1)
+        flex   = sum(c.flex for c in self.columns if c.width is None)
+        if spare > 0 and flex:
+            for i, c in enumerate(self.columns):
+                if c.width is None:
+                    share      = spare*c.flex//flex
+                    widths[i] += share
+                    spare     -= share
+                    flex      -= c.flex
+
+        self._widths     = widths
+        self._widths_for = width
+        return widths
+
+    def _visible_columns(self):
+        '''
+        Returns a list of (column index, x, width) tuples for the visible
+        columns; the last one may be truncated.
+        '''
+        width   = self.window.content.width
+        widths  = self.column_widths()
+        visible = []
+        x       = 0
+        for i in range(self.left, len(self.columns)):
+            if x >= width:
+                break
+            visible.append((i, x, min(widths[i], width - x)))
+            x += widths[i] + 1
+        return visible
+
+    def _draw_line(self, y, cells, attrs, base_attr):
+        content = self.window.content
+        width   = content.width
+        x       = 0
+        for (s, cx), attr in zip(cells, attrs):
+            if cx > x:
+                content.addstr(' '*(cx - x), pos=(y, x), attr=base_attr)
+            content.addstr(s, pos=(y, cx), attr=attr | base_attr)
+            x = cx + text.text_width(s)
+        try:
+            if x < width:
+                content.addstr(' '*(width - x), pos=(y, x), attr=base_attr)
+        except _curses.error:
+            pass
+
+    def _draw_header(self, visible):
+        cells = [(text.fit(self.columns[i].title, w, self.columns[i].align),
+                  x) for i, x, w in visible]
+        self._draw_line(0, cells, [0]*len(cells), self.header_attr)
+
+    def _draw_row(self, pos, visible):
+        rows = self.window.content.height - 1
+        if pos < self.top or pos >= self.top + rows or pos >= len(self):
+            return
+
+        r       = self.row_index(pos)
+        row     = self.rows[r]
+        cells   = []
+        attrs   = []
+        for i, x, w in visible:
+            col = self.columns[i]
+            v   = row[i]
+            cells.append((text.fit(col.format(v), w, col.align), x))
+            attrs.append((self.cell_attr(r, i, v) or 0)
+                         if self.cell_attr else 0)
+        base = self.hilite_attr if pos == self.selection else 0
+        try:
+            self._draw_line(pos - self.top + 1, cells, attrs, base)
+        except _curses.error:
+            pass
+
+    def draw(self):
+        '''
+        Draws the header and all visible rows.
+        '''
+        content = self.window.content
+        rows    = content.height - 1
+        visible = self._visible_columns()
+        self._draw_header(visible)
+        n = min(self.top + rows, len(self))
+        for pos in range(self.top, n):
+            self._draw_row(pos, visible)
+        for y in range(n - self.top + 1, rows + 1):
+            content.clrline(y)
+        content.update()
+
+    def select(self, pos):
+        '''
+        Selects the row at the specified position, scrolling it into view.
+        '''
+        if not len(self):
+            return
+        pos            = max(0, min(pos, len(self) - 1))
+        rows           = max(self.window.content.height - 1, 1)
+        prev_selection = self.selection
+        self.selection = pos
+        if pos < self.top:
+            self.top = pos
+        elif pos >= self.top + rows:
+            self.top = pos - rows + 1
+        else:
+            visible = self._visible_columns()
+            self._draw_row(prev_selection, visible)
+            self._draw_row(pos, visible)
+            self.window.content.update()
+            return
+        self.draw()
+
+    def scroll_columns(self, n):
+        '''
+        Scrolls the view horizontally by n columns.
+        '''
+        left = max(0, min(self.left + n, len(self.columns) - 1))
+        if left != self.left:
+            self.left = left
+            self.draw()
+
+    def handlech(self, c):
+        '''
+        Handle the specified navigation key.  Returns True if the key was
+        consumed.
+        '''
+        rows = max(self.window.content.height - 1, 1)
+        if c == curses.KEY_DOWN:
+            self.select(self.selection + 1)
+        elif c == curses.KEY_UP:
+            self.select(self.selection - 1)
+        elif c == curses.KEY_NPAGE:
+            self.select(self.selection + rows)
+        elif c == curses.KEY_PPAGE:
+            self.select(self.selection - rows)
+        elif c == curses.KEY_HOME:
+            self.select(0)
+        elif c == curses.KEY_END:
+            self.select(len(self) - 1)
+        elif c == curses.KEY_RIGHT:
+            self.scroll_columns(1)
+        elif c == curses.KEY_LEFT:
+            self.scroll_columns(-1)
+        else:
+            return False
+        return True
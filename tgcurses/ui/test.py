@@ -40,14 +40,12 @@ def main(screen):
             continue
         elif c == ord('q'):
             break
-        elif c == ord('x') and w == check_win:
-            w.menu.toggle_item(w.menu.selection)
-            w.menu.draw()
-        elif c == curses.KEY_DOWN:
-            w.menu.select_next()
-            w.menu.draw()
-        elif c == curses.KEY_UP:
-            w.menu.select_prev()
+        elif c == curses.KEY_RESIZE:
+            for rw in ws.handle_resize(w.content):
+                rw.menu.draw()
+        elif (c == ord('x') and w == check_win and
+              w.menu.selected_index is not None):
+            w.menu.toggle_item(w.menu.selected_index)
             w.menu.draw()
         elif c == ord('\t'):
             windows[0].dehilite()
@@ -57,6 +55,8 @@ def main(screen):
             windows[0].dehilite()
             windows = windows[-1:] + windows[:-1]
             windows[0].hilite()
+        else:
+            w.menu.handlech(c)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,277 @@
+import curses
+import curses.ascii
+import _curses
+
+from ..text import char_width, fit, text_width
+from .gap_buffer import GapBuffer
+
+
+TAB_SIZE = 8
+
+
+def _expand(text, x):
+    '''
+    Returns text with its tabs expanded to spaces, as if it were inserted at
+    display column x.  Unlike str.expandtabs(), wide characters count as two
+    columns.
+    '''
+    if '\t' not in text:
+        return text
+    chars = []
+    for ch in text:
+        if ch == '\t':
+            n  = TAB_SIZE - x % TAB_SIZE
+            ch = ' '*n
+        else:
+            n = char_width(ch)
+        chars.append(ch)
+        x += n
+    return ''.join(chars)
+
+
+class TextArea(object):
+    '''
+    A TextArea is a multi-line text editor occupying a Window's content
+    canvas.  The text is kept as a list of lines; the line holding the cursor
+    is edited in a GapBuffer, so typing and deleting are amortized O(1) even
+    on very long lines, and only the edited line is redrawn.  Splitting or
+    joining lines redraws the rows from the cursor down.  The view scrolls
+    horizontally and vertically to keep the cursor visible.
+
+    Tabs are expanded to spaces as text is inserted.  row, col and left are
+    line and character indices; wide characters are taken into account when
+    positioning the cursor and drawing.
+    '''
+    def __init__(self, window, text=''):
+        self.window = window
+        self.lines  = [_expand(l, 0) for l in text.split('\n')]
+        self.row    = 0
+        self.col    = 0
+        self.top    = 0
+        self.left   = 0
+        self._goal  = 0
+        self._line  = GapBuffer(self.lines[0])
+        self._line.move(0)
+        self.draw()
+
+    @property
+    def text(self):
+        '''
+        The complete text, with lines separated by newlines.
+        '''
+        self._commit()
+        return '\n'.join(self.lines)
+
+    def _commit(self):
+        self.lines[self.row] = str(self._line)
+
+    def _load(self, row, col):
+        '''
+        Moves the cursor to (row, col), loading row into the gap buffer.
+        '''
+        if row != self.row:
+            self._commit()
+            self.row   = row
+            self._line = GapBuffer(self.lines[row])
+        self.col = max(0, min(col, len(self._line)))
+        self._line.move(self.col)
+
+    def _line_text(self, row, start, end):
+        if row == self.row:
+            return self._line.slice(start, end)
+        return self.lines[row][start:end]
+
+    def _x(self, row, col):
+        '''
+        Returns the screen column, relative to left, of the character at
+        index col, which must not be left of the view, in row.
+        '''
+        return text_width(self._line_text(row, self.left, col))
+
+    def _scroll_to_cursor(self):
+        '''
+        Adjusts top and left so the cursor is visible and returns True if the
+        view moved.
+        '''
+        content   = self.window.content
+        top, left = self.top, self.left
+        if self.row < self.top:
+            self.top = self.row
+        elif self.row >= self.top + content.height:
+            self.top = self.row - content.height + 1
+        if self.col < self.left:
+            self.left = self.col
+        else:
+            if self.col >= self.left + content.width:
+                self.left = self.col - content.width + 1
+            while (self.left < self.col and
+                   self._x(self.row, self.col) >= content.width):
+                self.left += 1
+        return (top, left) != (self.top, self.left)
+
+    def _draw_line(self, row, start=None):
+        '''
+        Draws the visible part of the specified line, optionally starting
+        from column start.
+        '''
+        content = self.window.content
+        width   = content.width
+        y       = row - self.top
+        if not 0 <= y < content.height:
+            return
+        start = self.left if start is None else max(start, self.left)
+        if row < len(self.lines):
+            x0   = self._x(row, start)
+            text = self._line_text(row, start, self.left + width)
+        else:
+            x0   = 0
+            text = ''
+        try:
+            content.addstr(fit(text, width - x0, ellipsis=''), pos=(y, x0))
+        except _curses.error:
+            pass
+
+    def _draw_from(self, row):
+        for r in range(max(row, self.top),
+                       self.top + self.window.content.height):
+            self._draw_line(r)
+
+    def draw(self):
+        '''
+        Draws all visible lines and positions the cursor.
+        '''
+        self._scroll_to_cursor()
+        self._draw_from(self.top)
+        self.move()
+
+    def _refresh(self, row=None, start=None):
+        '''
+        Redraws after an edit: everything if the view scrolled, otherwise the
+        rows from row down if start is None, or just row from column start.
+        '''
+        if self._scroll_to_cursor():
+            self._draw_from(self.top)
+        elif row is not None and start is not None:
+            self._draw_line(row, start)
+        elif row is not None:
+            self._draw_from(row)
+        self.move()
+
+    def move(self):
+        '''
+        Positions the screen cursor at the edit point.
+        '''
+        self.window.content.move(self.row - self.top,
+                                 self._x(self.row, self.col))
+        self.window.content.update()
+
+    def insert_text(self, text):
+        '''
+        Inserts text, which may contain newlines, at the cursor.
+        '''
+        col   = self.col
+        x     = text_width(self._line.slice(0, col)) if '\t' in text else 0
+        parts = [_expand(p, x if i == 0 else 0)
+                 for i, p in enumerate(text.split('\n'))]
+        self._line.insert(parts[0])
+        if len(parts) == 1:
+            self.col   += len(parts[0])
+            self._goal  = self.col
+            self._refresh(self.row, col)
+            return
+
+        tail = self._line.delete_forward(len(self._line) - self._line.point)
+        self._commit()
+        row                              = self.row
+        self.lines[row + 1:row + 1]      = parts[1:]
+        self.lines[row + len(parts) - 1] += tail
+        self._load(row + len(parts) - 1, len(parts[-1]))
+        self._goal = self.col
+        self._refresh(row)
+
+    def delete_back(self):
+        '''
+        Deletes the character before the cursor, joining lines at the start
+        of a line.
+        '''
+        if self.col:
+            self._line.delete_back()
+            self.col  -= 1
+            self._goal = self.col
+            self._refresh(self.row, self.col)
+        elif self.row:
+            self._commit()
+            row  = self.row
+            prev = self.lines[row - 1]
+            self.lines[row - 1] += self.lines.pop(row)
+            self.row   = row - 1
+            self._line = GapBuffer(self.lines[row - 1])
+            self._load(row - 1, len(prev))
+            self._goal = self.col
+            self._refresh(row - 1)
+
+    def delete_forward(self):
+        '''
+        Deletes the character under the cursor, joining lines at the end of a
+        line.
+        '''
+        if self.col < len(self._line):
+            self._line.delete_forward()
+            self._refresh(self.row, self.col)
+        elif self.row + 1 < len(self.lines):
+            self._line.insert(self.lines.pop(self.row + 1))
+            self._line.move(self.col)
+            self._refresh(self.row)
+
+    def move_cursor(self, row, col):
+        '''
+        Moves the cursor to the specified line and column.
+        '''
+        row = max(0, min(row, len(self.lines) - 1))
+        self._load(row, col)
+        self._refresh()
+
+    def handlech(self, c):
+        '''
+        Handle the specified editing character.  Returns True if it was
+        consumed.
+        '''
+        rows = self.window.content.height
+        if c in (curses.KEY_BACKSPACE, curses.ascii.BS, curses.ascii.DEL):
+            self.delete_back()
+        elif c == curses.KEY_DC:
+            self.delete_forward()
+        elif c in (curses.KEY_ENTER, curses.ascii.NL, curses.ascii.CR):
+            self.insert_text('\n')
+        elif c == curses.KEY_LEFT:
+            if self.col:
+                self.move_cursor(self.row, self.col - 1)
+            elif self.row:
+                self.move_cursor(self.row - 1, len(self.lines[self.row - 1]))
+            self._goal = self.col
+        elif c == curses.KEY_RIGHT:
+            if self.col < len(self._line):
+                self.move_cursor(self.row, self.col + 1)
+            elif self.row + 1 < len(self.lines):
+                self.move_cursor(self.row + 1, 0)
+            self._goal = self.col
+        elif c == curses.KEY_UP:
+            self.move_cursor(self.row - 1, self._goal)
+        elif c == curses.KEY_DOWN:
+            self.move_cursor(self.row + 1, self._goal)
+        elif c == curses.KEY_PPAGE:
+            self.move_cursor(self.row - rows, self._goal)
+        elif c == curses.KEY_NPAGE:
+            self.move_cursor(self.row + rows, self._goal)
+        elif c == curses.KEY_HOME:
+            self.move_cursor(self.row, 0)
+            self._goal = 0
+        elif c == curses.KEY_END:
+            self.move_cursor(self.row, len(self._line))
+            self._goal = self.col
+        elif 0 <= c < 256 and (curses.ascii.isprint(c) or
+                               c == curses.ascii.TAB):
+            self.insert_text(chr(c))
+        else:
+            return False
+        return True
@@ -0,0 +1,191 @@
+import array
+import bisect
+import itertools
+import operator
+import threading
+
+
+class _SortedRange(object):
+    '''
+    Read-only sequence view of perm[lo:hi] which avoids copying the slice.
+    '''
+    def __init__(self, perm, lo, hi):
+        self.perm = perm
+        self.lo   = lo
+        self.hi   = hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.hi - self.lo:
+            raise IndexError(index)
+        return self.perm[self.lo + index]
+
+
+_EMPTY = array.array('l')
+
+
+class TypeAheadIndex(object):
+    '''
+    Case-insensitive search index over a list of names, used to filter a Menu
+    as the user types.  In 'substring' mode, the results are the indices of
+    all names containing the query, in their original order.  In 'prefix'
+    mode, the results are the indices of all names starting with the query,
+    in sorted order.
+
+    Searches are incremental: the results for every prefix of the current
+    query are kept on a stack, so typing another character only has to narrow
+    the previous results and deleting one just pops the stack.  In prefix
+    mode each keystroke is a pair of binary searches.
+
+    In substring mode, posting lists of the names containing every 1-, 2-
+    and 3-character substring are built, so queries of up to 3 characters
+    are simple lookups.  A longer query only checks the names in the
+    shortest of the previous results and the posting lists of its
+    trigrams, so a keystroke costs time proportional to the number of
+    matches rather than to the number of names.  A long query matching most
+    of the names is therefore slower than in prefix mode, which is
+    independent of the number of matches.
+
+    Building the posting lists takes a while for large lists of names; if
+    background is True they are built in a background thread and, until
+    they are complete, searches check the previous results directly.
+    '''
+    def __init__(self, names, mode='substring', background=False):
+        assert mode in ('substring', 'prefix')
+        self.mode    = mode
+        self.keys    = [n.casefold() for n in names]
+        self.query   = ''
+        self._grams  = None
+        self._stop   = False
+        self._thread = None
+        if mode == 'prefix':
+            self._perm   = sorted(range(len(self.keys)),
+                                  key=self.keys.__getitem__)
+            self._sorted = [self.keys[i] for i in self._perm]
+            self._stack  = [(0, len(self.keys))]
+        else:
+            self._stack = [range(len(self.keys))]
+            if background:
+                self.start()
+            else:
+                self.build()
+
+    @property
+    def complete(self):
+        '''
+        True once the index is ready for fast searches.
+        '''
+        return self.mode == 'prefix' or self._grams is not None
+
+    def build(self):
+        '''
+        Builds the substring posting lists in the calling thread.
+        '''
+        if self.complete:
+            return
+        grams = {}
+        for i, k in enumerate(self.keys):
+            if self._stop:
+                return
+            subs = set(k)
+            subs.update(map(''.join, zip(k, k[1:])))
+            subs.update(map(''.join, zip(k, k[1:], k[2:])))
+            for g in subs:
+                p = grams.get(g)
+                if p is None:
+                    p = grams[g] = array.array('l')
+                p.append(i)
+        self._grams = grams
+
+    def start(self):
+        '''
+        Builds the substring posting lists in a background thread.
+        '''
+        if not self.complete and self._thread is None:
+            self._thread = threading.Thread(target=self.build, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        '''
+        Stops the background thread, if any, and waits for it to exit.
+        '''
+        self._stop = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def results(self):
+        '''
+        Returns a sequence of the indices of names matching the query.
+        '''
+        if self.mode == 'prefix':
+            return _SortedRange(self._perm, *self._stack[-1])
+        return self._stack[-1]
+
+    def push(self, ch):
+        '''
+        Appends ch to the query and returns the narrowed results.  Characters
+        that casefold to several characters, such as 'ß' to 'ss', push one
+        entry per folded character, each of which pop() removes separately.
+        '''
+        for c in ch.casefold():
+            self._push(c)
+        return self.results
+
+    def _push(self, ch):
+        q = self.query + ch
+        if self.mode == 'prefix':
+            lo, hi = self._stack[-1]
+            lo     = bisect.bisect_left(self._sorted, q, lo, hi)
+            hi     = bisect.bisect_left(self._sorted, q + '\U0010ffff', lo, hi)
+            self._stack.append((lo, hi))
+        else:
+            self._stack.append(self._match(q))
+        self.query = q
+
+    def _match(self, q):
+        grams = self._grams
+        if grams is not None and len(q) <= 3:
+            return grams.get(q, _EMPTY)
+
+        # Every match is among the previous results and contains each
+        # trigram of the query, so only check the shortest of those lists.
+        candidates = self._stack[-1]
+        if grams is not None:
+            for j in range(len(q) - 2):
+                candidates = min(candidates, grams.get(q[j:j + 3], _EMPTY),
+                                 key=len)
+        keys = self.keys
+        return array.array('l', itertools.compress(
+            candidates, map(operator.contains,
+                            map(keys.__getitem__, candidates),
+                            itertools.repeat(q))))
+
+    def pop(self):
+        '''
+        Removes the last character from the query and returns the widened
+        results.
+        '''
+        if self.query:
+            self._stack.pop()
+            self.query = self.query[:-1]
+        return self.results
+
+    def search(self, query):
+        '''
+        Sets the query, reusing the results for the longest common prefix of
+        the old and new queries, and returns the results.
+        '''
+        query = query.casefold()
+        n     = 0
+        while (n < len(query) and n < len(self.query) and
+               query[n] == self.query[n]):
+            n += 1
+        while len(self.query) > n:
+            self.pop()
+        for ch in query[n:]:
+            self._push(ch)
+        return self.results
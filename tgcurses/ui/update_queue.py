@@ -0,0 +1,108 @@
+import collections
+import threading
+
+
+class UpdateQueue(object):
+    '''
+    curses isn't thread-safe, so worker threads must never draw directly.
+    Instead they post() callables (a draw command or a model update such as
+    appending to a LogPane or checking a Menu item) to an UpdateQueue, and the
+    UI thread calls drain() before each update of the screen to run them all
+    in one batch.
+
+    The queue holds at most maxlen commands.  With the 'drop-oldest' policy
+    posting to a full queue discards the oldest command and counts it in
+    dropped; posting never blocks and takes no lock.  With the 'block' policy
+    the posting thread waits until the UI thread has drained the queue.
+
+    post_latest() coalesces updates by key: only the most recent command
+    posted for a key is kept, which suits updates that replace state, like
+    setting a gauge value.
+
+    notify, if set, is called from the posting thread whenever commands
+    become available after a drain; an AsyncDriver uses it to wake the event
+    loop.
+    '''
+    def __init__(self, maxlen=10000, policy='drop-oldest', notify=None):
+        assert policy in ('drop-oldest', 'block')
+        self.maxlen     = maxlen
+        self.policy     = policy
+        self.notify     = notify
+        self.dropped    = 0
+        self._signalled = False
+        self._latest    = collections.OrderedDict()
+        self._lock      = threading.Lock()
+        self._not_full  = threading.Condition(self._lock)
+        if policy == 'drop-oldest':
+            self._queue = collections.deque(maxlen=maxlen)
+        else:
+            self._queue = collections.deque()
+
+    def __len__(self):
+        return len(self._queue) + len(self._latest)
+
+    def _signal(self):
+        if not self._signalled:
+            self._signalled = True
+            if self.notify is not None:
+                self.notify()
+
+    def post(self, func, *args):
+        '''
+        Queues func(*args) to be invoked on the UI thread.
+        '''
+        if self.policy == 'block':
+            with self._not_full:
+                while len(self._queue) >= self.maxlen:
+                    self._not_full.wait()
+                self._queue.append((func, args))
+        else:
+            # deque.append() is atomic; a full deque drops its oldest entry.
+            if len(self._queue) >= self.maxlen:
+                self.dropped += 1
+            self._queue.append((func, args))
+        self._signal()
+
+    def post_latest(self, key, func, *args):
+        '''
+        Queues func(*args) to be invoked on the UI thread, replacing any
+        command previously posted with the same key that hasn't run yet.
+        '''
+        with self._lock:
+            self._latest[key] = (func, args)
+        self._signal()
+
+    def drain(self, max_items=None):
+        '''
+        Invokes queued commands in the order they were posted, followed by
+        the coalesced commands, and returns the number invoked.  At most
+        max_items plain commands are run if specified.  Must be called from
+        the UI thread.
+        '''
+        self._signalled = False
+        n               = 0
+        try:
+            while max_items is None or n < max_items:
+                try:
+                    func, args = self._queue.popleft()
+                except IndexError:
+                    break
+                n += 1
+                func(*args)
+        finally:
+            if self.policy == 'block':
+                with self._not_full:
+                    self._not_full.notify_all()
+
+        if self._latest:
+            with self._lock:
+                latest       = self._latest
+                self._latest = collections.OrderedDict()
+            for func, args in latest.values():
+                n += 1
+                func(*args)
+
+        if self._queue:
+            # Stopped at max_items; make sure we get called again.
+            self._signal()
+        return n
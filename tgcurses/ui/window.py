@@ -1,58 +1,135 @@
 import curses
 
+from ..text import fit
+
 
 class Window(object):
     '''
     A Window is a rectangular region of a canvas that contains a 1-character
     border on each edge and has a left-justitifed title displayed at the top.
     The frame specified in the initializer is in workspace coordiantes.
+
+    The border and title are only drawn when something they depend on
+    changes: the size of the frame, the hilite state or the title.  If the
+    border canvas is erased by other means, call invalidate() to have them
+    redrawn by the next show().
     '''
     def __init__(self, workspace, title, frame):
-        self.workspace = workspace
-        self.title     = title
-        self.frame     = frame
+        self._chrome    = None
+        self._title_fit = None
+        self.workspace  = workspace
+        self.title      = title
+        self.frame      = frame
         self.border    = workspace.make_canvas(frame)
-        self.content   = workspace.make_canvas(frame.make_inset_frame(1, 1))
+        if workspace.share_canvases:
+            self.content = self.border.make_subcanvas(
+                frame.make_inset_frame(1, 1))
+        else:
+            self.content = workspace.make_canvas(frame.make_inset_frame(1, 1))
         self.hilited   = False
         self.visible   = False
+        self.opaque    = True
+        self.occluded  = False
+        self.on_key    = None
+        workspace._add_window(self)
         self.show()
 
+    @property
+    def title(self):
+        return self._title
+
+    @title.setter
+    def title(self, title):
+        self._title = title
+        if self._chrome is not None:
+            self._draw_chrome()
+
+    def invalidate(self):
+        '''
+        Forces the border and title to be redrawn by the next show().
+        '''
+        self._chrome = None
+
+    def _display_title(self, width):
+        '''
+        Returns the title truncated to fit a border of the specified width.
+        '''
+        if self._title_fit is None or self._title_fit[:2] != (self._title,
+                                                             width):
+            self._title_fit = (self._title, width,
+                               fit(self._title, width - 4, pad=False))
+        return self._title_fit[2]
+
+    def _draw_chrome(self):
+        '''
+        Draws whatever parts of the border and title have changed since they
+        were last drawn.
+        '''
+        b     = self.frame.bounds
+        key   = (b.width, b.height, self.hilited, self._title)
+        drawn = self._chrome
+        if drawn == key:
+            return
+
+        if drawn is None or drawn[:2] != key[:2]:
+            if drawn is not None:
+                self.border.erase()
+            self.border.border()
+        elif drawn[3] != key[3]:
+            # Clear the old title, which may have been longer.
+            self.border.hline(b.width - 2, pos=(0, 1))
+        self.border.addstr(self._display_title(b.width), (0, 3),
+                           curses.A_REVERSE if self.hilited else 0)
+        self.border.update()
+        self._chrome = key
+
+    def handlech(self, c):
+        '''
+        Handle a key delivered to this window while it has the focus by
+        passing it to the on_key callable, if any.  Returns True if the key
+        was consumed.
+        '''
+        return bool(self.on_key is not None and self.on_key(c))
+
     def hide(self):
         '''
         Removes the window and border from the screen on the next update.
         '''
+        if not self.visible:
+            return
         self.visible = False
-        self.border.erase()
-        self.border.noutrefresh()
+        for c in (self.border, self.content):
+            if c.panel is not None:
+                c.panel.hide()
+        if self.border.panel is None and not self.content.shared:
+            # Erasing the border would also erase a shared content canvas,
+            # which show() doesn't redraw.
+            self.border.erase()
+            self.border.update()
+            self.invalidate()
+        self.workspace.restack()
+        self.workspace._expose(self.frame.bounds)
 
     def show(self):
         '''
         Displays the window and border on the next update.
         '''
-        self.visible = True
-        max_title_width = self.frame.bounds.width - 4
-        if len(self.title) > max_title_width:
-            self.display_title = self.title[:max_title_width - 1] + u'\u2026'
-            self.display_title = self.display_title.encode('utf-8')
-        else:
-            self.display_title = self.title
-
-        self.border.border()
-        if self.hilited:
-            self.hilite()
-        else:
-            self.dehilite()
+        if not self.visible:
+            self.visible = True
+            self.workspace._show_panels(self)
+            self.workspace.restack()
+        self._draw_chrome()
 
     def hilite(self):
         '''
         Draws the title in inverse text.
         '''
-        self.border.addstr(self.display_title, (0, 3), curses.A_REVERSE)
-        self.border.noutrefresh()
+        self.hilited = True
+        self._draw_chrome()
 
     def dehilite(self):
         '''
         Draws the title in regular text.
         '''
-        self.border.addstr(self.display_title, (0, 3))
-        self.border.noutrefresh()
+        self.hilited = False
+        self._draw_chrome()
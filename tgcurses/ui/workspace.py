@@ -1,15 +1,289 @@
+import curses
+import curses.panel
+
 from ..layout import StaticFrame, Frame, Bounds
 from .window import Window
 
 
+def _covered(bounds, covers):
+    '''
+    Returns True if the union of the list of covers Bounds contains bounds.
+    '''
+    covers = [c for c in covers if c.intersects(bounds)]
+    if not covers:
+        return False
+
+    # The set of covers spanning a row only changes at a cover's top or
+    # bottom edge, so only those rows need checking.
+    ys = {bounds.y1}
+    for c in covers:
+        ys.update(y for y in (c.y1, c.y2) if bounds.y1 < y < bounds.y2)
+    for y in ys:
+        x = bounds.x1
+        for x1, x2 in sorted((c.x1, c.x2) for c in covers
+                             if c.y1 <= y < c.y2):
+            if x1 > x:
+                break
+            x = max(x, x2)
+        if x < bounds.x2:
+            return False
+    return True
+
+
+def _refreshed(window):
+    '''
+    Returns the canvases of the window that are refreshed separately: a
+    shared content canvas is refreshed along with the border.
+    '''
+    if window.content.shared:
+        return [window.border]
+    return [window.border, window.content]
+
+
 class Workspace(object):
     '''
     A workspace takes over the entire region specified by the canvas and uses
     it to present ui.Window objects to the user.
+
+    Windows may overlap.  The windows list is kept in stacking order, bottom
+    first, and can be changed with raise_window(), lower_window() and
+    push_modal()/pop_modal().  A window whose frame is completely covered by
+    opaque visible windows above it is occluded: its canvases are neither
+    refreshed nor copied to the screen until it is exposed again.  A window
+    that is partly covered copies the rows of the windows above it that it
+    painted over back to the screen after it has been refreshed.
+
+    If use_panels is True, the windows are placed in curses panels instead
+    and curses.panel.update_panels() resolves the overlaps when rendering.
+    Occluded windows are still skipped.
+
+    If share_canvases is True, each window's content canvas is a view of its
+    border canvas' curses window (see Canvas.make_subcanvas()) rather than a
+    second window, halving the curses memory used per window.
     '''
-    def __init__(self, canvas):
-        self.canvas  = canvas
-        self.windows = []
+    def __init__(self, canvas, use_panels=False, share_canvases=False):
+        self.canvas         = canvas
+        self.windows        = []
+        self.focus          = None
+        self.modal          = []
+        self.use_panels     = use_panels and not canvas.offscreen
+        self.share_canvases = share_canvases
+
+    def set_focus(self, window):
+        '''
+        Gives the keyboard focus to the specified window, hiliting its title.
+        '''
+        if self.focus is not None:
+            self.focus.dehilite()
+        self.focus = window
+        if window is not None:
+            window.hilite()
+
+    def cycle_focus(self, n=1):
+        '''
+        Moves the focus n windows forwards, or backwards if n is negative.
+        The focus stays put while a modal window is shown.
+        '''
+        if not self.windows or self.modal:
+            return
+        i = self.windows.index(self.focus) if self.focus in self.windows else 0
+        self.set_focus(self.windows[(i + n) % len(self.windows)])
+
+    def raise_window(self, window):
+        '''
+        Moves the window to the top of the stacking order.
+        '''
+        self.windows.remove(window)
+        self.windows.append(window)
+        if self.use_panels and window.visible:
+            # curses shows a hidden panel moved in the deck; show() puts
+            # the panels back in place instead.
+            for c in (window.border, window.content):
+                if c.panel is not None:
+                    c.panel.top()
+        self.restack()
+        if window.visible:
+            window.border.touch()
+            window.content.touch()
+
+    def lower_window(self, window):
+        '''
+        Moves the window to the bottom of the stacking order.
+        '''
+        self.windows.remove(window)
+        self.windows.insert(0, window)
+        if self.use_panels and window.visible:
+            for c in (window.content, window.border):
+                if c.panel is not None:
+                    c.panel.bottom()
+        self.restack()
+        if window.visible:
+            self._expose(window.frame.bounds)
+
+    def push_modal(self, window):
+        '''
+        Shows the window on top of all others and gives it the focus until
+        pop_modal() is called.
+        '''
+        self.modal.append((window, self.focus))
+        if not window.visible:
+            window.show()
+        self.raise_window(window)
+        self.set_focus(window)
+
+    def pop_modal(self):
+        '''
+        Hides the topmost modal window, returns the focus to the window that
+        had it before and returns the modal window.
+        '''
+        window, focus = self.modal.pop()
+        window.hide()
+        self.set_focus(focus if focus is None or focus.visible else None)
+        return window
+
+    def restack(self):
+        '''
+        Recomputes which windows are occluded and which canvases overlap
+        which.  This is invoked whenever the stacking order, the visibility
+        of a window or the layout changes.  Windows that are exposed as a
+        result are touched so that they are copied in full on the next
+        render().
+        '''
+        visible = [w for w in self.windows if w.visible]
+        for w in self.windows:
+            if not w.visible:
+                w.occluded = w.border.occluded = w.content.occluded = True
+                w.border.overlapped_by = w.content.overlapped_by = ()
+
+        for i, w in enumerate(visible):
+            b        = w.frame.bounds
+            above    = visible[i + 1:]
+            occluded = _covered(b, [a.frame.bounds for a in above
+                                    if a.opaque])
+            if w.border.occluded and not occluded:
+                w.border.touch()
+                w.content.touch()
+            w.occluded = w.border.occluded = w.content.occluded = occluded
+
+            if self.use_panels:
+                continue
+            over = [c for a in above if a.frame.bounds.intersects(b)
+                    for c in _refreshed(a)]
+            w.border.overlapped_by  = _refreshed(w)[1:] + over
+            w.content.overlapped_by = over
+
+        # The canvases outside windows, such as the root, are beneath all of
+        # them.  In panel mode this makes their refreshes mark the panels
+        # above them as changed for update_panels().
+        over     = [c for w in visible for c in _refreshed(w)]
+        windowed = set(self._windowed())
+        for c in [self.canvas] + self.canvas.descendants():
+            if c not in windowed:
+                b = c.bounds
+                c.overlapped_by = [o for o in over
+                                   if o.bounds.intersects(b)]
+
+    def _expose(self, bounds):
+        '''
+        Touches the rows of the root canvas within bounds, so that the next
+        render() repaints that region and every window overlapping it.
+        '''
+        y1 = max(bounds.y1, 0)
+        y2 = min(bounds.y2, self.canvas.height)
+        if y1 < y2:
+            self.canvas.touchline(y1, y2 - y1)
+
+    def _canvases(self):
+        '''
+        Returns all canvases in the workspace in stacking order.
+        '''
+        stacked  = self._windowed()
+        windowed = set(stacked)
+        return ([c for c in [self.canvas] + self.canvas.descendants()
+                 if c not in windowed] + stacked)
+
+    def _windowed(self):
+        '''
+        Returns the canvases belonging to windows in stacking order.
+        '''
+        stacked  = []
+        windowed = set()
+        for w in self.windows:
+            # A shared content canvas is also one of the border's children.
+            for c in ([w.border, w.content] + w.border.descendants() +
+                      w.content.descendants()):
+                if c not in windowed:
+                    windowed.add(c)
+                    stacked.append(c)
+        return stacked
+
+    def render(self, focus=None, dirty=()):
+        '''
+        Copies every canvas in the workspace that has been drawn to since it
+        was last refreshed, as well as any canvases in dirty, into the curses
+        virtual screen, bottom window first, and then syncs the physical
+        screen with a single doupdate().  Other canvases, and those of
+        occluded windows, are skipped entirely.  If a focus canvas is
+        specified, it is refreshed last so that the screen cursor is left at
+        its cursor position.
+        '''
+        for c in self._canvases():
+            if (c.damage or c in dirty) and c is not focus:
+                c.noutrefresh()
+        if self.use_panels:
+            # Panel canvases were only flushed by noutrefresh(); this copies
+            # them, and the focus canvas then just positions the cursor.
+            curses.panel.update_panels()
+            if focus is not None:
+                focus.place_cursor()
+        elif focus is not None:
+            focus.noutrefresh()
+        if not self.canvas.offscreen:
+            curses.doupdate()
+
+    def handle_resize(self, canvas=None):
+        '''
+        Relayout the workspace after the terminal has been resized.  This
+        should be invoked when getch() returns KEY_RESIZE; canvas should be the
+        canvas getch() was invoked on.  Any further KEY_RESIZE events already
+        queued on that canvas are discarded, so that a burst of SIGWINCH
+        signals results in a single relayout.  Only the curses windows whose
+        bounds actually changed are moved or resized; their borders are
+        redrawn and the list of affected Windows is returned so that the
+        caller can redraw their contents.
+        '''
+        if canvas is not None:
+            self._drain_resizes(canvas)
+
+        changed = set(self.canvas.handle_resize())
+        self.restack()
+        self.canvas.erase()
+        self.canvas.noutrefresh()
+
+        windows = []
+        for w in self.windows:
+            if w.border in changed or w.content in changed:
+                windows.append(w)
+                if w.visible:
+                    w.show()
+            elif w.visible:
+                for c in _refreshed(w):
+                    c.touch()
+                    c.noutrefresh()
+        return windows
+
+    @staticmethod
+    def _drain_resizes(canvas):
+        delay = canvas.delay
+        canvas.timeout(0)
+        try:
+            c = canvas.getch()
+            while c == curses.KEY_RESIZE:
+                c = canvas.getch()
+        finally:
+            canvas.timeout(delay)
+        if c != -1:
+            curses.ungetch(c)
 
     def make_canvas(self, frame):
         '''
@@ -21,9 +295,38 @@ class Workspace(object):
         '''
         Creates a window in the workplace.
         '''
-        w = Window(self, title, frame)
-        self.windows.append(w)
-        return w
+        return Window(self, title, frame)
+
+    def _add_window(self, window):
+        '''
+        Places a new window on top of the stacking order.  Window's
+        initializer calls this before the window is first shown, so that
+        restack() already treats it as a window rather than as a canvas
+        beneath all of them.
+        '''
+        if self.use_panels:
+            window.border.make_panel()
+            if not window.content.shared:
+                window.content.make_panel()
+        self.windows.append(window)
+
+    def _show_panels(self, window):
+        '''
+        Shows the panels of a window being shown.  curses places them on top
+        of the deck, so the panels of the visible windows stacked above it
+        are raised again afterwards.
+        '''
+        if not self.use_panels:
+            return
+        for c in (window.border, window.content):
+            if c.panel is not None:
+                c.panel.show()
+        i = self.windows.index(window)
+        for w in self.windows[i + 1:]:
+            if w.visible:
+                for c in (w.border, w.content):
+                    if c.panel is not None:
+                        c.panel.top()
 
     def make_static_window(self, title, y, x, h, w):
         '''
@@ -32,7 +335,7 @@ class Workspace(object):
         interior canvas will therefore have dimensions (h-1, w-1).
         '''
         b = Bounds(x, y, x + w, y + h)
-        f = self.canvas.make_sub_frame(b)
+        f = self.canvas.frame.make_sub_frame(b)
         return self.make_window(title, f)
 
     def make_anchored_window(self, title, h=None, w=None, **kwargs):